@@ -2,9 +2,13 @@
 Adapter module for translating simple API inputs to the format required by the model.
 """
 
+import logging
+
 import pandas as pd
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 # Field mappings from API inputs to model columns
 FIELD_MAPPINGS = {
     'parte_cuerpo': 'id_parte_cuerpo_igatepmafurat',
@@ -91,20 +95,20 @@ def create_model_input(api_input: dict) -> pd.DataFrame:
                     model_input[model_field] = int(api_input[api_field])
                 except (ValueError, TypeError):
                     # If conversion fails, keep the original value and log a warning
-                    print(f"Warning: Could not convert {api_field}='{api_input[api_field]}' to integer")
+                    logger.warning("Could not convert %s='%s' to integer", api_field, api_input[api_field])
                     model_input[model_field] = api_input[api_field]
             else:
                 model_input[model_field] = api_input[api_field]
     
-    # Create a pandas DataFrame (single row)
-    df = pd.DataFrame([model_input])
+    # Create a pandas DataFrame (single row), built column-wise in a single allocation
+    df = pd.DataFrame({column: [value] for column, value in model_input.items()})
     
-    # Ensure proper data types for all columns
+    # Ensure proper data types; integer fields are already int64, so only mismatches are cast
     for column, dtype in COLUMN_TYPES.items():
-        if column in df.columns:
+        if column in df.columns and df[column].dtype != dtype:
             try:
                 df[column] = df[column].astype(dtype)
             except Exception as e:
-                print(f"Warning: Could not convert column {column} to {dtype}: {e}")
+                logger.warning("Could not convert column %s to %s: %s", column, dtype, e)
     
-    return df
\ No newline at end of file
+    return df
@@ -7,6 +7,7 @@ import random
 import traceback
 import numpy as np  # Add NumPy import
 import json
+import logging
 from typing import Optional, Dict, Any
 
 # Define a custom JSON encoder to handle NumPy types
@@ -26,19 +27,29 @@ app = FastAPI(title="Accident Prediction API",
 
 # Add src directory to Python path if not already there
 src_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+added_paths = []
 if src_dir not in sys.path:
     sys.path.insert(0, src_dir)
-    print(f"Added {src_dir} to Python path")
+    added_paths.append(src_dir)
 
 # Also add the parent directory to Python path
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
-    print(f"Added {parent_dir} to Python path")
+    added_paths.append(parent_dir)
 
-print(f"Python version: {sys.version}")
-print(f"Current directory: {os.getcwd()}")
-print(f"Python path: {sys.path}")
+# Non-blocking logging: request handlers only enqueue records, a background thread writes them.
+# Repeated per-request messages (including warnings) are capped per call site; errors always pass.
+from data_preprocessing.logging_setup import configure_logging
+
+configure_logging(rate_limit=(10, 1.0, logging.ERROR))
+logger = logging.getLogger(__name__)
+
+for path in added_paths:
+    logger.info("Added %s to Python path", path)
+logger.info("Python version: %s", sys.version)
+logger.info("Current directory: %s", os.getcwd())
+logger.debug("Python path: %s", sys.path)
 
 # Import the data adapter
 from adapter import create_model_input
@@ -54,32 +65,28 @@ model_info = {
 
 # Try to import the model from src directory
 try:
-    print("Attempting to import model from modelo_triage.loader...")
+    logger.info("Attempting to import model from modelo_triage.loader...")
     
     # Debug directory structure
     src_modelo_path = "/app/src/modelo_triage"
     if os.path.exists(src_modelo_path):
-        print(f"Directory {src_modelo_path} exists. Contents:")
-        for item in os.listdir(src_modelo_path):
-            print(f" - {item}")
+        logger.debug("Directory %s exists. Contents: %s", src_modelo_path, os.listdir(src_modelo_path))
     else:
-        print(f"Directory {src_modelo_path} does not exist")
+        logger.debug("Directory %s does not exist", src_modelo_path)
         
     # Try checking for loader.py file
     loader_path = os.path.join(src_modelo_path, "loader.py")
     if os.path.exists(loader_path):
-        print(f"Loader file exists at {loader_path}")
+        logger.debug("Loader file exists at %s", loader_path)
     else:
-        print(f"Loader file not found at {loader_path}")
+        logger.debug("Loader file not found at %s", loader_path)
     
     # Import and load the model
     from modelo_triage.loader import get_model
     model = get_model()
-    print(f"Model loaded successfully: {type(model)}")
+    logger.info("Model loaded successfully: %s", type(model))
 except Exception as e:
-    error_traceback = traceback.format_exc()
-    print(f"Warning: Could not load model: {str(e)}")
-    print(f"Traceback: {error_traceback}")
+    logger.warning("Could not load model: %s", e, exc_info=True)
     model_info["load_error"] = str(e)
     model = None
 
@@ -229,7 +236,7 @@ async def reload_model():
         
         # If module is in sys.modules, reload it
         if 'modelo_triage' in sys.modules:
-            print("Reloading modelo_triage module")
+            logger.info("Reloading modelo_triage module")
             importlib.reload(sys.modules['modelo_triage'])
             if 'modelo_triage.loader' in sys.modules:
                 importlib.reload(sys.modules['modelo_triage.loader'])
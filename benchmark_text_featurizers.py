@@ -0,0 +1,85 @@
+import argparse
+import logging
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import f1_score
+from sklearn.model_selection import train_test_split
+
+from src.data_preprocessing.data_loader import load_data
+from src.data_preprocessing.data_profiling import _standard_name
+from src.data_preprocessing.feature_engineering import create_text_featurizer
+from src.data_preprocessing.logging_setup import configure_logging
+
+logger = logging.getLogger(__name__)
+
+INPUT_FILE = "clasificacion_siniestros.csv"
+TEXT_COL = "descripcion_at_igatepmafurat"
+TARGET_COL = "origen_igdactmlmacalificacionorigen"
+
+
+def benchmark_text_featurizers(texts, y, hashing_n_features=2**12, test_size=0.2, n_latency_rows=200, random_state=42):
+    """
+    Compara la rama de texto actual (TF-IDF) con la variante de hashing.
+    Para cada vectorizador mide tiempo de ajuste, latencia de transformación de un registro,
+    tamaño serializado y F1 macro de una regresión logística entrenada solo con el texto.
+    """
+    texts_train, texts_test, y_train, y_test = train_test_split(
+        pd.Series(texts), np.asarray(y), test_size=test_size, stratify=y, random_state=random_state
+    )
+
+    results = []
+    for name in ("tfidf", "hashing"):
+        vectorizer = create_text_featurizer(name, hashing_n_features=hashing_n_features)
+
+        start = time.perf_counter()
+        X_train = vectorizer.fit_transform(texts_train)
+        fit_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        X_test = vectorizer.transform(texts_test)
+        batch_seconds = time.perf_counter() - start
+
+        latencies = []
+        for text in texts_test.iloc[:n_latency_rows]:
+            start = time.perf_counter()
+            vectorizer.transform([text])
+            latencies.append(time.perf_counter() - start)
+
+        classifier = LogisticRegression(max_iter=1000)
+        classifier.fit(X_train, y_train)
+
+        results.append({
+            "featurizer": name,
+            "fit_seconds": fit_seconds,
+            "batch_transform_seconds": batch_seconds,
+            "row_latency_ms_p50": np.percentile(latencies, 50) * 1000,
+            "row_latency_ms_p99": np.percentile(latencies, 99) * 1000,
+            "pickle_kb": len(pickle.dumps(vectorizer)) / 1024,
+            "f1_macro": f1_score(y_test, classifier.predict(X_test), average="macro"),
+        })
+
+    return pd.DataFrame(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara los vectorizadores de la descripción (TF-IDF y hashing).")
+    parser.add_argument("--input", default=INPUT_FILE, help="Archivo CSV de entrada en data/raw/.")
+    parser.add_argument("--hashing-features", type=int, default=2**12, help="Columnas del vectorizador de hashing.")
+    parser.add_argument("--output", default="text_featurizer_benchmark.csv")
+    args = parser.parse_args()
+
+    configure_logging()
+    # Los nombres del CSV crudo vienen en mayúsculas: misma normalización que clean_data
+    df = load_data(args.input).rename(columns=_standard_name).dropna(subset=[TEXT_COL, TARGET_COL])
+
+    report = benchmark_text_featurizers(df[TEXT_COL], df[TARGET_COL], hashing_n_features=args.hashing_features)
+    report.to_csv(args.output, index=False)
+    logger.info(f"✅ Comparación de vectorizadores guardada en {args.output}\n{report.to_string(index=False)}")
+
+
+if __name__ == "__main__":
+    main()
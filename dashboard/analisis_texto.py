@@ -12,15 +12,12 @@ from wordcloud import WordCloud, STOPWORDS, ImageColorGenerator
 import matplotlib.pyplot as plt
 import nltk
 from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-import re
 from collections import Counter
 
+# Text normalization shared with the model preprocessing (src/ is on PYTHONPATH)
+from data_preprocessing.text_normalization import normalize_series, normalize_text, tokenize
+
 # Download required NLTK resources if not already present
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
 try:
     nltk.data.find('corpora/stopwords')
 except LookupError:
@@ -28,7 +25,7 @@ except LookupError:
 
 def generate_wordcloud(df, text_column='descripcion_at_igatepmafurat', 
                        output_path="C:/Users/Santiago Calderón/OneDrive - LLA/Documents/Maestria/Proyecto Final/Proyecto de Materia/Taller 1/Repo-desarrollo-soluciones/dash/wordcloud.png",
-                       show_plot=True, max_words=200):
+                       show_plot=True, max_words=200, n_jobs=1):
     """
     Generate a wordcloud from text data in a DataFrame column
     
@@ -44,6 +41,8 @@ def generate_wordcloud(df, text_column='descripcion_at_igatepmafurat',
         Whether to display the plot or not
     max_words : int
         Maximum number of words to include in the wordcloud
+    n_jobs : int
+        Number of processes used to normalize the text (-1 uses all cores)
         
     Returns:
     --------
@@ -54,7 +53,7 @@ def generate_wordcloud(df, text_column='descripcion_at_igatepmafurat',
     print(f"Número de filas con texto: {df[text_column].notna().sum()}")
 
     # Get text from dataframe column
-    texto = df[text_column].dropna().tolist()  # Drop NA values
+    texto = df[text_column].dropna().astype(str)  # Drop NA values
 
     # Define stopwords - only define once
     stop_words = set(stopwords.words('spanish'))
@@ -71,25 +70,15 @@ def generate_wordcloud(df, text_column='descripcion_at_igatepmafurat',
           "para", "con", "sin"
     ])
 
-    # Process the text
-    processed_texts = []
-    for i in range(len(texto)):
-        if pd.notna(texto[i]):  # Check for NA values
-            # Remove punctuation and special characters
-            text = re.sub(r'[^\w\s]', '', str(texto[i]))
-            # Convert to lowercase
-            text = text.lower()
-            # Replace accented characters with regular ones
-            text = re.sub(r'[áäâà]', 'a', text)
-            text = re.sub(r'[éêèë]', 'e', text)
-            text = re.sub(r'[íîìï]', 'i', text)
-            text = re.sub(r'[óôòö]', 'o', text)
-            text = re.sub(r'[úûùü]', 'u', text)
-            # Tokenize
-            word_tokens = word_tokenize(text)
-            # Filter out stopwords
-            filtered_sentence = [w for w in word_tokens if w not in stop_words and len(w) > 2]  # Only keep words longer than 2 chars
-            processed_texts.append(" ".join(filtered_sentence))
+    # Stopwords without accents, so they match the normalized text
+    stop_words.update(normalize_text(w, remove_accents=True) for w in list(stop_words))
+
+    # Process the text: punctuation, lowercase and accents in one vectorized pass
+    normalized = normalize_series(texto, remove_accents=True, n_jobs=n_jobs)
+    processed_texts = [
+        " ".join(w for w in tokenize(text, min_length=3) if w not in stop_words)  # Only keep words longer than 2 chars
+        for text in normalized
+    ]
 
     # Join all processed texts into one string
     all_text = " ".join(processed_texts)
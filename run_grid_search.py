@@ -1,64 +1,165 @@
+import argparse
 import numpy as np
 import pandas as pd
 import mlflow
 import scipy.sparse
 from src.models.model_search import GridSearch
+from src.models.search_strategies import STRATEGIES
+from src.models.trial_ledger import MAX_ATTEMPTS, TrialLedger
+from src.models.telemetry import TELEMETRY_ENV
+from src.models.sample_fidelity import sample_fidelity_report
+from src.data_preprocessing.sampling import sample_namespace
+from src.data_preprocessing.sparse_storage import load_sparse_mmap
+from src.data_preprocessing.logging_setup import configure_logging
 import logging
 from dotenv import load_dotenv
 import os
+from pathlib import Path
 
 # Carga las variables de entorno
 load_dotenv(".env.mlflow_server")
 
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
 
-logging.info("Iniciando pipeline de experimentación...")
+# Tipo con el que se entrenan los modelos (np.float32 reduce memoria y acelera XGBoost, LightGBM y MLP)
+FEATURE_DTYPE = np.float32
 
+PROCESSED_DIR = Path('data/processed')
 
-# 1. Carga de los datos
+# Estado de cada combinación de la grilla, para retomar una búsqueda interrumpida
+LEDGER_PATH = Path('data/trial_ledger.sqlite')
+
+# Costo de cada entrenamiento (tiempo, CPU, memoria, hilos, filas/s) para planificar reentrenamientos
+TELEMETRY_PATH = Path('data/training_telemetry.csv')
+
+MODELS = ["RandomForest", "XGBoost", "LightGBM", "CatBoost", "MLP"]
 
 # Función para cargar datos (maneja tanto sparse como dense)
-def load_data(X_path, y_path, is_sparse=True):
-    if is_sparse:
+def load_data(X_path, y_path, is_sparse=True, dtype=None, mmap=False):
+    if mmap:
+        X = load_sparse_mmap(X_path)  # Matriz dispersa en memoria mapeada (compartida entre procesos)
+    elif is_sparse:
         X = scipy.sparse.load_npz(X_path)  # Carga matriz dispersa
     else:
         X = pd.read_parquet(X_path).values  # Alternativa si se usa Parquet
-    y = pd.read_csv(y_path).values.ravel()  # Carga el target
-    return X, y
-
-X_train, y_train = load_data('data/processed/X_train.npz', 'data/processed/y_train.csv', is_sparse=True)
-X_val, y_val = load_data('data/processed/X_val.npz', 'data/processed/y_val.csv', is_sparse=True)
-
-
-logging.info(f"✅ Datos cargados correctamente")
 
-# 2. Configura la URI de MLflow (local o remoto)
-mlflow.set_tracking_uri(f"http://{os.getenv("MLFLOW_MACHINE_IP")}:8050")
+    # Convertir solo si el tipo guardado no coincide con el solicitado
+    if dtype is not None and X.dtype != dtype:
+        X = X.astype(dtype)
 
-experiment_name = os.getenv("EXPERIMENT_NAME")
-mlflow.set_experiment(experiment_name)
-
-logging.info(f"✅ MLflow configurado correctamente, experimento: {experiment_name}")
-
-
-logging.info("🔎 Iniciando experimentación...")
-# 3. Ejecuta Grid Search para RandomForest
-# search = GridSearch("RandomForest", X_train, y_train, X_val, y_val)
-# search.run()
-
-# 4. Ejecuta Grid Search para XGBoost
-# search = GridSearch("XGBoost", X_train, y_train, X_val, y_val)
-# search.run()
-
-# # 5. Ejecuta Grid Search para LightGBM
-# search = GridSearch("LightGBM", X_train, y_train, X_val, y_val)
-# search.run()
+    y = pd.read_csv(y_path).values.ravel()  # Carga el target
+    return X, y
 
-# # 6. Ejecuta Grid Search para CatBoost
-# search = GridSearch("CatBoost", X_train, y_train, X_val, y_val)
-# search.run()
 
-# 7. Ejecuta Grid Search para MLP
-search = GridSearch("MLP", X_train, y_train, X_val, y_val)
-search.run()
+def load_split(data_dir, name):
+    """
+    Carga una partición procesada; si existe en memoria mapeada se usa, si no el .npz comprimido.
+    """
+    if (data_dir / f"X_{name}").is_dir():
+        return load_data(data_dir / f"X_{name}", data_dir / f"y_{name}.csv", dtype=FEATURE_DTYPE, mmap=True)
+    return load_data(data_dir / f"X_{name}.npz", data_dir / f"y_{name}.csv", is_sparse=True, dtype=FEATURE_DTYPE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Búsqueda de hiperparámetros con registro en MLflow.")
+    parser.add_argument("--models", nargs="+", default=["MLP"], choices=MODELS)
+    parser.add_argument("--sample", type=float, default=None, metavar="FRACCION",
+                        help="Usa los datos de la muestra generada con pipeline_data_preprocessing.py --sample.")
+    parser.add_argument("--fidelity-report", action="store_true",
+                        help="Al terminar, compara las métricas de la muestra con las de los datos completos.")
+    parser.add_argument("--report-only", action="store_true", help="Solo genera el reporte de fidelidad.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Procesos para entrenar combinaciones en paralelo (los hilos por modelo se reparten entre ellos).")
+    parser.add_argument("--strategy", default="grid", choices=["grid", *STRATEGIES],
+                        help="Estrategia de búsqueda; todas salvo 'grid' requieren un presupuesto.")
+    parser.add_argument("--max-fits", type=int, default=None, help="Presupuesto de ajustes por familia de modelos.")
+    parser.add_argument("--max-minutes", type=float, default=None, help="Presupuesto de tiempo por familia de modelos.")
+    parser.add_argument("--resource", default="n_samples", choices=["n_samples", "rounds"],
+                        help="Recurso que crece en successive halving / Hyperband: filas o rondas de boosting.")
+    parser.add_argument("--ledger", default=None,
+                        help=f"Archivo SQLite con el estado de cada combinación; al relanzar se omiten las completadas "
+                             f"(por defecto {LEDGER_PATH}).")
+    parser.add_argument("--max-attempts", type=int, default=None,
+                        help=f"Intentos por combinación antes de darla por fallida (por defecto {MAX_ATTEMPTS}).")
+    parser.add_argument("--max-p99-ms", type=float, default=None,
+                        help="Elige el mejor modelo con latencia p99 de una fila menor o igual a este valor (ms).")
+    parser.add_argument("--max-model-mb", type=float, default=None,
+                        help="Elige el mejor modelo con tamaño serializado menor o igual a este valor (MB).")
+    parser.add_argument("--telemetry-file", default=str(TELEMETRY_PATH),
+                        help="CSV donde se agrega el costo de cada entrenamiento (también se registra en MLflow).")
+    parser.add_argument("--no-warm-start", action="store_true",
+                        help="Entrena cada punto de la grilla desde cero, sin hacer crecer el modelo entre "
+                             "combinaciones que solo difieren en árboles/rondas/épocas.")
+    args = parser.parse_args()
+
+    # Opciones que solo implementa GridSearch
+    if args.strategy != "grid":
+        unsupported = [option for option, used in (
+            ("--workers", args.workers != 1),
+            ("--ledger", args.ledger is not None),
+            ("--max-attempts", args.max_attempts is not None),
+            ("--max-p99-ms", args.max_p99_ms is not None),
+            ("--max-model-mb", args.max_model_mb is not None),
+            ("--no-warm-start", args.no_warm_start),
+        ) if used]
+        if unsupported:
+            parser.error(f"{', '.join(unsupported)} solo se admite con --strategy grid.")
+
+    configure_logging()
+    # Por el entorno, para que también lo usen los procesos del pool
+    os.environ[TELEMETRY_ENV] = args.telemetry_file
+    namespace = sample_namespace(args.sample)
+
+    # 1. Configura la URI de MLflow (local o remoto)
+    mlflow.set_tracking_uri(f"http://{os.getenv('MLFLOW_MACHINE_IP')}:8050")
+
+    experiment_name = os.getenv("EXPERIMENT_NAME")
+    experiment = mlflow.set_experiment(experiment_name)
+
+    logger.info(f"✅ MLflow configurado correctamente, experimento: {experiment_name}")
+
+    if not args.report_only:
+        logger.info(f"Iniciando pipeline de experimentación ({namespace})...")
+
+        # 2. Carga de los datos
+        data_dir = PROCESSED_DIR if namespace == "full" else PROCESSED_DIR / namespace
+        X_train, y_train = load_split(data_dir, "train")
+        X_val, y_val = load_split(data_dir, "val")
+        # Con memoria mapeada, los procesos abren los mismos archivos en lugar de recibir una copia
+        mmap_dirs = {f"X_{name}": data_dir / f"X_{name}" for name in ("train", "val") if (data_dir / f"X_{name}").is_dir()}
+
+        logger.info(f"✅ Datos cargados correctamente desde {data_dir}")
+
+        # 3. Ejecuta Grid Search para cada familia de modelos
+        logger.info("🔎 Iniciando experimentación...")
+        tags = {"data_namespace": namespace}
+        ledger = TrialLedger(args.ledger or LEDGER_PATH, max_attempts=args.max_attempts or MAX_ATTEMPTS)
+        # Presupuesto de servicio que debe cumplir el modelo elegido
+        constraints = {}
+        if args.max_p99_ms is not None:
+            constraints["latency_p99_ms"] = args.max_p99_ms
+        if args.max_model_mb is not None:
+            constraints["model_size_bytes"] = args.max_model_mb * 1e6
+        for model_name in args.models:
+            if args.strategy == "grid":
+                search = GridSearch(model_name, X_train, y_train, X_val, y_val, tags=tags,
+                                    mmap_dirs=mmap_dirs, experiment_id=experiment.experiment_id,
+                                    warm_start=not args.no_warm_start, ledger=ledger, constraints=constraints)
+                search.run(n_workers=args.workers)
+                continue
+
+            options = {"resource": args.resource} if args.strategy in ("halving", "hyperband") else {}
+            max_seconds = args.max_minutes * 60 if args.max_minutes is not None else None
+            search = STRATEGIES[args.strategy](model_name, X_train, y_train, X_val, y_val, tags=tags,
+                                               experiment_id=experiment.experiment_id, max_fits=args.max_fits,
+                                               max_seconds=max_seconds, **options)
+            search.run()
+
+    # 4. Qué tan bien la muestra anticipa los resultados con todos los datos
+    if namespace != "full" and (args.fidelity_report or args.report_only):
+        sample_fidelity_report(experiment_name, namespace, output_file=f"fidelity_{namespace}.csv")
+
+
+if __name__ == "__main__":
+    main()
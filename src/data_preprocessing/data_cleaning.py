@@ -5,7 +5,14 @@ import numpy as np
 import warnings
 warnings.filterwarnings("ignore")
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+try:
+    from .data_transformation import CATEGORY_PREFIX_REGEX
+    from .text_normalization import normalize_series
+except ImportError:
+    from data_transformation import CATEGORY_PREFIX_REGEX
+    from text_normalization import normalize_series
+
+logger = logging.getLogger(__name__)
 
 
 # Campos que son identificación de registros (Ids)
@@ -71,8 +78,14 @@ COLUMNS_TO_DROP = ids_fields + non_informative_fields + correlated_fields + othe
 
 
 def clean_data(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Limpia el conjunto de datos crudo.
+    Las tasas de nulos, medianas y cuantiles se calculan sobre los datos en cada paso (tras
+    eliminar duplicados y tras filtrar los outliers de las columnas anteriores), por lo que
+    no se pueden tomar de un perfil de los datos crudos.
+    """
     original_shape = df.shape
-    logging.info(f'\tIniciando limpieza: {original_shape} registros.')
+    logger.info(f'\tIniciando limpieza: {original_shape} registros.')
 
     # Eliminar primer columna (id de la fila)
     df.drop(df.columns[0], axis=1, inplace=True)
@@ -96,12 +109,12 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
     null_cols = df.columns[df.isnull().mean() > threshold]
     if len(null_cols) > 0:
         df.drop(columns=null_cols, inplace=True)
-        logging.info(f'\tColumnas eliminadas por alto porcentaje de nulos (>50%): {list(null_cols)}')
+        logger.info(f'\tColumnas eliminadas por alto porcentaje de nulos (>50%): {list(null_cols)}')
 
     # 5. Imputar valores nulos numéricos con la mediana
     for col in df.select_dtypes(include=np.number).columns:
         if df[col].isnull().sum() > 0:
-            df[col].fillna(df[col].median(), inplace=True)
+            df[col] = df[col].fillna(df[col].median())
 
     # 6. Corregir tipos de datos fecha
     date_format = "%Y-%m-%d %H:%M:%S%z"
@@ -109,7 +122,7 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
         try:
             df[col] = pd.to_datetime(df[col], format=date_format, errors='coerce')
         except Exception as e:
-            logging.warning(f'\tError al convertir columna {col} a datetime: {e}')
+            logger.warning(f'\tError al convertir columna {col} a datetime: {e}')
 
     # 7. Eliminar outliers (método IQR) en columnas numéricas (excluye las que empiezan por "origen")
     base_rows = df.shape[0]
@@ -128,7 +141,7 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
             df = df[(df[col] >= lower_bound) & (df[col] <= upper_bound)]
 
     actual_rows = df.shape[0]
-    logging.info(f'\tTotal registros eliminados por outliers: {base_rows - actual_rows}.')
+    logger.info(f'\tTotal registros eliminados por outliers: {base_rows - actual_rows}.')
 
     # 8. Estandarizar texto
     for col in df.select_dtypes(include='object').columns:
@@ -136,12 +149,71 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
 
     # 9. Limpiar columna de texto descripción
     text_col = 'descripcion_at_igatepmafurat'
-    df[text_col] = df[text_col].str.replace(r'\W', ' ', regex=True).str.replace(r'\s+', ' ', regex=True)
-     
+    df[text_col] = normalize_series(df[text_col])
 
     # 10. Registrar cambios finales
     df.dropna(inplace=True)
     final_shape = df.shape
-    logging.info(f'\tLimpieza completada: {final_shape} registros (cambio de {original_shape} a {final_shape}).')
-
-    return df
\ No newline at end of file
+    logger.info(f'\tLimpieza completada: {final_shape} registros (cambio de {original_shape} a {final_shape}).')
+
+    return df
+
+
+def _codes_to_category(values: pd.Series) -> pd.Series:
+    """
+    Convierte una columna de códigos a `category` con categorías de texto, iguales a las
+    que produciría `astype(str)` en `transform_data` (p. ej. 446 -> '446', 446.0 -> '446.0').
+    """
+    values = values.astype('category')
+    categories = values.cat.categories.astype(str)
+    if categories.has_duplicates:
+        return values.astype(str).astype('category')
+    return values.cat.rename_categories(categories)
+
+
+def _downcast_numeric(values: pd.Series) -> pd.Series:
+    """
+    Reduce el tipo numérico solo si no se pierde información: enteros al entero más pequeño
+    y flotantes con valores enteros (p. ej. horas) a entero. Los demás flotantes se conservan
+    para no cambiar la precisión de los cálculos posteriores.
+    """
+    if pd.api.types.is_float_dtype(values):
+        array = values.to_numpy()
+        if not (np.isfinite(array).all() and np.array_equal(array, np.round(array))):
+            return values
+        values = values.astype(np.int64)
+
+    return pd.to_numeric(values, downcast='integer')
+
+
+def optimize_memory(df: pd.DataFrame, text_col='descripcion_at_igatepmafurat', max_category_ratio=0.5) -> pd.DataFrame:
+    """
+    Reduce la memoria del DataFrame limpio:
+    - Columnas de códigos (prefijos ind, id, emp, tipo, seg, centro) a `category` con categorías de texto.
+    - Columnas de texto con pocos valores distintos (banderas s/n, variable objetivo) a `category`.
+    - Enteros (y flotantes con valores enteros) al entero más pequeño que conserva los valores.
+    La descripción se deja como texto. Registra los bytes antes y después.
+    """
+    bytes_before = df.memory_usage(deep=True).sum()
+    code_cols = df.filter(regex=CATEGORY_PREFIX_REGEX).columns
+
+    for col in df.columns:
+        values = df[col]
+        if col == text_col or isinstance(values.dtype, pd.CategoricalDtype):
+            continue
+
+        if col in code_cols:
+            df[col] = _codes_to_category(values)
+        elif pd.api.types.is_object_dtype(values):
+            if values.nunique() <= max_category_ratio * len(values):
+                df[col] = values.astype('category')
+        elif pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            df[col] = _downcast_numeric(values)
+
+    bytes_after = df.memory_usage(deep=True).sum()
+    logger.info(
+        f'\tMemoria optimizada: {bytes_before / 2**20:.1f} MB -> {bytes_after / 2**20:.1f} MB '
+        f'({1 - bytes_after / bytes_before:.0%} menos).'
+    )
+
+    return df
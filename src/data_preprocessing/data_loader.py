@@ -2,7 +2,7 @@ from pathlib import Path
 import pandas as pd
 import logging
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
@@ -15,7 +15,7 @@ def load_data(filename: str, folder="raw"):
     if not file_path.exists():
         raise FileNotFoundError(f"El archivo {file_path} no existe.")
 
-    logging.info(f"\tCargando datos desde: {file_path}")
+    logger.info(f"\tCargando datos desde: {file_path}")
     return pd.read_csv(file_path, sep=";", encoding='utf-8',low_memory=False)
 
 
@@ -1,49 +1,113 @@
 import pandas as pd
 import numpy as np
 import logging
+import re
 from pathlib import Path
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
 OUTPUT_DIR = Path(__file__).resolve().parent.parent.parent.joinpath("data", "visual", "data_for_visuals.csv")
 
+# Formato con el que se almacenan las fechas en la fuente y en la API
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S%z"
+
+# Días máximos por mes (tabla de búsqueda indexada por mes - 1)
+DIAS_POR_MES = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+REALIZANDO_TRABAJO_MAP = {
+    "si": "SI",
+    "s": "SI",
+    "sin informacion": "SIN INFORMACION",
+    "no": "NO",
+    "n": "NO",
+    "1": "SI",
+}
+
+CATEGORY_PREFIX_REGEX = '^(ind|id|emp|tipo|seg|centro)'
+
+# Columnas temporales que se reemplazan por sus componentes seno/coseno
+TIME_SOURCE_COLS = ["fecha_siniestro_igdacmlmasolicitudes", "hora_at_igatepmafurat", "horas_previo_at_igatepmafurat"]
+CYCLIC_FEATURES = ["fecha_siniestro_month", "fecha_siniestro_day", "hora_siniestro", "hora_previo"]
+
+
+def _as_str(values: pd.Series) -> pd.Series:
+    """
+    Equivalente a `astype(str)` que conserva las columnas `category`: solo convierte sus
+    categorías a texto en lugar de crear un objeto str por registro.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        categories = values.cat.categories.astype(str)
+        if not categories.has_duplicates:
+            values = values.cat.rename_categories(categories)
+            # astype(str) convierte los nulos en el texto 'nan'
+            if values.isna().any():
+                if 'nan' not in values.cat.categories:
+                    values = values.cat.add_categories('nan')
+                values = values.fillna('nan')
+            return values
+    return values.astype(str)
+
+
+def _map_values(values: pd.Series, mapping: dict) -> pd.Series:
+    """
+    `Series.map` con un diccionario; en columnas `category` se mapean las categorías y
+    el resultado sigue siendo `category`.
+    """
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        return values.map(mapping)
+
+    # El código -1 (nulo) toma el último elemento, que es NaN
+    mapped = np.append(values.cat.categories.map(mapping).to_numpy(dtype=object), np.nan)
+    return pd.Series(mapped[values.cat.codes.to_numpy()], index=values.index, name=values.name, dtype='category')
+
+
+def _replace_value(values: pd.Series, old, new) -> pd.Series:
+    """
+    `Series.replace` de un valor que en columnas `category` opera sobre las categorías.
+    """
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        return values.replace(old, new)
+
+    if old not in values.cat.categories:
+        return values
+    if new in values.cat.categories:
+        return values.where(values != old, new).cat.remove_categories(old)
+    return values.cat.rename_categories({old: new})
+
 
 def transform_data(df: pd.DataFrame) -> pd.DataFrame:
 
     # 1. Remapear valores de la columna 'ind_realizando_trabajo_hab_at_igatepmafurat'
-    df['ind_realizando_trabajo_hab_at_igatepmafurat'] = df['ind_realizando_trabajo_hab_at_igatepmafurat'].map(
-        {"si":"SI",
-        "s":"SI",
-        "sin informacion":"SIN INFORMACION",
-        "no":"NO",
-        "n":"NO",
-        "1":"SI"})
+    df['ind_realizando_trabajo_hab_at_igatepmafurat'] = _map_values(df['ind_realizando_trabajo_hab_at_igatepmafurat'], REALIZANDO_TRABAJO_MAP)
 
-    logging.info(f"\tSe han remapeado los valores de la columna 'ind_realizando_trabajo_hab_at_igatepmafurat'.")
+    logger.info(f"\tSe han remapeado los valores de la columna 'ind_realizando_trabajo_hab_at_igatepmafurat'.")
 
     # 2. Ajuste de columnas de categoría
     # Identificar columnas que empiezan con "ind" o "id"
-    cols_to_str = df.filter(regex='^(ind|id|emp|tipo|seg|centro)').columns
+    cols_to_str = df.filter(regex=CATEGORY_PREFIX_REGEX).columns
 
 
-    # Convertir las columnas seleccionadas a tipo str
-    df[cols_to_str] = df[cols_to_str].astype(str)
+    # Convertir las columnas seleccionadas a tipo str (las columnas category conservan su tipo)
+    for col in cols_to_str:
+        df[col] = _as_str(df[col])
 
     # permite reutilizar el código en datasets de entrada para predicción
     if 'origen_igdactmlmacalificacionorigen' in df.columns:
         # Variable a predecir como categórica
-        df['origen_igdactmlmacalificacionorigen'] = df['origen_igdactmlmacalificacionorigen'].astype(str)
+        df['origen_igdactmlmacalificacionorigen'] = _as_str(df['origen_igdactmlmacalificacionorigen'])
 
-    logging.info(f"\tSe han ajustado las columnas de categoría.")
+    logger.info(f"\tSe han ajustado las columnas de categoría.")
 
     # 3. reemplazar valores fuera de s y n 
     columnas_1 = ['dto_igdacmlmasolicitudes', 'pcl_igdacmlmasolicitudes']
     columnas_2 = ['accidente_grave_igatepmafurat', 'riesgo_biologico_igatepmafurat']
 
     # Aplicar reemplazos en las columnas correspondientes
-    df[columnas_1] = df[columnas_1].replace('', 'n')
-    df[columnas_2] = df[columnas_2].replace('0', 'n')
+    for col in columnas_1:
+        df[col] = _replace_value(df[col], '', 'n')
+    for col in columnas_2:
+        df[col] = _replace_value(df[col], '0', 'n')
 
-    logging.info(f"\tSe han imputado los espacios vacíos o ceros en variables binarias.") 
+    logger.info(f"\tSe han imputado los espacios vacíos o ceros en variables binarias.") 
 
     # Guardar en datos para visualización
     # df.to_csv(OUTPUT_DIR, index=False)
@@ -58,7 +122,7 @@ def transform_data(df: pd.DataFrame) -> pd.DataFrame:
 
     df.drop(columns=['fecha_siniestro_igdacmlmasolicitudes'], inplace=True)
 
-    logging.info(f"\tSe han extraído las variables temporales 'mes' y 'día' del siniestro.")
+    logger.info(f"\tSe han extraído las variables temporales 'mes' y 'día' del siniestro.")
 
 
     # 5. Capturar periodicidad en variables temporales
@@ -68,12 +132,8 @@ def transform_data(df: pd.DataFrame) -> pd.DataFrame:
     df["fecha_siniestro_month_cos"] = np.cos(2 * np.pi * (df["fecha_siniestro_month"] - 1) / 12)
 
     # Ciclo variable de días según el mes (1-31)
-    dias_por_mes = np.array([
-        31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31
-    ])
-
     # Mapear días máximos según el mes
-    dias_maximos = df["fecha_siniestro_month"].map(lambda x: dias_por_mes[x - 1])
+    dias_maximos = df["fecha_siniestro_month"].map(lambda x: DIAS_POR_MES[x - 1])
 
     # Calcular seno y coseno ajustado al mes
     df["fecha_siniestro_day_sin"] = np.sin(2 * np.pi * (df["fecha_siniestro_day"] - 1) / dias_maximos)
@@ -92,8 +152,80 @@ def transform_data(df: pd.DataFrame) -> pd.DataFrame:
     # Remover columnas originales
     df.drop(columns=["fecha_siniestro_month", "fecha_siniestro_day", "hora_at_igatepmafurat","horas_previo_at_igatepmafurat"], inplace=True)
     
-    logging.info(f"\tSe han capturado las periodicidades en las variables temporales con seno y coseno.") 
+    logger.info(f"\tSe han capturado las periodicidades en las variables temporales con seno y coseno.") 
 
 
     return df
 
+
+def _parse_fecha_siniestro(fecha: pd.Series) -> pd.Series:
+    """
+    Convierte la fecha del siniestro a datetime usando el formato explícito de la fuente.
+    Si la columna ya es datetime no se vuelve a procesar; si el formato no coincide se
+    recurre a la inferencia de `pd.to_datetime`, igual que en `transform_data`.
+    """
+    if pd.api.types.is_datetime64_any_dtype(fecha):
+        return fecha
+
+    try:
+        return pd.to_datetime(fecha, format=DATE_FORMAT, cache=True)
+    except (ValueError, TypeError):
+        return pd.to_datetime(fecha, cache=True)
+
+
+def transform_data_inference(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Variante de `transform_data` para el camino de predicción.
+
+    Produce la misma salida que `transform_data`, pero no modifica el DataFrame
+    de entrada, no registra mensajes y calcula todas las variables cíclicas
+    (seno y coseno) en un único bloque de numpy.
+    """
+    category_prefix = re.compile(CATEGORY_PREFIX_REGEX)
+    columnas_1 = {'dto_igdacmlmasolicitudes', 'pcl_igdacmlmasolicitudes'}
+    columnas_2 = {'accidente_grave_igatepmafurat', 'riesgo_biologico_igatepmafurat'}
+
+    # 1-3. Remapeo, columnas de categoría y binarias en una sola pasada por columna
+    columns = {}
+    for col in df.columns:
+        if col in TIME_SOURCE_COLS:
+            continue
+
+        values = df[col]
+        if col == 'ind_realizando_trabajo_hab_at_igatepmafurat':
+            values = _map_values(values, REALIZANDO_TRABAJO_MAP)
+        if category_prefix.search(col) or col == 'origen_igdactmlmacalificacionorigen':
+            values = _as_str(values)
+        if col in columnas_1:
+            values = _replace_value(values, '', 'n')
+        elif col in columnas_2:
+            values = _replace_value(values, '0', 'n')
+
+        columns[col] = values
+
+    # 4. Mes y día del siniestro
+    fecha = _parse_fecha_siniestro(df['fecha_siniestro_igdacmlmasolicitudes'])
+    month = fecha.dt.month.to_numpy()
+    day = fecha.dt.day.to_numpy()
+
+    # 5. Periodicidad: una fila por variable cíclica (mes, día, hora, hora previa)
+    numerador = np.vstack([
+        month - 1,
+        day - 1,
+        df['hora_at_igatepmafurat'].to_numpy(),
+        df['horas_previo_at_igatepmafurat'].to_numpy(),
+    ]).astype(np.float64)
+
+    denominador = np.empty_like(numerador)
+    denominador[0] = 12
+    denominador[1] = DIAS_POR_MES[month - 1]
+    denominador[2:] = 24
+
+    angulos = 2 * np.pi * numerador / denominador
+    senos, cosenos = np.sin(angulos), np.cos(angulos)
+
+    for i, feature in enumerate(CYCLIC_FEATURES):
+        columns[f"{feature}_sin"] = senos[i]
+        columns[f"{feature}_cos"] = cosenos[i]
+
+    return pd.DataFrame(columns, index=df.index)
@@ -6,10 +6,31 @@ from sklearn.impute import SimpleImputer
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
+from sklearn.preprocessing import normalize
 from imblearn.under_sampling import RandomUnderSampler
 from imblearn.over_sampling import SMOTE
+from sklearn.metrics.pairwise import pairwise_distances_chunked
+from sklearn.random_projection import SparseRandomProjection
+from joblib import Parallel, delayed, parallel_config
+from threadpoolctl import threadpool_limits
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+import scipy.sparse
 import joblib
+import hashlib
+import json
+import logging
+import time
+
+try:
+    from .data_profiling import column_stat
+    from .text_normalization import normalize_text, tokenize
+except ImportError:
+    from data_profiling import column_stat
+    from text_normalization import normalize_text, tokenize
+
+logger = logging.getLogger(__name__)
 
 class HighCardinalityEncoder(BaseEstimator, TransformerMixin):
     def __init__(self, high_cardinality_cols):
@@ -17,17 +38,213 @@ class HighCardinalityEncoder(BaseEstimator, TransformerMixin):
         self.mappings = {}
 
     def fit(self, X, y=None):
+        self.n_samples_ = {}
         for col in self.high_cardinality_cols:
             self.mappings[col] = X[col].value_counts(normalize=True).to_dict()
+            self.n_samples_[col] = int(X[col].count())
         return self
 
-    def transform(self, X):
-        X = X.copy()
+    def partial_fit(self, X, y=None):
+        """
+        Actualiza las frecuencias con datos nuevos sin volver a recorrer el histórico.
+        """
+        if not self.mappings:
+            return self.fit(X)
+
         for col in self.high_cardinality_cols:
-            X[col + '_freq'] = X[col].map(lambda x: self.mappings[col].get(x, 0))
-        return X.drop(columns=self.high_cardinality_cols)
+            n_old = self.n_samples_[col]
+            counts = pd.Series(self.mappings[col], dtype=float) * n_old
+            counts = counts.add(X[col].value_counts(), fill_value=0)
+
+            self.n_samples_[col] = n_old + int(X[col].count())
+            self.mappings[col] = (counts / self.n_samples_[col]).to_dict()
+        return self
+
+    def __sklearn_is_fitted__(self):
+        return bool(self.mappings)
+
+    def transform(self, X):
+        # Mapeo vectorizado; acepta columnas object y category
+        frequencies = {
+            col + '_freq': X[col].map(self.mappings[col]).astype(float).fillna(0)
+            for col in self.high_cardinality_cols
+        }
+        # El resultado se arma en un solo paso con las columnas restantes de X y las frecuencias
+        # (drop + assign copiaba el DataFrame dos veces)
+        kept_cols = [col for col in X.columns if col not in self.high_cardinality_cols]
+        return pd.concat([X[kept_cols], pd.DataFrame(frequencies, index=X.index)], axis=1, copy=False)
+
+class DtypeCaster(BaseEstimator, TransformerMixin):
+    """
+    Convierte la salida de una rama del pipeline al tipo numérico indicado.
+    Permite generar matrices float32 de extremo a extremo.
+    """
+    def __init__(self, dtype=np.float64):
+        self.dtype = dtype
+
+    def fit(self, X, y=None):
+        return self
 
-def detect_column_types(df, target_col, high_cardinality_threshold=20):
+    def __sklearn_is_fitted__(self):
+        # No tiene estado que ajustar
+        return True
+
+    def transform(self, X):
+        return X.astype(self.dtype)
+
+class TimedPipeline(Pipeline):
+    """
+    Pipeline de una rama del ColumnTransformer que registra en `timings_` el tiempo de
+    ajuste y el ancho de su salida. El tiempo de transformación solo se registra si se activa
+    con `time_transforms` (ver `enable_transform_timings`): el pipeline ajustado se comparte
+    entre las peticiones de la API y no debe modificarse en cada `transform`.
+    Con el backend de procesos (loky) los tiempos de transformación quedan en los procesos
+    hijos; con el secuencial o el de hilos se acumulan en el objeto.
+    """
+    time_transforms = False
+
+    def _record(self, stage, start, Xt, n_rows):
+        elapsed = time.perf_counter() - start
+        timings = getattr(self, "timings_", None) or {
+            "fit_seconds": 0.0, "fit_rows": 0,
+            "transform_seconds": 0.0, "transform_calls": 0, "transform_rows": 0, "last_transform_seconds": 0.0,
+        }
+        if stage == "fit":
+            timings.update(fit_seconds=elapsed, fit_rows=n_rows)
+        else:
+            timings["transform_seconds"] += elapsed
+            timings["transform_calls"] += 1
+            timings["transform_rows"] += n_rows
+            timings["last_transform_seconds"] = elapsed
+        if Xt is not None:
+            timings["output_width"] = Xt.shape[1]
+        self.timings_ = timings
+
+    def fit(self, X, y=None, **params):
+        start = time.perf_counter()
+        super().fit(X, y, **params)
+        self._record("fit", start, None, len(X))
+        return self
+
+    def fit_transform(self, X, y=None, **params):
+        start = time.perf_counter()
+        Xt = super().fit_transform(X, y, **params)
+        self._record("fit", start, Xt, len(X))
+        return Xt
+
+    def transform(self, X, **params):
+        start = time.perf_counter()
+        if params:
+            Xt = super().transform(X, **params)
+        else:
+            # Sin metadatos que enrutar se aplican los pasos directamente: `Pipeline.transform`
+            # crea una clase nueva en cada llamada (`process_routing`), costo que paga cada petición
+            Xt = X
+            for _, _, step in self._iter():
+                Xt = step.transform(Xt)
+        if self.time_transforms:
+            self._record("transform", start, Xt, len(X))
+        return Xt
+
+def enable_transform_timings(pipeline, enabled=True):
+    """
+    Activa (o desactiva) el registro del tiempo de transformación en las ramas TimedPipeline.
+    Está desactivado por omisión, que es lo que usa la API.
+    """
+    for branch in pipeline.named_steps['features'].named_transformers_.values():
+        # Por atributo y no por clase: el pipeline puede haberse guardado importando este módulo
+        # como `feature_engineering` y cargado como `data_preprocessing.feature_engineering`
+        if hasattr(branch, "time_transforms"):
+            branch.time_transforms = enabled
+    return pipeline
+
+def branch_timings(pipeline):
+    """
+    Tiempos y ancho de salida de cada rama del ColumnTransformer (solo ramas TimedPipeline).
+    """
+    column_transformer = pipeline.named_steps['features']
+    rows = [
+        {"branch": name, **branch.timings_}
+        for name, branch in column_transformer.named_transformers_.items()
+        if getattr(branch, "timings_", None)
+    ]
+    return pd.DataFrame(rows)
+
+@contextmanager
+def parallel_branches(backend="loky", max_threads_per_branch=None):
+    """
+    Configura cómo se ejecutan en paralelo las ramas del ColumnTransformer (`n_jobs`).
+    `max_threads_per_branch` limita los hilos de BLAS/OpenMP de cada rama para evitar
+    sobresuscripción: con loky se aplica en cada proceso hijo y con hilos en todo el proceso.
+    """
+    with ExitStack() as stack:
+        if backend == "loky":
+            stack.enter_context(parallel_config(backend=backend, inner_max_num_threads=max_threads_per_branch))
+        else:
+            stack.enter_context(parallel_config(backend=backend))
+            if max_threads_per_branch is not None:
+                stack.enter_context(threadpool_limits(limits=max_threads_per_branch))
+        yield
+
+class HashingTfidfVectorizer(BaseEstimator, TransformerMixin):
+    """
+    TF-IDF sobre un espacio de hashing de tamaño fijo.
+
+    No necesita construir ni guardar un vocabulario: el único estado es el conteo de
+    documentos por columna, que se puede acumular por bloques con `partial_fit`.
+    En predicción solo se usa el vector `idf_` (n_features valores).
+    """
+    def __init__(self, n_features=2**12, ngram_range=(1, 1), chunk_size=10000, dtype=np.float64):
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.chunk_size = chunk_size
+        self.dtype = dtype
+
+    def _hash(self, X):
+        vectorizer = HashingVectorizer(n_features=self.n_features, ngram_range=self.ngram_range,
+                                       preprocessor=normalize_text, tokenizer=tokenize, token_pattern=None,
+                                       alternate_sign=False, norm=None, dtype=self.dtype)
+        return vectorizer.transform(X)
+
+    def _update_idf(self):
+        # Misma fórmula que TfidfVectorizer con smooth_idf=True
+        idf = np.log((1 + self.n_documents_) / (1 + self.document_frequency_)) + 1
+        self.idf_ = idf.astype(self.dtype)
+
+    def partial_fit(self, X, y=None):
+        """
+        Acumula las frecuencias de documento de un bloque de textos.
+        """
+        if not hasattr(self, "document_frequency_"):
+            self.document_frequency_ = np.zeros(self.n_features, dtype=np.int64)
+            self.n_documents_ = 0
+
+        counts = self._hash(X)
+        counts.sum_duplicates()
+        self.document_frequency_ += np.bincount(counts.indices, minlength=self.n_features)
+        self.n_documents_ += counts.shape[0]
+        self._update_idf()
+        return self
+
+    def fit(self, X, y=None):
+        for attr in ("document_frequency_", "n_documents_", "idf_"):
+            self.__dict__.pop(attr, None)
+
+        for start in range(0, len(X), self.chunk_size):
+            chunk = X.iloc[start:start + self.chunk_size] if hasattr(X, "iloc") else X[start:start + self.chunk_size]
+            self.partial_fit(chunk)
+        return self
+
+    def transform(self, X):
+        counts = self._hash(X)
+        counts.data *= self.idf_[counts.indices]
+        return normalize(counts, norm="l2", copy=False)
+
+def detect_column_types(df, target_col, high_cardinality_threshold=20, profile=None):
+    """
+    Clasifica las columnas en numéricas, categóricas, de alta cardinalidad y texto.
+    Con `profile` la cardinalidad se toma del perfil de datos en lugar de recorrer cada columna.
+    """
     text_col = "descripcion_at_igatepmafurat"
 
     categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
@@ -35,31 +252,63 @@ def detect_column_types(df, target_col, high_cardinality_threshold=20):
 
     exclude_cols = {text_col, target_col}
     categorical_cols = [col for col in categorical_cols if col not in exclude_cols]
+    numerical_cols = [col for col in numerical_cols if col not in exclude_cols]
 
-    high_cardinality_cols = [col for col in categorical_cols if df[col].nunique() > high_cardinality_threshold]
+    def cardinality(col):
+        n_unique = column_stat(profile, col, "n_unique")
+        return df[col].nunique() if n_unique is None else n_unique
+
+    high_cardinality_cols = [col for col in categorical_cols if cardinality(col) > high_cardinality_threshold]
 
     categorical_cols = [col for col in categorical_cols if col not in high_cardinality_cols]
 
     return numerical_cols, categorical_cols, high_cardinality_cols, text_col
 
-def create_feature_engineering_pipeline(df):
-    numerical_cols, categorical_cols, high_cardinality_cols, text_col = detect_column_types(df, target_col='origen_igdactmlmacalificacionorigen')
+def create_text_featurizer(text_featurizer="tfidf", dtype=np.float64, hashing_n_features=2**12):
+    """
+    Devuelve el vectorizador de la rama de texto:
+    - "tfidf": TfidfVectorizer con vocabulario de 200 términos.
+    - "hashing": HashingTfidfVectorizer, sin vocabulario y ajustable por bloques.
+    Ambos normalizan el texto con `text_normalization`, igual que `clean_data`, de modo que
+    las descripciones que llegan sin limpiar a la API se procesan como en el entrenamiento.
+    """
+    if text_featurizer == "tfidf":
+        return TfidfVectorizer(max_features=200, dtype=dtype, preprocessor=normalize_text,
+                               tokenizer=tokenize, token_pattern=None)
+    if text_featurizer == "hashing":
+        return HashingTfidfVectorizer(n_features=hashing_n_features, dtype=dtype)
+
+    raise ValueError(f"Vectorizador de texto {text_featurizer} no soportado")
 
-    numeric_transformer = Pipeline(steps=[
+def create_feature_engineering_pipeline(df, dtype=np.float64, text_featurizer="tfidf", hashing_n_features=2**12, profile=None, n_jobs=None):
+    """
+    Construye el pipeline de ingeniería de características.
+    `dtype` define el tipo de la matriz de salida (np.float32 reduce la memoria a la mitad),
+    `text_featurizer` el vectorizador de la descripción ("tfidf" o "hashing") y `profile`
+    el perfil de `df` (las mismas filas, ver `data_profiling.profile_rows`) usado para detectar
+    columnas de alta cardinalidad.
+    Con `n_jobs` las cuatro ramas se ajustan y transforman en paralelo (ver `parallel_branches`).
+    Cada rama es un TimedPipeline que registra sus tiempos de ajuste (ver `branch_timings`).
+    """
+    numerical_cols, categorical_cols, high_cardinality_cols, text_col = detect_column_types(df, target_col='origen_igdactmlmacalificacionorigen', profile=profile)
+
+    numeric_transformer = TimedPipeline(steps=[
+        ('cast', DtypeCaster(dtype)),
         ('scaler', StandardScaler())
     ])
 
-    categorical_transformer = Pipeline(steps=[
+    categorical_transformer = TimedPipeline(steps=[
         ('imputer', SimpleImputer(strategy='constant', fill_value='missing')),
-        ('onehot', OneHotEncoder(handle_unknown='ignore'))
+        ('onehot', OneHotEncoder(handle_unknown='ignore', dtype=dtype))
     ])
 
-    high_cardinality_transformer = Pipeline(steps=[
-        ('high_cardinality', HighCardinalityEncoder(high_cardinality_cols))
+    high_cardinality_transformer = TimedPipeline(steps=[
+        ('high_cardinality', HighCardinalityEncoder(high_cardinality_cols)),
+        ('cast', DtypeCaster(dtype))
     ])
 
-    text_transformer = Pipeline(steps=[
-        ('tfidf', TfidfVectorizer(max_features=200))
+    text_transformer = TimedPipeline(steps=[
+        ('tfidf', create_text_featurizer(text_featurizer, dtype, hashing_n_features))
     ])
 
     feature_engineering = ColumnTransformer(
@@ -69,7 +318,8 @@ def create_feature_engineering_pipeline(df):
             ('high_card', high_cardinality_transformer, high_cardinality_cols),
             ('text', text_transformer, text_col),
         ],
-        remainder='drop'
+        remainder='drop',
+        n_jobs=n_jobs
     )
 
     preprocessing_pipeline = Pipeline(steps=[
@@ -83,19 +333,75 @@ def split_data(df, target_column, test_size=0.2, val_size=0.1, random_state=42):
     train_df, val_df = train_test_split(train_df, test_size=val_size / (1 - test_size), random_state=random_state)
     return train_df, val_df, test_df
 
+def split_indices(y, test_size=0.2, val_size=0.1, random_state=42, stratify=True, output_path=None):
+    """
+    Calcula una sola vez los índices posicionales de train/val/test, estratificados por `y`.
+    Los consumidores toman cada partición con `df.iloc[indices[...]]` solo cuando la necesitan,
+    en lugar de mantener copias de cada partición del DataFrame.
+    """
+    labels = np.asarray(y)
+    positions = np.arange(len(labels))
+
+    train_idx, test_idx = train_test_split(
+        positions, test_size=test_size, random_state=random_state, stratify=labels if stratify else None
+    )
+    train_idx, val_idx = train_test_split(
+        train_idx, test_size=val_size / (1 - test_size), random_state=random_state,
+        stratify=labels[train_idx] if stratify else None
+    )
+
+    indices = {"train": train_idx, "val": val_idx, "test": test_idx}
+
+    if output_path is not None:
+        save_split_indices(indices, output_path, y=y)
+
+    return indices
+
+def split_fingerprint(y):
+    """
+    Huella del objetivo (valores, orden e índice) sobre el que se calcularon los índices de partición.
+    """
+    y = y if isinstance(y, pd.Series) else pd.Series(np.asarray(y))
+    return hashlib.sha1(pd.util.hash_pandas_object(y, index=True).values.tobytes()).hexdigest()
+
+def save_split_indices(indices, path, y=None):
+    # Con `y` se guardan el número de filas y la huella, para detectar índices de otros datos
+    extra = {} if y is None else {"n_rows": len(y), "fingerprint": split_fingerprint(y)}
+    np.savez(path, **indices, **extra)
+
+def load_split_indices(path, y=None):
+    """
+    Carga los índices guardados. Con `y` devuelve None si no corresponden a ese objetivo
+    (otro número de filas, otro orden o un archivo sin huella).
+    """
+    with np.load(path) as saved:
+        if y is not None and ("fingerprint" not in saved or int(saved["n_rows"]) != len(y)
+                              or str(saved["fingerprint"]) != split_fingerprint(y)):
+            return None
+        return {name: saved[name] for name in ("train", "val", "test")}
+
+def load_or_split_indices(y, path=None, **kwargs):
+    """
+    Reutiliza los índices de `path` si se calcularon sobre el mismo `y`; si no (p. ej. tras
+    volver a limpiar los datos), los recalcula y los sobrescribe.
+    """
+    if path is not None and Path(path).exists():
+        indices = load_split_indices(path, y)
+        if indices is not None:
+            return indices
+        logger.warning(f"⚠️ Los índices de partición de {path} no corresponden a los datos actuales; se recalculan.")
+    return split_indices(y, output_path=path, **kwargs)
+
 def check_dimensions(X_train, X_val, X_test):
     min_features = min(X_train.shape[1], X_val.shape[1], X_test.shape[1])
     return X_train[:, :min_features], X_val[:, :min_features], X_test[:, :min_features]
 
 
-def balance_classes(X_train, y_train):
+def _undersample_majority(X_train, y_train):
     """
-    Balancea las clases de un conjunto de datos.
-    Se aplica un undersampling a la clase mayoritaria y un oversampling a las clases minoritarias.
-    de la siguiente manera:
-    1. Se reduce la clase mayoritaria al tamaño de la segunda clase mayoritaria.
-    2. Se aumenta el tamaño de las clases minoritarias al 25% del tamaño de la segunda clase mayoritaria.
-
+    Reduce la clase mayoritaria al tamaño de la segunda clase mayoritaria.
+    Devuelve los datos submuestreados y el tamaño objetivo de las clases minoritarias
+    (25% de la segunda clase mayoritaria).
     """
     class_counts = np.bincount(y_train)
     sorted_counts = np.sort(class_counts)[::-1]
@@ -106,7 +412,6 @@ def balance_classes(X_train, y_train):
     second_majority_count = sorted_counts[1]
     minority_target_size = int(second_majority_count * 0.25)
 
-    # 1. Reducir la clase mayoritaria al tamaño de la segunda mayoritaria
     target_counts = {
         cls: second_majority_count if count == sorted_counts[0] else count
         for cls, count in enumerate(class_counts)
@@ -115,9 +420,23 @@ def balance_classes(X_train, y_train):
     under_sampler = RandomUnderSampler(sampling_strategy=target_counts, random_state=42)
     X_train_resampled, y_train_resampled = under_sampler.fit_resample(X_train, y_train)
 
+    return X_train_resampled, y_train_resampled, minority_target_size
+
+
+def balance_classes(X_train, y_train):
+    """
+    Balancea las clases de un conjunto de datos.
+    Se aplica un undersampling a la clase mayoritaria y un oversampling a las clases minoritarias.
+    de la siguiente manera:
+    1. Se reduce la clase mayoritaria al tamaño de la segunda clase mayoritaria.
+    2. Se aumenta el tamaño de las clases minoritarias al 25% del tamaño de la segunda clase mayoritaria.
+
+    """
+    # 1. Reducir la clase mayoritaria al tamaño de la segunda mayoritaria
+    X_train_resampled, y_train_resampled, minority_target_size = _undersample_majority(X_train, y_train)
+
     # 2. Recalcular las clases después del undersampling
     new_class_counts = np.bincount(y_train_resampled)
-    second_majority_count = sorted(new_class_counts)[-2]
 
     # 3. Ajustar SMOTE dinámicamente
     smote_strategy = {}
@@ -134,34 +453,198 @@ def balance_classes(X_train, y_train):
     return X_train_resampled, pd.Series(y_train_resampled)
 
 
+def _class_neighbors(X_class, k_neighbors, approximate=False, n_components=64, working_memory=None, random_state=42):
+    """
+    Calcula los k vecinos más cercanos (distancia euclidiana) de cada fila dentro de una clase,
+    excluyendo la propia fila. Las distancias se calculan por bloques de tamaño acotado por
+    `working_memory` (MB). Con `approximate=True` las filas se proyectan antes a `n_components`
+    dimensiones densas con una proyección aleatoria dispersa.
+    """
+    if approximate and X_class.shape[1] > n_components:
+        projection = SparseRandomProjection(n_components=n_components, dense_output=True, random_state=random_state)
+        X_class = projection.fit_transform(X_class)
+
+    def top_k(distances, start):
+        rows = np.arange(distances.shape[0])
+        distances[rows, start + rows] = np.inf
+        nearest = np.argpartition(distances, k_neighbors - 1, axis=1)[:, :k_neighbors]
+        order = np.argsort(np.take_along_axis(distances, nearest, axis=1), axis=1)
+        return np.take_along_axis(nearest, order, axis=1)
+
+    blocks = pairwise_distances_chunked(X_class, reduce_func=top_k, working_memory=working_memory)
+    return np.vstack(list(blocks))
+
+
+def _oversample_class(X_class, n_new, k_neighbors, random_state, **neighbor_kwargs):
+    """
+    Genera `n_new` muestras sintéticas al estilo SMOTE: cada muestra se interpola entre una fila
+    de la clase y uno de sus vecinos.
+    """
+    neighbors = _class_neighbors(X_class, k_neighbors, random_state=random_state, **neighbor_kwargs)
+
+    rng = np.random.default_rng(random_state)
+    rows = rng.integers(0, X_class.shape[0], size=n_new)
+    neighbor_rows = neighbors[rows, rng.integers(0, k_neighbors, size=n_new)]
+    gaps = rng.random(n_new).astype(X_class.dtype)
+
+    base = X_class[rows]
+    return base + scipy.sparse.diags(gaps) @ (X_class[neighbor_rows] - base)
+
+
+def _balance_cache_key(X, y, params):
+    digest = hashlib.sha1()
+    for array in (X.data, X.indices, X.indptr, np.asarray(y)):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    digest.update(json.dumps({"shape": X.shape, "dtype": str(X.dtype), **params}, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def balance_classes_scalable(X_train, y_train, k_neighbors=5, n_jobs=-1, approximate=False, n_components=64,
+                             working_memory=None, random_state=42, cache_dir=None):
+    """
+    Variante de `balance_classes` para matrices dispersas grandes.
+
+    Aplica el mismo submuestreo de la clase mayoritaria y lleva las clases minoritarias al
+    25% de la segunda clase mayoritaria, pero:
+    - usa un k por clase (min(k_neighbors, n_clase - 1)),
+    - busca vecinos por bloques de memoria acotada (o aproximados con `approximate=True`),
+    - procesa las clases en paralelo (`n_jobs`),
+    - si se indica `cache_dir`, guarda el resultado con una llave derivada del contenido de la
+      entrada y de la estrategia, y lo reutiliza en ejecuciones posteriores.
+    """
+    X_train = scipy.sparse.csr_matrix(X_train)
+    y_train = np.asarray(y_train)
+    params = {
+        "strategy": "scalable_smote", "k_neighbors": k_neighbors, "approximate": approximate,
+        "n_components": n_components, "random_state": random_state,
+    }
+
+    if cache_dir is not None:
+        cache_dir = Path(cache_dir)
+        key = _balance_cache_key(X_train, y_train, params)
+        X_cache, y_cache = cache_dir / f"balanced_{key}.npz", cache_dir / f"balanced_{key}_y.npy"
+        if X_cache.exists() and y_cache.exists():
+            logger.info(f"\tBalanceo recuperado de la caché: {X_cache.name}")
+            return scipy.sparse.load_npz(X_cache), pd.Series(np.load(y_cache))
+
+    # 1. Reducir la clase mayoritaria al tamaño de la segunda mayoritaria
+    X_resampled, y_resampled, minority_target_size = _undersample_majority(X_train, y_train)
+    X_resampled = scipy.sparse.csr_matrix(X_resampled)
+
+    # 2. Sobremuestrear cada clase minoritaria con su propio k, en paralelo
+    tasks = []
+    for cls, count in enumerate(np.bincount(y_resampled)):
+        if count < minority_target_size and count >= 2:
+            tasks.append((cls, minority_target_size - count, min(k_neighbors, count - 1)))
+
+    synthetic = Parallel(n_jobs=n_jobs)(
+        delayed(_oversample_class)(
+            X_resampled[y_resampled == cls], n_new, k, random_state + cls,
+            approximate=approximate, n_components=n_components, working_memory=working_memory,
+        )
+        for cls, n_new, k in tasks
+    )
+
+    if tasks:
+        X_resampled = scipy.sparse.vstack([X_resampled, *synthetic], format="csr")
+        y_resampled = np.concatenate([y_resampled] + [np.full(n_new, cls) for cls, n_new, _ in tasks])
+
+    if cache_dir is not None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        scipy.sparse.save_npz(X_cache, X_resampled)
+        np.save(y_cache, y_resampled)
 
-def transform_and_split_data(df, target_column='origen_igdactmlmacalificacionorigen'):
-    train_df, val_df, test_df = split_data(df, target_column)
+    return X_resampled, pd.Series(y_resampled)
 
-    X_train, y_train = train_df.drop(columns=[target_column]), train_df[target_column]
-    X_val, y_val = val_df.drop(columns=[target_column]), val_df[target_column]
-    X_test, y_test = test_df.drop(columns=[target_column]), test_df[target_column]
 
-    # Codificar y si es categórico
+PIPELINE_PATH = './trained_pipelines/transformation_pipeline.pkl'
+
+
+def encode_targets(y, indices):
+    """
+    Toma la variable objetivo de cada partición y la codifica si es categórica.
+    """
+    y_train, y_val, y_test = (y.iloc[indices[name]] for name in ("train", "val", "test"))
+
     if y_train.dtype == 'object' or y_train.dtype.name == 'category':
         label_encoder = LabelEncoder()
         y_train = label_encoder.fit_transform(y_train)
         y_val = label_encoder.transform(y_val)
         y_test = label_encoder.transform(y_test)
+    else:
+        y_train, y_val, y_test = y_train.to_numpy(), y_val.to_numpy(), y_test.to_numpy()
+
+    return y_train, y_val, y_test
+
+
+def fit_transformation_pipeline(df, train_indices, dtype=np.float64, text_featurizer="tfidf", profile=None, pipeline_path=PIPELINE_PATH,
+                                n_jobs=None, backend="loky", max_threads_per_branch=None):
+    """
+    Ajusta el pipeline de ingeniería de características sobre la partición de entrenamiento,
+    lo guarda en `pipeline_path` para la API y devuelve el pipeline y la matriz de entrenamiento.
+    Con `n_jobs` las ramas se ajustan en paralelo con el `backend` indicado; el pipeline se
+    guarda sin `n_jobs` para que la API transforme cada registro de forma secuencial.
+    """
+    X_train = df.iloc[train_indices]
+    pipeline = create_feature_engineering_pipeline(X_train, dtype=dtype, text_featurizer=text_featurizer, profile=profile, n_jobs=n_jobs)
+
+    with parallel_branches(backend, max_threads_per_branch):
+        X_train_transformed = pipeline.fit_transform(X_train)
+    pipeline.named_steps['features'].n_jobs = None
 
-    pipeline = create_feature_engineering_pipeline(X_train)
+    timings = branch_timings(pipeline)
+    if not timings.empty:
+        logger.info(f"\tTiempos por rama:\n{timings[['branch', 'fit_seconds', 'output_width']].to_string(index=False)}")
 
-    X_train_transformed = pipeline.fit_transform(X_train)
+    if pipeline_path is not None:
+        joblib.dump(pipeline, pipeline_path)
 
-    # Guardar el pipeline para usarlo en la API
-    joblib.dump(pipeline, './trained_pipelines/transformation_pipeline.pkl')
+    return pipeline, X_train_transformed
 
-    X_val_transformed = pipeline.transform(X_val)
-    X_test_transformed = pipeline.transform(X_test)
+
+def balance_training_data(X_train, y_train, dtype=np.float64, balance_strategy="smote", balance_cache_dir=None,
+                          balance_options=None):
+    """
+    Balanceo mixto (undersampling + oversampling) de la partición de entrenamiento.
+    `balance_options` son los parámetros de `balance_classes_scalable` (k_neighbors, approximate,
+    n_components, n_jobs, working_memory); solo aplican a la estrategia "scalable".
+    """
+    if balance_strategy == "scalable":
+        X_train, y_train = balance_classes_scalable(X_train, y_train, cache_dir=balance_cache_dir,
+                                                    **(balance_options or {}))
+    else:
+        X_train, y_train = balance_classes(X_train, y_train)
+
+    # SMOTE puede devolver float64; se conserva el tipo configurado
+    return X_train.astype(dtype, copy=False), y_train
+
+
+def transform_and_split_data(df, target_column='origen_igdactmlmacalificacionorigen', dtype=np.float64, text_featurizer="tfidf",
+                             balance_strategy="smote", balance_cache_dir=None, split_indices_path=None, profile=None,
+                             pipeline_path=PIPELINE_PATH, balance_options=None):
+    """
+    Particiona, transforma y balancea los datos.
+    La partición se hace por índices (estratificada y opcionalmente guardada en `split_indices_path`);
+    el DataFrame no se copia por partición: el pipeline ignora la columna objetivo y cada partición
+    se toma con `iloc` justo antes de transformarla.
+    """
+    indices = load_or_split_indices(df[target_column], split_indices_path)
+
+    y_train, y_val, y_test = encode_targets(df[target_column], indices)
+
+    pipeline, X_train_transformed = fit_transformation_pipeline(
+        df, indices["train"], dtype=dtype, text_featurizer=text_featurizer, profile=profile, pipeline_path=pipeline_path
+    )
+
+    X_val_transformed = pipeline.transform(df.iloc[indices["val"]])
+    X_test_transformed = pipeline.transform(df.iloc[indices["test"]])
 
     X_train_transformed, X_val_transformed, X_test_transformed = check_dimensions(X_train_transformed, X_val_transformed, X_test_transformed)
 
-    # Balanceo mixto (undersampling + oversampling)
-    X_train_transformed, y_train = balance_classes(X_train_transformed, y_train)
+    X_train_transformed, y_train = balance_training_data(
+        X_train_transformed, y_train, dtype=dtype, balance_strategy=balance_strategy, balance_cache_dir=balance_cache_dir,
+        balance_options=balance_options
+    )
+
+    return X_train_transformed, pd.Series(y_train), X_val_transformed, pd.Series(y_val), X_test_transformed, pd.Series(y_test)
 
-    return X_train_transformed, pd.Series(y_train), X_val_transformed, pd.Series(y_val), X_test_transformed, pd.Series(y_test)
\ No newline at end of file
@@ -0,0 +1,204 @@
+import argparse
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+logger = logging.getLogger(__name__)
+
+PIPELINE_DIR = Path(__file__).resolve().parent.joinpath("trained_pipelines")
+MANIFEST_NAME = "pipeline_versions.json"
+
+
+def _rows_seen(column_transformer):
+    """
+    Número de registros con que se ajustó el pipeline, tomado del StandardScaler de la rama numérica.
+    """
+    for _, branch, _ in column_transformer.transformers_:
+        steps = branch.steps if isinstance(branch, Pipeline) else [(None, branch)]
+        for _, step in steps:
+            if isinstance(step, StandardScaler):
+                return int(np.max(step.n_samples_seen_))
+
+    raise ValueError("No se pudo determinar cuántos registros se usaron para ajustar el pipeline.")
+
+
+def _extend_categories(encoder, X):
+    """
+    Devuelve un OneHotEncoder nuevo con las mismas opciones y, al final de cada lista de
+    categorías, las categorías nuevas de `X`, de modo que las columnas existentes conservan su
+    posición. Se construye solo con la API pública (`categories=`), igual en todas las versiones
+    de scikit-learn.
+    """
+    params = encoder.get_params()
+    if params.get("min_frequency") is not None or params.get("max_categories") is not None:
+        # Las categorías poco frecuentes dependen de los conteos de todo el histórico
+        raise ValueError("Un OneHotEncoder con categorías poco frecuentes no soporta actualización incremental.")
+
+    values = np.asarray(X, dtype=object)
+    categories = []
+    for i, known in enumerate(encoder.categories_):
+        seen = set(known)
+        new = [value for value in pd.unique(values[:, i]) if value not in seen and not pd.isna(value)]
+        if new:
+            logger.info(f"\tCategorías nuevas en la columna {i}: {new}")
+        categories.append(np.concatenate([known, np.array(new, dtype=known.dtype)]))
+
+    # Se ajusta con la misma entrada que el original (DataFrame o arreglo), para conservar los nombres
+    return OneHotEncoder(**{**params, "categories": categories}).fit(X)
+
+
+def _update_tfidf(vectorizer, texts, n_rows_seen):
+    """
+    Actualiza el IDF del vocabulario existente con los conteos de documentos de los textos nuevos.
+    Las frecuencias previas se recuperan del idf_ guardado (smooth_idf=True).
+    """
+    n_old = getattr(vectorizer, "n_documents_", n_rows_seen)
+    document_frequency = np.rint((1 + n_old) / np.exp(vectorizer.idf_ - 1) - 1)
+
+    present = vectorizer.transform(texts) > 0
+    document_frequency += np.bincount(present.indices, minlength=len(document_frequency))
+
+    n_total = n_old + present.shape[0]
+    vectorizer.idf_ = np.log((1 + n_total) / (1 + document_frequency)) + 1
+    vectorizer.n_documents_ = n_total
+
+
+def _update_step(step, X, n_rows_seen):
+    """
+    Actualiza `step` con los registros nuevos y devuelve el paso actualizado (el mismo objeto,
+    salvo el OneHotEncoder, que se reemplaza).
+    """
+    if isinstance(step, TfidfVectorizer):
+        _update_tfidf(step, X, n_rows_seen)
+    elif isinstance(step, OneHotEncoder):
+        return _extend_categories(step, X)
+    elif hasattr(step, "partial_fit"):
+        # StandardScaler, HighCardinalityEncoder y HashingTfidfVectorizer
+        if hasattr(step, "mappings") and not hasattr(step, "n_samples_"):
+            # Pipelines anteriores no guardaban cuántos registros vieron
+            step.n_samples_ = {col: n_rows_seen for col in step.high_cardinality_cols}
+        step.partial_fit(X)
+    elif step == "passthrough" or not hasattr(step, "fit") or _is_stateless(step):
+        pass
+    else:
+        raise ValueError(f"El paso {type(step).__name__} no soporta actualización incremental.")
+    return step
+
+
+def _is_stateless(step):
+    # Imputación con valor constante y conversión de tipo no dependen de los datos
+    return getattr(step, "strategy", None) == "constant" or type(step).__name__ == "DtypeCaster"
+
+
+def update_pipeline(pipeline, new_df):
+    """
+    Actualiza un pipeline de transformación ya ajustado usando solo los registros nuevos:
+    - StandardScaler: combina media y varianza con `partial_fit`.
+    - HighCardinalityEncoder: combina las frecuencias.
+    - OneHotEncoder: se reemplaza por uno con las categorías nuevas al final.
+    - TF-IDF: actualiza los conteos de documentos del vocabulario existente (o del espacio de hashing).
+
+    El costo depende del tamaño de `new_df`, no del histórico. Si aparecen categorías nuevas
+    cambia el ancho de la salida, por lo que el modelo debe reentrenarse con la nueva versión.
+    """
+    column_transformer = pipeline.named_steps['features']
+    if not isinstance(column_transformer, ColumnTransformer):
+        raise ValueError("Se esperaba un ColumnTransformer en el paso 'features' del pipeline.")
+
+    n_rows_seen = _rows_seen(column_transformer)
+
+    for position, (name, branch, columns) in enumerate(column_transformer.transformers_):
+        if name == 'remainder' or branch == 'drop':
+            continue
+
+        X = new_df[columns]
+        if not isinstance(branch, Pipeline):
+            column_transformer.transformers_[position] = (name, _update_step(branch, X, n_rows_seen), columns)
+            continue
+
+        for i, (step_name, step) in enumerate(branch.steps):
+            step = _update_step(step, X, n_rows_seen)
+            branch.steps[i] = (step_name, step)
+            if i < len(branch.steps) - 1:
+                X = step.transform(X)
+
+    # Recalcular las posiciones de salida de cada rama
+    sample = new_df.iloc[:1]
+    start = 0
+    for name, branch, columns in column_transformer.transformers_:
+        if name == 'remainder' or branch == 'drop':
+            continue
+        width = branch.transform(sample[columns]).shape[1]
+        column_transformer.output_indices_[name] = slice(start, start + width)
+        start += width
+
+    logger.info(f"\tPipeline actualizado con {len(new_df)} registros nuevos ({n_rows_seen} previos).")
+
+    return pipeline
+
+
+def save_pipeline_version(pipeline, n_new_rows, directory=PIPELINE_DIR, base_version=None, promote=False):
+    """
+    Guarda el pipeline como una nueva versión (transformation_pipeline_vNNN.pkl) y la registra en
+    el manifiesto. Con `promote=True` también reemplaza transformation_pipeline.pkl, que usa la API.
+    """
+    directory = Path(directory)
+    manifest_path = directory / MANIFEST_NAME
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else []
+
+    version = max((entry["version"] for entry in manifest), default=0) + 1
+    file_name = f"transformation_pipeline_v{version:03d}.pkl"
+    joblib.dump(pipeline, directory / file_name)
+
+    manifest.append({
+        "version": version,
+        "file": file_name,
+        "base_version": base_version,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "n_new_rows": int(n_new_rows),
+        "n_rows_total": _rows_seen(pipeline.named_steps['features']),
+    })
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+
+    if promote:
+        joblib.dump(pipeline, directory / "transformation_pipeline.pkl")
+
+    logger.info(f"✅ Pipeline guardado como versión {version}: {directory / file_name}")
+
+    return version
+
+
+def main():
+    from data_loader import load_data
+    from data_cleaning import clean_data, optimize_memory
+    from data_transformation import transform_data
+    from logging_setup import configure_logging
+
+    parser = argparse.ArgumentParser(description="Actualiza el pipeline de transformación con datos nuevos.")
+    parser.add_argument("filename", help="Archivo CSV con los registros nuevos (en data/<folder>/).")
+    parser.add_argument("--folder", default="raw")
+    parser.add_argument("--base", default=str(PIPELINE_DIR / "transformation_pipeline.pkl"),
+                        help="Pipeline ajustado que se actualiza.")
+    parser.add_argument("--base-version", type=int, default=None)
+    parser.add_argument("--promote", action="store_true",
+                        help="Reemplaza transformation_pipeline.pkl con la nueva versión.")
+    args = parser.parse_args()
+
+    configure_logging()
+    new_data = transform_data(optimize_memory(clean_data(load_data(args.filename, folder=args.folder))))
+    pipeline = update_pipeline(joblib.load(args.base), new_data)
+    save_pipeline_version(pipeline, len(new_data), directory=Path(args.base).parent,
+                          base_version=args.base_version, promote=args.promote)
+
+
+if __name__ == "__main__":
+    main()
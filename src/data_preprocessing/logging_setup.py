@@ -0,0 +1,143 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+# Variables de entorno: nivel global (LOG_LEVEL=INFO) y niveles por módulo
+# (LOG_LEVELS="data_transformation=WARNING,models.model_search=DEBUG")
+LEVEL_ENV = "LOG_LEVEL"
+MODULE_LEVELS_ENV = "LOG_LEVELS"
+
+# Handlers y listener instalados por configure_logging (para reconfigurar sin duplicar salidas)
+_installed = {"handler": None, "listener": None}
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Deja pasar como máximo `max_records` mensajes por punto de llamada (archivo y línea)
+    cada `interval` segundos. Los descartados se cuentan y se informan en el siguiente
+    mensaje que pase. Los mensajes de nivel `min_level` o superior nunca se limitan.
+    """
+
+    def __init__(self, max_records=10, interval=1.0, min_level=logging.WARNING):
+        super().__init__()
+        self.max_records = max_records
+        self.interval = interval
+        self.min_level = min_level
+        self._windows = {}  # (pathname, lineno) -> [inicio, mensajes, suprimidos]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= self.min_level:
+            return True
+
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window is not None else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.msg} ({suppressed} mensajes suprimidos)"
+                return True
+            if window[1] < self.max_records:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Deja pasar una fracción `rate` de los mensajes por debajo de `min_level`; los de
+    nivel `min_level` o superior siempre pasan.
+    """
+
+    def __init__(self, rate=0.01, min_level=logging.WARNING, seed=None):
+        super().__init__()
+        self.rate = rate
+        self.min_level = min_level
+        self._random = random.Random(seed)
+
+    def filter(self, record):
+        return record.levelno >= self.min_level or self._random.random() < self.rate
+
+
+def _parse_module_levels(text):
+    levels = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        name, _, level = item.partition("=")
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(level=None, module_levels=None, rate_limit=None, sample_rate=None, stream=None, use_queue=True):
+    """
+    Configura el logging de la aplicación. Se llama una vez desde los puntos de entrada
+    (scripts, API); los módulos solo crean su logger con `logging.getLogger(__name__)`.
+
+    - `level`: nivel del logger raíz (por defecto $LOG_LEVEL o INFO).
+    - `module_levels`: niveles por logger, p. ej. {"data_transformation": "WARNING"};
+      se combinan con $LOG_LEVELS.
+    - `rate_limit`: (max_records, interval) para limitar mensajes repetidos por punto de llamada.
+    - `sample_rate`: fracción de mensajes por debajo de WARNING que se conservan.
+    - `use_queue`: el hilo que registra solo encola el mensaje; un QueueListener escribe
+      en `stream` desde otro hilo, sin bloquear el bucle de eventos de la API.
+
+    Devuelve el QueueListener (o None si `use_queue=False`).
+    """
+    root = logging.getLogger()
+    _remove_installed(root)
+
+    root.setLevel(level or os.getenv(LEVEL_ENV, "INFO").upper())
+    levels = _parse_module_levels(os.getenv(MODULE_LEVELS_ENV, ""))
+    levels.update(module_levels or {})
+    for name, module_level in levels.items():
+        logging.getLogger(name).setLevel(module_level)
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    listener = None
+    if use_queue:
+        handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+        listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=True)
+        listener.start()
+    else:
+        handler = output
+
+    # Los filtros se aplican en el hilo que registra, antes de encolar
+    if rate_limit is not None:
+        handler.addFilter(RateLimitFilter(*rate_limit))
+    if sample_rate is not None:
+        handler.addFilter(SamplingFilter(sample_rate))
+
+    root.addHandler(handler)
+    _installed.update(handler=handler, listener=listener)
+    return listener
+
+
+def _remove_installed(root):
+    if _installed["handler"] is not None:
+        root.removeHandler(_installed["handler"])
+    if _installed["listener"] is not None:
+        _installed["listener"].stop()
+    _installed.update(handler=None, listener=None)
+
+
+def shutdown_logging():
+    """
+    Vacía la cola y detiene el listener instalado por configure_logging.
+    """
+    _remove_installed(logging.getLogger())
+
+
+atexit.register(shutdown_logging)
@@ -1,17 +1,69 @@
+import argparse
 import logging
-from data_loader import load_data
-from data_cleaning import clean_data
+from data_loader import BASE_DIR, load_data
+from data_cleaning import clean_data, optimize_memory
 from data_transformation import transform_data
-from feature_engineering import transform_and_split_data
+from feature_engineering import (
+    balance_training_data, check_dimensions, encode_targets, fit_transformation_pipeline,
+    load_or_split_indices,
+)
+from sparse_storage import save_sparse_mmap
+from data_profiling import profile_rows, save_profile
+from stage_runner import Stage, StageRunner, file_signature
+from sampling import sample_namespace, stratified_sample
+from logging_setup import configure_logging
+import numpy as np
 import pandas as pd
 import scipy.sparse
 from pathlib import Path
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
 
 OUTPUT_DIR = Path(__file__).resolve().parent.parent.parent.joinpath("data", "processed")
 
-def save_data(X_train, X_val, X_test, y_train, y_val, y_test, output_dir=OUTPUT_DIR):
+# Salidas intermedias de cada etapa, para reanudar una corrida interrumpida
+CHECKPOINT_DIR = Path(__file__).resolve().parent.parent.parent.joinpath("data", "checkpoints")
+
+INPUT_FILE = "clasificacion_siniestros.csv"
+TARGET_COL = 'origen_igdactmlmacalificacionorigen'
+
+# Tipo de las matrices de características (float32 reduce la memoria a la mitad frente a float64)
+FEATURE_DTYPE = np.float32
+
+# Vectorizador de la descripción: "tfidf" (vocabulario) o "hashing" (sin vocabulario, ajuste por bloques)
+TEXT_FEATURIZER = "tfidf"
+
+# Balanceo de clases: "smote" (imblearn) o "scalable" (k por clase, vecinos por bloques, paralelo por clase)
+BALANCE_STRATEGY = "smote"
+# Parámetros del balanceo "scalable" (ver `balance_classes_scalable`); se pueden cambiar desde la línea de comandos
+BALANCE_OPTIONS = {"k_neighbors": 5, "approximate": False, "n_components": 64, "n_jobs": -1, "working_memory": None}
+BALANCE_CACHE_DIR = Path(__file__).resolve().parent.parent.parent.joinpath("data", "cache")
+
+# Ajuste en paralelo de las ramas del ColumnTransformer (num, cat, high_card, text).
+# Con hilos no se copia el DataFrame a otros procesos; cada rama usa un solo hilo de BLAS/OpenMP.
+BRANCH_N_JOBS = 4
+BRANCH_BACKEND = "threading"
+BRANCH_MAX_THREADS = 1
+
+# Índices de la partición train/val/test (se reutilizan si ya existen)
+SPLIT_INDICES_PATH = OUTPUT_DIR / "split_indices.npz"
+
+# Pipeline ajustado y perfil de los datos (cardinalidad, nulos, cuantiles) que se guarda junto a él
+PIPELINES_DIR = Path(__file__).resolve().parent.joinpath("trained_pipelines")
+PROFILE_PATH = PIPELINES_DIR / "data_profile.json"
+
+# Modo muestra: fracción por clase y mínimo de registros para las clases raras de origen
+SAMPLE_MIN_PER_CLASS = 500
+
+# Formatos en los que se guardan las matrices dispersas
+STORAGE_FORMATS = ("npz", "mmap")
+
+def save_data(X_train, X_val, X_test, y_train, y_val, y_test, output_dir=OUTPUT_DIR, formats=("npz",)):
+    """
+    Guarda los conjuntos procesados. Para matrices dispersas `formats` admite:
+    - "npz": archivo comprimido de scipy (cada consumidor descomprime su propia copia).
+    - "mmap": arreglos .npy sin comprimir que se abren con memoria mapeada y se comparten entre procesos.
+    """
     # Guarda las variables objetivo (y) como CSV
     y_train.to_csv(f"{output_dir}/y_train.csv", index=False)
     y_val.to_csv(f"{output_dir}/y_val.csv", index=False)
@@ -19,37 +71,169 @@ def save_data(X_train, X_val, X_test, y_train, y_val, y_test, output_dir=OUTPUT_
 
     # Guarda los features (X) como Parquet o CSV
     if isinstance(X_train, scipy.sparse.spmatrix):
-        scipy.sparse.save_npz(f"{output_dir}/X_train.npz", X_train)
-        scipy.sparse.save_npz(f"{output_dir}/X_val.npz", X_val)
-        scipy.sparse.save_npz(f"{output_dir}/X_test.npz", X_test)
+        if "npz" in formats:
+            scipy.sparse.save_npz(f"{output_dir}/X_train.npz", X_train)
+            scipy.sparse.save_npz(f"{output_dir}/X_val.npz", X_val)
+            scipy.sparse.save_npz(f"{output_dir}/X_test.npz", X_test)
+        if "mmap" in formats:
+            save_sparse_mmap(X_train, f"{output_dir}/X_train")
+            save_sparse_mmap(X_val, f"{output_dir}/X_val")
+            save_sparse_mmap(X_test, f"{output_dir}/X_test")
     else:
         pd.DataFrame(X_train).to_parquet(f"{output_dir}/X_train.parquet")
         pd.DataFrame(X_val).to_parquet(f"{output_dir}/X_val.parquet")
         pd.DataFrame(X_test).to_parquet(f"{output_dir}/X_test.parquet")
 
-    logging.info(f"✅ Datos guardados en {output_dir}")
+    logger.info(f"✅ Datos guardados en {output_dir}")
 
 
-# def run_data_preprocessing_pipeline()
+def output_paths(namespace="full"):
+    """
+    Rutas de salida de una corrida. Las muestras usan su propio subdirectorio para no
+    sobrescribir los datos procesados ni el pipeline que usa la API.
+    """
+    if namespace == "full":
+        return {
+            "output_dir": OUTPUT_DIR,
+            "checkpoint_dir": CHECKPOINT_DIR,
+            "pipeline_path": PIPELINES_DIR / "transformation_pipeline.pkl",
+            "profile_path": PROFILE_PATH,
+            "split_indices_path": SPLIT_INDICES_PATH,
+        }
+
+    output_dir = OUTPUT_DIR / namespace
+    return {
+        "output_dir": output_dir,
+        "checkpoint_dir": CHECKPOINT_DIR / namespace,
+        "pipeline_path": PIPELINES_DIR / namespace / "transformation_pipeline.pkl",
+        "profile_path": PIPELINES_DIR / namespace / "data_profile.json",
+        "split_indices_path": output_dir / "split_indices.npz",
+    }
+
+
+def _profile(data, indices, profile_path):
+    # Solo la partición de entrenamiento ya transformada: lo mismo que ve detect_column_types
+    profile = profile_rows(data, indices["train"])
+    save_profile(profile, profile_path)
+    logger.info(f"\tPerfil guardado en {profile_path}")
+    return profile
+
+
+def _save(train, X_val, X_test, targets, output_dir):
+    (X_train, y_train), (_, y_val, y_test) = train, targets
+    X_train, X_val, X_test = check_dimensions(X_train, X_val, X_test)
+    save_data(X_train, X_val, X_test, pd.Series(y_train), pd.Series(y_val), pd.Series(y_test),
+              output_dir=output_dir, formats=STORAGE_FORMATS)
+    return X_train
+
+
+def build_stages(input_file=INPUT_FILE, sample_fraction=None, min_per_class=SAMPLE_MIN_PER_CLASS,
+                 balance_strategy=BALANCE_STRATEGY, balance_options=None):
+    """
+    Grafo de etapas del preprocesamiento. La transformación de validación y prueba no
+    depende entre sí, por lo que ambas se ejecutan en paralelo.
+    Con `sample_fraction` todas las etapas corren sobre una muestra estratificada y
+    escriben en el espacio de salida de la muestra (ver `output_paths`).
+    `balance_options` reemplaza valores de BALANCE_OPTIONS para el balanceo "scalable".
+    Los `params` de cada etapa hacen que --resume repita las etapas cuya configuración cambió.
+    """
+    balance_options = {**BALANCE_OPTIONS, **(balance_options or {})}
+    load_params = {"input": file_signature(BASE_DIR / "data" / "raw" / input_file),
+                   "sample_fraction": sample_fraction, "min_per_class": min_per_class}
+    paths = output_paths(sample_namespace(sample_fraction))
+    for directory in (paths["output_dir"], paths["pipeline_path"].parent):
+        directory.mkdir(parents=True, exist_ok=True)
+
+    if sample_fraction is None:
+        load = Stage("load", lambda: load_data(input_file), description="📊 1. Carga de datos.", params=load_params)
+    else:
+        load = Stage("load", lambda: stratified_sample(load_data(input_file), sample_fraction, min_per_class),
+                     description=f"📊 1. Carga de datos (muestra estratificada del {sample_fraction:.0%}).",
+                     params=load_params)
+
+    return [
+        load,
+        Stage("clean", clean_data, inputs=["load"], description="🧹 2. Limpieza de datos."),
+        Stage("optimize", optimize_memory, inputs=["clean"], description="🗜️ Optimización de memoria."),
+        Stage("transform", transform_data, inputs=["optimize"], description="🔄 3. Transformación de datos."),
+        Stage("split", lambda data: load_or_split_indices(data[TARGET_COL], paths["split_indices_path"]), inputs=["transform"],
+              description="✂️ 4. Partición de datos.", params={"split_indices_path": paths["split_indices_path"]}),
+        Stage("profile", lambda data, indices: _profile(data, indices, paths["profile_path"]), inputs=["transform", "split"],
+              description="📋 Perfilado de los datos de entrenamiento.", params={"profile_path": paths["profile_path"]}),
+        Stage("targets", lambda data, indices: encode_targets(data[TARGET_COL], indices), inputs=["transform", "split"],
+              description="🎯 Codificación de la variable objetivo."),
+        Stage("fit_pipeline",
+              lambda data, indices, profile: fit_transformation_pipeline(
+                  data, indices["train"], dtype=FEATURE_DTYPE, text_featurizer=TEXT_FEATURIZER, profile=profile,
+                  pipeline_path=paths["pipeline_path"], n_jobs=BRANCH_N_JOBS, backend=BRANCH_BACKEND,
+                  max_threads_per_branch=BRANCH_MAX_THREADS),
+              inputs=["transform", "split", "profile"], description="🔧 5. Ingeniería de características (entrenamiento).",
+              params={"dtype": FEATURE_DTYPE, "text_featurizer": TEXT_FEATURIZER, "pipeline_path": paths["pipeline_path"]}),
+        Stage("transform_val", lambda data, indices, fitted: fitted[0].transform(data.iloc[indices["val"]]),
+              inputs=["transform", "split", "fit_pipeline"], description="🔧 Transformación de validación."),
+        Stage("transform_test", lambda data, indices, fitted: fitted[0].transform(data.iloc[indices["test"]]),
+              inputs=["transform", "split", "fit_pipeline"], description="🔧 Transformación de prueba."),
+        Stage("balance",
+              lambda fitted, targets: balance_training_data(
+                  fitted[1], targets[0], dtype=FEATURE_DTYPE, balance_strategy=balance_strategy,
+                  balance_cache_dir=BALANCE_CACHE_DIR, balance_options=balance_options),
+              inputs=["fit_pipeline", "targets"], description="⚖️ Balanceo de clases.",
+              params={"dtype": FEATURE_DTYPE, "balance_strategy": balance_strategy,
+                      "balance_options": balance_options if balance_strategy == "scalable" else {}}),
+        Stage("save", lambda *outputs: _save(*outputs, paths["output_dir"]),
+              inputs=["balance", "transform_val", "transform_test", "targets"], checkpoint=False,
+              description="📦 6. Guardando datos procesados.",
+              params={"output_dir": paths["output_dir"], "formats": STORAGE_FORMATS}),
+    ]
 
-logging.info("Iniciando pipeline de preprocesamiento...")
 
-logging.info(f"📊 1. Carga de datos.")
-data = load_data("clasificacion_siniestros.csv")
-logging.info(f"✅ Datos cargados: {data.shape[0]} filas y {data.shape[1]} columnas.")
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline de preprocesamiento de datos.")
+    parser.add_argument("--input", default=INPUT_FILE, help="Archivo CSV de entrada en data/raw/.")
+    parser.add_argument("--checkpoint-dir", default=None,
+                        help="Directorio de checkpoints (por defecto data/checkpoints[/<muestra>]).")
+    parser.add_argument("--resume", action="store_true", help="Reanuda desde la última etapa completada.")
+    parser.add_argument("--until", default=None, help="Ejecuta solo hasta la etapa indicada.")
+    parser.add_argument("--workers", type=int, default=2, help="Hilos para etapas independientes.")
+    parser.add_argument("--sample", type=float, default=None, metavar="FRACCION",
+                        help="Corre todo sobre una muestra estratificada (p. ej. 0.05) en un espacio de salida propio.")
+    parser.add_argument("--min-per-class", type=int, default=SAMPLE_MIN_PER_CLASS,
+                        help="Mínimo de registros por clase en la muestra.")
+    parser.add_argument("--balance", choices=("smote", "scalable"), default=BALANCE_STRATEGY,
+                        help="Estrategia de balanceo de clases.")
+    parser.add_argument("--balance-k-neighbors", type=int, default=None,
+                        help="Vecinos por muestra sintética (balanceo scalable).")
+    parser.add_argument("--balance-approximate", action="store_true",
+                        help="Vecinos aproximados sobre una proyección aleatoria (balanceo scalable).")
+    parser.add_argument("--balance-components", type=int, default=None,
+                        help="Dimensiones de la proyección con --balance-approximate (balanceo scalable).")
+    parser.add_argument("--balance-jobs", type=int, default=None,
+                        help="Clases que se sobremuestrean en paralelo (balanceo scalable).")
+    parser.add_argument("--balance-working-memory", type=int, default=None, metavar="MB",
+                        help="Memoria por bloque de la búsqueda de vecinos (balanceo scalable).")
+    args = parser.parse_args()
 
-logging.info(f"🧹 2. Limpieza de datos.")
-data = clean_data(data)
-logging.info(f"✅ Proceso de limpieza finalizado.")
+    balance_options = {name: value for name, value in (
+        ("k_neighbors", args.balance_k_neighbors),
+        ("approximate", args.balance_approximate or None),
+        ("n_components", args.balance_components),
+        ("n_jobs", args.balance_jobs),
+        ("working_memory", args.balance_working_memory),
+    ) if value is not None}
+    if balance_options and args.balance != "scalable":
+        parser.error("Las opciones --balance-* solo se admiten con --balance scalable.")
 
-logging.info(f"🔄 3. Transformación de datos.")
-data = transform_data(data)
-logging.info(f"✅ Proceso de transformación finalizado.")
+    configure_logging()
+    namespace = sample_namespace(args.sample)
+    checkpoint_dir = args.checkpoint_dir or output_paths(namespace)["checkpoint_dir"]
 
-logging.info(f"🔧 4. Ingeniería de características y partición de datos")
-x_train, y_train, x_val, y_val, x_test, y_test = transform_and_split_data(data.copy())
-logging.info(f"✅ Proceso de ingeniería de características y partición de datos finalizado.")
+    logger.info(f"Iniciando pipeline de preprocesamiento ({namespace})...")
+    stages = build_stages(args.input, args.sample, args.min_per_class, balance_strategy=args.balance,
+                          balance_options=balance_options)
+    runner = StageRunner(stages, checkpoint_dir, max_workers=args.workers)
+    report = runner.run(resume=args.resume, until=args.until)
+    logger.info(f"✅ Pipeline finalizado. Resumen por etapa:\n{report.to_string(index=False)}")
 
-logging.info(f"📦 5. Guardando datos procesados.")
-save_data(x_train, x_val, x_test, y_train, y_val, y_test)
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .data_profiling import _standard_name
+except ImportError:
+    from data_profiling import _standard_name
+
+logger = logging.getLogger(__name__)
+
+TARGET_COL = 'origen_igdactmlmacalificacionorigen'
+
+
+def sample_namespace(fraction):
+    """
+    Nombre del espacio de salida de una muestra, p. ej. 0.05 -> 'sample_5pct'.
+    Las corridas completas usan 'full'.
+    """
+    if fraction is None:
+        return "full"
+    return f"sample_{fraction * 100:g}pct".replace(".", "_")
+
+
+def stratified_sample(df: pd.DataFrame, fraction=0.1, min_per_class=500, target_col=TARGET_COL, random_state=42):
+    """
+    Submuestra reproducible y estratificada por la variable objetivo.
+
+    Cada clase conserva `fraction` de sus registros, pero nunca menos de `min_per_class`
+    (o todos, si la clase es más pequeña), para que las clases raras de `origen` sigan
+    representadas. Acepta el nombre de la columna objetivo tal como llega en los datos crudos.
+    """
+    columns = {_standard_name(col): col for col in df.columns}
+    target = df[columns.get(target_col, target_col)]
+
+    rng = np.random.default_rng(random_state)
+    positions = []
+    for value, group in pd.Series(np.arange(len(df))).groupby(target.to_numpy(), dropna=False):
+        n_rows = len(group)
+        n_sample = min(n_rows, max(int(np.ceil(fraction * n_rows)), min_per_class))
+        positions.append(rng.choice(group.to_numpy(), size=n_sample, replace=False))
+        logger.info(f"\tClase {value}: {n_sample} de {n_rows} registros.")
+
+    positions = np.sort(np.concatenate(positions))
+    logger.info(f"\tMuestra estratificada: {len(positions)} de {len(df)} registros ({len(positions) / len(df):.1%}).")
+
+    # Copia propia: las etapas siguientes modifican la muestra en el lugar
+    return df.iloc[positions].copy()
@@ -0,0 +1,119 @@
+import json
+import logging
+import time
+import multiprocessing
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import psutil
+import scipy.sparse
+
+logger = logging.getLogger(__name__)
+
+PROCESSED_DIR = Path(__file__).resolve().parent.parent.parent.joinpath("data", "processed")
+
+CSR_ARRAYS = ("data", "indices", "indptr")
+
+
+def save_sparse_mmap(X, directory):
+    """
+    Guarda una matriz CSR como arreglos .npy sin comprimir (data, indices, indptr) más
+    un archivo con la forma, para poder abrirla luego con memoria mapeada.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    X = scipy.sparse.csr_matrix(X)
+    # Formato canónico: al cargarla en solo lectura nadie necesitará reordenar índices
+    X.sum_duplicates()
+
+    for name in CSR_ARRAYS:
+        np.save(directory / f"{name}.npy", getattr(X, name))
+
+    with open(directory / "meta.json", "w") as f:
+        json.dump({"shape": list(X.shape), "dtype": str(X.dtype)}, f)
+
+
+def load_sparse_mmap(directory, mmap_mode='r'):
+    """
+    Abre una matriz guardada con `save_sparse_mmap` sin copiarla a memoria.
+    Los arreglos quedan respaldados por el archivo, de modo que varios procesos que
+    la abren comparten una única copia en la caché de páginas del sistema operativo.
+    """
+    directory = Path(directory)
+
+    if not directory.exists():
+        raise FileNotFoundError(f"El directorio {directory} no existe.")
+
+    with open(directory / "meta.json") as f:
+        meta = json.load(f)
+
+    arrays = [np.load(directory / f"{name}.npy", mmap_mode=mmap_mode) for name in CSR_ARRAYS]
+    X = scipy.sparse.csr_matrix(tuple(arrays), shape=tuple(meta["shape"]), copy=False)
+    X.has_canonical_format = True
+
+    return X
+
+
+def _measure_load(fmt, path):
+    """
+    Carga una matriz en el formato indicado y mide tiempo y memoria del proceso.
+    Se ejecuta en un proceso nuevo para que las mediciones no se contaminen entre formatos.
+    """
+    process = psutil.Process()
+    before = process.memory_full_info()
+
+    start = time.perf_counter()
+    X = load_sparse_mmap(path) if fmt == "mmap" else scipy.sparse.load_npz(path)
+    # Recorrer todos los arreglos para forzar la lectura completa de las páginas
+    checksum = float(X.data.sum()) + float(X.indices.sum()) + float(X.indptr[-1])
+    elapsed = time.perf_counter() - start
+
+    after = process.memory_full_info()
+
+    return {
+        "format": fmt,
+        "path": str(path),
+        "load_seconds": elapsed,
+        "rss_mb": (after.rss - before.rss) / 2**20,
+        "uss_mb": (after.uss - before.uss) / 2**20,
+        "checksum": checksum,
+    }
+
+
+def benchmark_load_formats(processed_dir, names=("X_train", "X_val"), output_file="load_benchmark.csv"):
+    """
+    Compara tiempo de carga y memoria (RSS y USS) entre los formatos .npz y memoria mapeada.
+    USS excluye las páginas compartidas, por lo que refleja la memoria privada de cada consumidor.
+    """
+    processed_dir = Path(processed_dir)
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+
+    for name in names:
+        for fmt, path in (("npz", processed_dir / f"{name}.npz"), ("mmap", processed_dir / name)):
+            if not path.exists():
+                logger.warning(f"\tNo se encontró {path}, se omite.")
+                continue
+
+            with ctx.Pool(1) as pool:
+                result = pool.apply(_measure_load, (fmt, path))
+
+            results.append({"name": name, **result})
+            logger.info(
+                f"\t{name} [{fmt}]: {result['load_seconds']:.3f}s, "
+                f"RSS +{result['rss_mb']:.1f} MB, USS +{result['uss_mb']:.1f} MB"
+            )
+
+    report = pd.DataFrame(results)
+    report.to_csv(processed_dir / output_file, index=False)
+
+    return report
+
+
+if __name__ == "__main__":
+    from logging_setup import configure_logging
+
+    configure_logging()
+    benchmark_load_formats(PROCESSED_DIR)
@@ -0,0 +1,271 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import pandas as pd
+import psutil
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "run_state.json"
+METRICS_FILE = "stage_metrics.csv"
+
+
+class Stage:
+    """
+    Etapa del grafo: `func` recibe las salidas de las etapas listadas en `inputs`
+    (en ese orden) y devuelve un único objeto, que se guarda como checkpoint.
+    `params` (serializable a JSON) reúne lo que, además de las entradas, determina la
+    salida: archivos leídos, fracciones, tipos, estrategias. Si cambia, --resume la repite.
+    """
+    def __init__(self, name, func, inputs=(), checkpoint=True, description=None, params=None):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.checkpoint = checkpoint
+        self.description = description or name
+        self.params = params or {}
+
+    def params_hash(self):
+        return hashlib.sha1(json.dumps(self.params, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def file_signature(path):
+    """
+    Ruta, tamaño y fecha de modificación de un archivo, para incluirlos en los `params` de
+    la etapa que lo lee: si el archivo se reemplaza, la etapa deja de estar al día.
+    """
+    path = Path(path)
+    if not path.exists():
+        return {"path": str(path)}
+    stat = path.stat()
+    return {"path": str(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class _PeakRSS:
+    """
+    Mide el pico de memoria residente del proceso mientras dura el bloque `with`,
+    muestreando en un hilo aparte. Es el pico de todo el proceso: incluye la memoria ya
+    ocupada antes del bloque y la de las etapas del mismo nivel que corren en paralelo.
+    """
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.peak = 0
+        self._stop = threading.Event()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.process.memory_info().rss)
+
+    def __enter__(self):
+        self.peak = self.process.memory_info().rss
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.process.memory_info().rss)
+
+
+def _shape(output):
+    """
+    Filas y columnas de la salida de una etapa (o de su primer elemento con forma si es una tupla).
+    """
+    if isinstance(output, (tuple, list)):
+        output = next((item for item in output if hasattr(item, "shape")), None)
+    shape = getattr(output, "shape", None)
+    if shape is None:
+        return None, None
+    return shape[0], shape[1] if len(shape) > 1 else 1
+
+
+class StageRunner:
+    """
+    Ejecuta un grafo de etapas en orden topológico.
+
+    - Guarda la salida de cada etapa en `checkpoint_dir` y el estado de la corrida en run_state.json.
+    - Con `resume=True` omite las etapas ya completadas cuyas entradas y parámetros no cambiaron
+      y carga su checkpoint solo si otra etapa lo necesita.
+    - Las etapas de un mismo nivel (sin dependencias entre sí) se ejecutan en paralelo con hilos.
+    - Registra tiempo, pico de RSS del proceso y filas/columnas de cada etapa en stage_metrics.csv.
+    """
+    def __init__(self, stages, checkpoint_dir, max_workers=2):
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Los nombres de las etapas deben ser únicos.")
+
+        for stage in stages:
+            missing = [name for name in stage.inputs if name not in self.stages]
+            if missing:
+                raise ValueError(f"La etapa {stage.name} depende de etapas inexistentes: {missing}")
+
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.max_workers = max_workers
+        self.levels = self._levels()
+        self.outputs = {}
+        self.metrics = []
+
+    def _levels(self):
+        # Orden topológico por niveles (algoritmo de Kahn)
+        pending = dict(self.stages)
+        done = set()
+        levels = []
+        while pending:
+            level = [name for name, stage in pending.items() if set(stage.inputs) <= done]
+            if not level:
+                raise ValueError(f"El grafo de etapas tiene un ciclo: {sorted(pending)}")
+            levels.append(level)
+            done.update(level)
+            for name in level:
+                del pending[name]
+        return levels
+
+    def _checkpoint_path(self, name):
+        return self.checkpoint_dir / f"{name}.joblib"
+
+    def _load_state(self):
+        state_path = self.checkpoint_dir / STATE_FILE
+        return json.loads(state_path.read_text()) if state_path.exists() else {}
+
+    def _save_state(self, state):
+        (self.checkpoint_dir / STATE_FILE).write_text(json.dumps(state, indent=2))
+
+    def _get(self, name):
+        if name not in self.outputs:
+            logger.info(f"\tCargando checkpoint de {name}.")
+            self.outputs[name] = joblib.load(self._checkpoint_path(name))
+        return self.outputs[name]
+
+    def _run_stage(self, stage):
+        logger.info(f"▶️ {stage.description}")
+        args = [self._get(name) for name in stage.inputs]
+
+        with _PeakRSS() as memory:
+            start = time.perf_counter()
+            output = stage.func(*args)
+            elapsed = time.perf_counter() - start
+
+        if stage.checkpoint:
+            joblib.dump(output, self._checkpoint_path(stage.name))
+
+        rows, cols = _shape(output)
+        logger.info(f"✅ {stage.name}: {elapsed:.2f}s, pico RSS del proceso {memory.peak / 2**20:.0f} MB, forma ({rows}, {cols}).")
+
+        return output, {
+            "stage": stage.name,
+            "status": "run",
+            "wall_seconds": elapsed,
+            "process_peak_rss_mb": memory.peak / 2**20,
+            "rows": rows,
+            "cols": cols,
+        }
+
+    def _can_skip(self, stage, state, rerun):
+        entry = state.get(stage.name, {})
+        return (
+            entry.get("status") == "done"
+            and entry.get("params_hash") == stage.params_hash()
+            and not rerun.intersection(stage.inputs)
+            and (not stage.checkpoint or self._checkpoint_path(stage.name).exists())
+        )
+
+    def run(self, resume=False, until=None):
+        """
+        Ejecuta las etapas hasta `until` (incluida) o hasta el final. Devuelve las métricas por etapa.
+        """
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        state = self._load_state() if resume else {}
+        targets = self._ancestors(until) if until else set(self.stages)
+        rerun = set()
+        self.metrics = []
+
+        for level in self.levels:
+            level = [name for name in level if name in targets]
+            to_run = []
+            for name in level:
+                stage = self.stages[name]
+                if resume and self._can_skip(stage, state, rerun):
+                    logger.info(f"⏭️ {name}: completada en una corrida anterior, se omite.")
+                    self.metrics.append({"stage": name, "status": "skipped", **state[name].get("metrics", {})})
+                else:
+                    to_run.append(stage)
+
+            if not to_run:
+                continue
+
+            # El estado se actualiza y se guarda solo desde este hilo, una vez por nivel
+            error = None
+            for stage, result, stage_error in self._run_level(to_run):
+                finished_at = datetime.now().isoformat(timespec="seconds")
+                if stage_error is not None:
+                    state[stage.name] = {"status": "failed", "finished_at": finished_at}
+                    logger.error(f"❌ Falló la etapa {stage.name}; se puede reanudar con --resume.")
+                    error = error or stage_error
+                    continue
+
+                output, metrics = result
+                self.outputs[stage.name] = output
+                rerun.add(stage.name)
+                self.metrics.append(metrics)
+                state[stage.name] = {
+                    "status": "done",
+                    "finished_at": finished_at,
+                    "params_hash": stage.params_hash(),
+                    "metrics": {key: value for key, value in metrics.items() if key not in ("stage", "status")},
+                }
+            self._save_state(state)
+            if error is not None:
+                raise error
+            self._release(targets, state)
+
+        report = pd.DataFrame(self.metrics)
+        report.to_csv(self.checkpoint_dir / METRICS_FILE, index=False)
+        return report
+
+    def _run_level(self, stages):
+        """
+        Ejecuta las etapas de un nivel y devuelve (etapa, (salida, métricas), error) por cada una.
+        Con varias etapas espera a que terminen todas, aunque alguna falle, para no perder
+        las que sí se completaron.
+        """
+        if len(stages) == 1:
+            try:
+                return [(stages[0], self._run_stage(stages[0]), None)]
+            except Exception as error:
+                return [(stages[0], None, error)]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [(stage, executor.submit(self._run_stage, stage)) for stage in stages]
+
+        return [
+            (stage, None, future.exception()) if future.exception() else (stage, future.result(), None)
+            for stage, future in futures
+        ]
+
+    def _release(self, targets, state):
+        """
+        Libera de memoria las salidas que ya no necesita ninguna etapa pendiente
+        (siguen disponibles en su checkpoint).
+        """
+        pending = [stage for name, stage in self.stages.items() if name in targets and state.get(name, {}).get("status") != "done"]
+        needed = {name for stage in pending for name in stage.inputs}
+        for name in list(self.outputs):
+            if name not in needed and self.stages[name].checkpoint:
+                del self.outputs[name]
+
+    def _ancestors(self, name):
+        if name not in self.stages:
+            raise ValueError(f"La etapa {name} no existe.")
+        result = {name}
+        for parent in self.stages[name].inputs:
+            result |= self._ancestors(parent)
+        return result
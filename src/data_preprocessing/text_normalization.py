@@ -0,0 +1,65 @@
+import logging
+import multiprocessing
+import re
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Una sola pasada: cada secuencia de caracteres no alfanuméricos (incluidos los espacios)
+# queda como un único espacio. Equivale a reemplazar \W por ' ' y luego colapsar \s+.
+NON_WORD_PATTERN = re.compile(r'\W+')
+
+ACCENT_TABLE = str.maketrans("áäâàéêèëíîìïóôòöúûùü", "aaaaeeeeiiiioooouuuu")
+
+# Tamaño mínimo de bloque para que valga la pena repartir el trabajo entre procesos
+MIN_ROWS_PER_JOB = 50_000
+
+
+def normalize_text(text, remove_accents=False):
+    """
+    Normaliza un texto: minúsculas, sin espacios en los extremos y con los signos de
+    puntuación y espacios repetidos reemplazados por un único espacio.
+    """
+    text = str(text).strip().lower()
+    if remove_accents:
+        text = text.translate(ACCENT_TABLE)
+    return NON_WORD_PATTERN.sub(' ', text)
+
+
+def tokenize(text, min_length=2):
+    """
+    Separa un texto ya normalizado en palabras de al menos `min_length` caracteres.
+    Con el valor por defecto coincide con el `token_pattern` de scikit-learn.
+    """
+    return [token for token in text.split() if len(token) >= min_length]
+
+
+def _normalize_chunk(series, remove_accents):
+    series = series.str.strip().str.lower()
+    if remove_accents:
+        series = series.str.translate(ACCENT_TABLE)
+    return series.str.replace(NON_WORD_PATTERN, ' ', regex=True)
+
+
+def normalize_series(series: pd.Series, remove_accents=False, n_jobs=1):
+    """
+    Aplica `normalize_text` a una columna completa con operaciones vectorizadas de pandas.
+    Con `n_jobs > 1` y columnas grandes, reparte los bloques entre varios procesos.
+    Los valores nulos se conservan.
+    """
+    n_jobs = multiprocessing.cpu_count() if n_jobs == -1 else n_jobs
+    n_jobs = min(n_jobs, max(1, len(series) // MIN_ROWS_PER_JOB))
+
+    if n_jobs <= 1:
+        return _normalize_chunk(series, remove_accents)
+
+    chunks = [series.iloc[idx] for idx in np.array_split(np.arange(len(series)), n_jobs)]
+    with multiprocessing.Pool(n_jobs) as pool:
+        results = pool.map(partial(_normalize_chunk, remove_accents=remove_accents), chunks)
+
+    logger.info(f"\tTexto normalizado en {n_jobs} procesos ({len(series)} registros).")
+
+    return pd.concat(results)
@@ -1,3 +1,4 @@
+import logging
 import mlflow
 import os
 import pandas as pd
@@ -10,6 +11,8 @@ OUTPUT_DIR = os.path.join(base_path,"..", "model_package")
 upper_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",".."))
 sys.path.append(upper_path)
 
+logger = logging.getLogger(__name__)
+
 
 if not os.path.exists(OUTPUT_DIR):
     raise FileNotFoundError(f"❌ No se encontró el modelo empaquetado en: {OUTPUT_DIR}")
@@ -20,7 +23,7 @@ def get_model():
     """
     # Cargar el modelo empaquetado
     packaged_model = mlflow.pyfunc.load_model(OUTPUT_DIR)
-    print(f"✅ Modelo cargado desde: {OUTPUT_DIR}")
+    logger.info("✅ Modelo cargado desde: %s", OUTPUT_DIR)
     return packaged_model
     
 
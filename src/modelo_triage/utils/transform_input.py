@@ -1,5 +1,8 @@
 import sys
 import os
+import logging
+import tracemalloc
+from functools import lru_cache
 import pandas as pd
 import joblib
 
@@ -11,29 +14,23 @@ feature_path = os.path.abspath(os.path.join(os.path.dirname(__file__),"..", ".."
 sys.path.append(feature_path)
 
 # Importar módulos que el pipeline necesita
-from data_preprocessing.data_transformation import transform_data
+from data_preprocessing.data_transformation import transform_data_inference
+from data_preprocessing.feature_engineering import branch_timings, enable_transform_timings
 
+logger = logging.getLogger(__name__)
 
-def prepare_input_data(input_df: pd.DataFrame):
-    """
-    Aplica transformaciones al DataFrame de entrada utilizando el pipeline pre-entrenado.
-    """
-    # Evitar la sobreescritura del DataFrame original
-    input_df = input_df.copy()
 
-    # Aplicar transformaciones básicas
-    transformed_df = transform_data(input_df)
+PIPELINE_PATH = os.path.join(base_path, "data_preprocessing", "trained_pipelines", "transformation_pipeline.pkl")
 
-    # Ruta al pipeline entrenado
-    pipeline_path = os.path.join(base_path, "data_preprocessing", "trained_pipelines", "transformation_pipeline.pkl")
+# Con PIPELINE_BRANCH_TIMINGS=1 cada rama registra su tiempo de transformación (desactivado por omisión)
+BRANCH_TIMINGS = os.environ.get("PIPELINE_BRANCH_TIMINGS") == "1"
 
-    if not os.path.exists(pipeline_path):
-        raise FileNotFoundError(f"❌ No se encontró el pipeline en: {pipeline_path}")
 
-    # Cargar el pipeline
+@lru_cache(maxsize=1)
+def _load_pipeline(pipeline_path, modified_at):
     try:
         pipeline = joblib.load(pipeline_path)
-        print("✅ Pipeline cargado exitosamente.")
+        logger.info("✅ Pipeline cargado exitosamente: %s", pipeline_path)
     except (ModuleNotFoundError, Exception) as e:
         raise ImportError(f"❌ Error al cargar el pipeline: {e}")
 
@@ -41,15 +38,69 @@ def prepare_input_data(input_df: pd.DataFrame):
     if pipeline is None:
         raise RuntimeError("❌ El pipeline no se cargó correctamente. Revisa el proceso de serialización.")
 
+    if BRANCH_TIMINGS:
+        enable_transform_timings(pipeline)
+
+    return pipeline
+
+
+def load_pipeline(pipeline_path=PIPELINE_PATH):
+    """
+    Devuelve el pipeline entrenado. Se carga una sola vez y se vuelve a cargar solo si el
+    archivo cambia (p. ej. al promover una nueva versión del pipeline).
+    """
+    if not os.path.exists(pipeline_path):
+        raise FileNotFoundError(f"❌ No se encontró el pipeline en: {pipeline_path}")
+
+    return _load_pipeline(pipeline_path, os.path.getmtime(pipeline_path))
+
+
+def prepare_input_data(input_df: pd.DataFrame):
+    """
+    Aplica transformaciones al DataFrame de entrada utilizando el pipeline pre-entrenado.
+    El DataFrame de entrada no se copia ni se modifica: `transform_data_inference` construye
+    un único DataFrame nuevo y el pipeline lo convierte en la matriz de características.
+    """
+    # Aplicar transformaciones básicas (variante optimizada para inferencia)
+    transformed_df = transform_data_inference(input_df)
+
+    pipeline = load_pipeline()
+
     # Transformar los datos
     try:
         transformed_data = pipeline.transform(transformed_df)
     except Exception as e:
         raise RuntimeError(f"❌ Error al transformar los datos: {e}")
 
+    # Tiempo y ancho de salida por rama (pipelines entrenados con TimedPipeline)
+    if BRANCH_TIMINGS and logger.isEnabledFor(logging.DEBUG):
+        timings = branch_timings(pipeline)
+        if not timings.empty:
+            logger.debug("Tiempos por rama:\n%s", timings[['branch', 'last_transform_seconds', 'output_width']].to_string(index=False))
+
     return transformed_data
 
 
+def audit_allocations(func, *args, **kwargs):
+    """
+    Ejecuta `func` y mide con tracemalloc la memoria asignada: pico durante la llamada y
+    memoria retenida al terminar, en bytes. Sirve para vigilar el costo por petición.
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = func(*args, **kwargs)
+    current, peak = tracemalloc.get_traced_memory()
+
+    if not was_tracing:
+        tracemalloc.stop()
+
+    return result, {"peak_bytes": peak - baseline, "retained_bytes": current - baseline}
+
+
 # # Prueba
 # if __name__ == "__main__":
 #     input_file = os.path.join(base_path,"..", "data", "user_input_example", "user_input.csv")
@@ -1,18 +1,126 @@
-
+import copy
+import re
 from abc import ABC, abstractmethod
 
+import numpy as np
+
+from .model_config import EARLY_STOPPING_ROUNDS
+
+# Métricas de evaluación que se maximizan en XGBoost, LightGBM y CatBoost; las demás
+# (pérdidas y errores) se minimizan
+MAXIMIZE_METRICS = {
+    "auc", "aucpr", "auc_mu", "average_precision", "map", "ndcg", "pre", "prauc", "accuracy",
+    "balancedaccuracy", "f1", "totalf1", "precision", "recall", "mcc", "kappa", "wkappa", "r2",
+}
+
+
+def is_maximized(metric):
+    """
+    Si la métrica de evaluación mejora al aumentar. Se ignoran los parámetros del nombre
+    ("ndcg@5", "AUC:type=Mu").
+    """
+    return re.split(r"[@:]", str(metric))[0].lower() in MAXIMIZE_METRICS
+
+
 class BaseModel(ABC):
-    def __init__(self, params=None):
+    # Qué mide el costo de ajuste de cada punto de `grow`: "point" (el punto entrenado desde
+    # cero), "incremental" (desde el punto anterior) o "group" (el primer punto lleva el único
+    # ajuste de todo el grupo y los demás solo recortan el modelo)
+    grow_fit_cost = "point"
+
+    def __init__(self, params=None, early_stopping_rounds=EARLY_STOPPING_ROUNDS, eval_metric=None, dataset_cache=None):
         self.params = params or {}
+        # Parada temprana con el conjunto de validación (solo modelos de boosting).
+        # `early_stopping_rounds=None` la desactiva; `eval_metric=None` usa la métrica por defecto de cada modelo.
+        self.early_stopping_rounds = early_stopping_rounds
+        self.eval_metric = eval_metric
+        # Iteración con mejor métrica en validación; None si el modelo no usa parada temprana
+        self.best_iteration = None
+        # Métrica de parada temprana en validación por ronda (para evaluar prefijos del modelo)
+        self.eval_history = None
+        # Nombre de la métrica de `eval_history` (define si se maximiza o se minimiza)
+        self.eval_history_metric = None
+        # DatasetCache compartido entre combinaciones (solo lo usan los modelos de boosting)
+        self.dataset_cache = dataset_cache
+
+    def __getstate__(self):
+        # La caché de datasets es de la búsqueda, no del modelo: no se serializa con él
+        state = self.__dict__.copy()
+        state["dataset_cache"] = None
+        return state
+
+    def uses_early_stopping(self, X_val, y_val):
+        return self.early_stopping_rounds is not None and X_val is not None and y_val is not None
 
     @abstractmethod
-    def train(self, X_train, y_train):
+    def train(self, X_train, y_train, X_val=None, y_val=None):
         pass
 
+    def grow(self, X_train, y_train, X_val, y_val, param, values):
+        """
+        Genera (valor, modelo) para cada valor (ascendente) del parámetro incremental `param`
+        (árboles, rondas o épocas), con un modelo independiente por punto. Los modelos que
+        pueden crecer reutilizan el entrenamiento anterior; por defecto se entrena cada
+        punto desde cero.
+        """
+        for value in values:
+            model = self.__class__({**self.params, param: value}, early_stopping_rounds=self.early_stopping_rounds,
+                                   eval_metric=self.eval_metric, dataset_cache=self.dataset_cache)
+            model.train(X_train, y_train, X_val, y_val)
+            yield value, model
+
+    def grow_by_prefixes(self, X_train, y_train, X_val, y_val, param, values):
+        """
+        Para boosting: entrena una sola vez con el mayor valor y cada punto es una copia con
+        solo los primeros `value` árboles (ver `prefix_model`). Con parada temprana, la mejor
+        iteración de cada punto se toma del historial de validación, que es el mismo que habría
+        visto un entrenamiento con menos rondas (se habría detenido en la misma ronda, o al
+        llegar a `value`).
+        """
+        self.grow_fit_cost = "group"
+        self.params = {**self.params, param: values[-1]}
+        self.model.set_params(**{param: values[-1]})
+        self.train(X_train, y_train, X_val, y_val)
+
+        for value in values:
+            checkpoint = self.prefix_model(value)
+            checkpoint.params = {**self.params, param: value}
+            checkpoint.best_iteration = self.prefix_best_iteration(value)
+            yield value, checkpoint
+
+    def prefix_model(self, n_rounds):
+        """
+        Copia del modelo con solo las primeras `n_rounds` rondas, para que el tamaño, la
+        latencia y el modelo serializado de cada punto sean los de un modelo de ese tamaño.
+        Cada familia de boosting recorta su booster; por defecto la copia comparte el modelo.
+        """
+        return copy.copy(self)
+
+    def prefix_best_iteration(self, n_rounds):
+        """
+        Mejor iteración (desde 0) entre las primeras `n_rounds` rondas.
+        """
+        if self.eval_history is None:
+            return n_rounds - 1
+
+        prefix = np.asarray(self.eval_history, dtype=float)[:n_rounds]
+        return int(prefix.argmax() if is_maximized(self.eval_history_metric) else prefix.argmin())
+
     @abstractmethod
     def predict(self, X):
         pass
 
+    @abstractmethod
+    def predict_proba(self, X):
+        pass
+
+    @property
+    def classes(self):
+        """
+        Etiquetas en el orden de las columnas de predict_proba.
+        """
+        return self.model.classes_
+
     @abstractmethod
     def evaluate(self, X, y):
         pass
@@ -0,0 +1,128 @@
+import logging
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from sklearn.utils.class_weight import compute_sample_weight
+
+logger = logging.getLogger(__name__)
+
+# Familias con estructura nativa de datos: DMatrix (XGBoost), Dataset (LightGBM), Pool (CatBoost)
+CACHED_FAMILIES = ("XGBoost", "LightGBM", "CatBoost")
+
+
+class DatasetCache:
+    """
+    Guarda las estructuras nativas de XGBoost, LightGBM y CatBoost (con la discretización
+    en histogramas ya hecha) para reutilizarlas en todas las combinaciones de una búsqueda.
+
+    La clave es la familia, la identidad de los datos (X, y) y la configuración de
+    discretización (max_bin, border_count, pesos de clase). Cada entrada conserva una
+    referencia a X e y, así su identidad no se reutiliza mientras la entrada exista.
+    Se guardan a lo sumo `max_entries` entradas (las menos usadas recientemente se descartan).
+    """
+
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.build_seconds = 0.0
+        self.saved_seconds = 0.0
+
+    def get(self, family, name, X, y, config, build, reference=None):
+        # `reference`: estructura de la que depende (p. ej. validación discretizada con los cortes de entrenamiento)
+        key = (family, name, id(X), id(y), config, id(reference))
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            entry["hits"] += 1
+            self.saved_seconds += entry["build_seconds"]
+            return entry["value"]
+
+        start = time.perf_counter()
+        value = build()
+        seconds = time.perf_counter() - start
+        self.build_seconds += seconds
+
+        self._entries[key] = {"family": family, "name": name, "config": config, "data": (X, y, reference),
+                              "value": value, "build_seconds": seconds, "hits": 0}
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def xgboost(self, X_train, y_train, X_val=None, y_val=None, max_bin=256):
+        """
+        QuantileDMatrix de entrenamiento y, si hay validación, la de validación con los
+        mismos cortes de histograma.
+        """
+        import xgboost as xgb
+
+        config = ("max_bin", max_bin)
+        dtrain = self.get("XGBoost", "train", X_train, y_train, config,
+                          lambda: xgb.QuantileDMatrix(X_train, y_train, max_bin=max_bin))
+        if X_val is None:
+            return dtrain, None
+        dval = self.get("XGBoost", "val", X_val, y_val, config,
+                        lambda: xgb.QuantileDMatrix(X_val, y_val, ref=dtrain, max_bin=max_bin), reference=dtrain)
+        return dtrain, dval
+
+    def lightgbm(self, X_train, y_train, X_val=None, y_val=None, class_weight=None, max_bin=255):
+        """
+        Dataset de LightGBM ya construido (etiquetas 0..K-1 y pesos por clase) y el de
+        validación con la misma discretización. Devuelve también las clases originales.
+        """
+        import lightgbm as lgb
+
+        dataset_params = {"max_bin": max_bin, "verbose": -1}
+
+        def train_dataset():
+            classes, labels = np.unique(y_train, return_inverse=True)
+            weight = compute_sample_weight(class_weight, y_train) if class_weight is not None else None
+            dataset = lgb.Dataset(X_train, label=labels, weight=weight, params=dataset_params,
+                                  free_raw_data=False)
+            return dataset.construct(), classes
+
+        config = ("max_bin", max_bin, "class_weight", repr(class_weight))
+        dtrain, classes = self.get("LightGBM", "train", X_train, y_train, config, train_dataset)
+        if X_val is None:
+            return dtrain, None, classes
+        dval = self.get("LightGBM", "val", X_val, y_val, config, lambda: lgb.Dataset(
+            X_val, label=np.searchsorted(classes, y_val), reference=dtrain, params=dataset_params, free_raw_data=False,
+        ).construct(), reference=dtrain)
+        return dtrain, dval, classes
+
+    def catboost(self, X_train, y_train, X_val=None, y_val=None, border_count=254):
+        """
+        Pool de entrenamiento cuantizado y Pool de validación (CatBoost lo discretiza con
+        los mismos bordes al entrenar).
+        """
+        from catboost import Pool
+
+        def quantized_pool():
+            pool = Pool(X_train, y_train)
+            pool.quantize(border_count=border_count)
+            return pool
+
+        config = ("border_count", border_count)
+        train_pool = self.get("CatBoost", "train", X_train, y_train, config, quantized_pool)
+        if X_val is None:
+            return train_pool, None
+        val_pool = self.get("CatBoost", "val", X_val, y_val, (), lambda: Pool(X_val, y_val))
+        return train_pool, val_pool
+
+    def report(self):
+        """
+        Tiempo de construcción de cada estructura, veces que se reutilizó y tiempo ahorrado.
+        """
+        return pd.DataFrame([
+            {"family": entry["family"], "dataset": entry["name"], "config": str(entry["config"]),
+             "build_seconds": entry["build_seconds"], "hits": entry["hits"],
+             "saved_seconds": entry["build_seconds"] * entry["hits"]}
+            for entry in self._entries.values()
+        ])
+
+    def log_report(self):
+        if not self._entries:
+            return
+        logger.info(f"\t🗃️ Caché de datasets: {self.build_seconds:.2f}s construyendo, {self.saved_seconds:.2f}s ahorrados\n"
+                    f"{self.report().to_string(index=False)}")
@@ -0,0 +1,64 @@
+import pickle
+import time
+
+import numpy as np
+
+# Métricas de costo de servir un modelo: menor es mejor
+COST_METRICS = ("latency_p50_ms", "latency_p99_ms", "batch_latency_ms", "model_size_bytes")
+
+
+def profile_inference(model, X, n_single=100, batch_size=1024, repeats=3):
+    """
+    Mide el costo de servir `model` con filas de `X` (validación):
+    - latencia de una fila (p50 y p99 sobre `n_single` predicciones),
+    - latencia de un lote de `batch_size` filas (mediana de `repeats`) y filas por segundo,
+    - tamaño del modelo serializado con pickle (lo que ocupa al registrarlo).
+    """
+    n_rows = X.shape[0]
+    single = []
+    for row in range(min(n_single, n_rows)):
+        x = X[row:row + 1]
+        start = time.perf_counter()
+        model.predict(x)
+        single.append(time.perf_counter() - start)
+
+    batch = X[:min(batch_size, n_rows)]
+    batch_times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(batch)
+        batch_times.append(time.perf_counter() - start)
+    batch_seconds = float(np.median(batch_times))
+
+    single_ms = np.asarray(single) * 1000
+    return {
+        "latency_p50_ms": float(np.percentile(single_ms, 50)),
+        "latency_p99_ms": float(np.percentile(single_ms, 99)),
+        "batch_latency_ms": batch_seconds * 1000,
+        "batch_rows_per_second": batch.shape[0] / batch_seconds if batch_seconds > 0 else float("inf"),
+        "model_size_bytes": len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)),
+    }
+
+
+def within_budget(metrics, constraints=None):
+    """
+    True si cada métrica de `constraints` ({"latency_p99_ms": 5.0, ...}) no supera su límite.
+    Una métrica ausente no cumple la restricción.
+    """
+    return all(metrics.get(name, float("inf")) <= limit for name, limit in (constraints or {}).items())
+
+
+def pareto_front(trials, objective="f1_score", cost="latency_p99_ms"):
+    """
+    Ensayos no dominados: ningún otro tiene mayor `objective` con menor o igual `cost`
+    (ni igual `objective` con menor `cost`). `trials` son diccionarios con ambas métricas;
+    se devuelven ordenados por costo.
+    """
+    candidates = sorted((trial for trial in trials if objective in trial and cost in trial),
+                        key=lambda trial: (trial[cost], -trial[objective]))
+    front, best = [], -float("inf")
+    for trial in candidates:
+        if trial[objective] > best:
+            front.append(trial)
+            best = trial[objective]
+    return front
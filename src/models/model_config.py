@@ -66,6 +66,21 @@ HYPERPARAM_GRID = {
 
 }
 
+# Parámetro de cada familia que controla el número de rondas / árboles / épocas. Los puntos de la
+# grilla que solo difieren en él se entrenan haciendo crecer un mismo modelo (warm start).
+ROUND_PARAMS = {
+    "RandomForest": "n_estimators",
+    "XGBoost": "n_estimators",
+    "LightGBM": "n_estimators",
+    "CatBoost": "iterations",
+    "MLP": "max_iter",
+}
+
+# Parada temprana de los modelos de boosting: rondas sin mejora en validación antes de detenerse.
+# La métrica por defecto es la pérdida de cada librería (mlogloss, multi_logloss, MultiClass).
+EARLY_STOPPING_ROUNDS = 50
+
+
 def get_param_combinations(model_name):
     grid = HYPERPARAM_GRID[model_name]
     return [dict(zip(grid.keys(), values)) for values in product(*grid.values())]
@@ -1,28 +1,127 @@
-import mlflow
-from sklearn.metrics import (
-    accuracy_score,
-    f1_score,
-    precision_score,
-    recall_score,
-    confusion_matrix,
-    classification_report
-)
-import json
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _divide(numerator, denominator):
+    # Como sklearn con zero_division: 0 donde el denominador es 0
+    return np.divide(numerator, denominator, out=np.zeros(len(numerator)), where=denominator != 0)
+
+
+def _positive_rank_sums(scores, is_positive):
+    """
+    Suma por fila de los rangos (desde 1, empates promediados) de las posiciones positivas.
+    `scores` e `is_positive` tienen una fila por clase: un solo argsort para todas.
+    """
+    order = np.argsort(scores, axis=1)
+    ordered = np.take_along_axis(scores, order, axis=1)
+    positive = np.take_along_axis(is_positive, order, axis=1)
+
+    n_classes, n_rows = scores.shape
+    index = np.arange(n_rows)
+    changes = ordered[:, 1:] != ordered[:, :-1]
+    boundary = np.ones((n_classes, 1), dtype=bool)
+    # Primera y última posición del grupo de empates de cada elemento ordenado
+    first = np.maximum.accumulate(np.where(np.hstack([boundary, changes]), index, 0), axis=1)
+    last = np.minimum.accumulate(np.where(np.hstack([changes, boundary]), index, n_rows)[:, ::-1], axis=1)[:, ::-1]
+    return (((first + last) / 2 + 1) * positive).sum(axis=1)
+
 
 class ModelEvaluator:
+    """
+    Métricas de clasificación a partir de una sola matriz de confusión (np.bincount):
+    exactitud, precisión, recall y F1 (por clase, macro y ponderados) y el reporte por clase,
+    con los mismos valores que sklearn pero sin validar y codificar las etiquetas en cada
+    métrica. Con probabilidades se agregan log-loss y AUC (uno contra el resto, macro).
+    """
+
     @staticmethod
     def evaluate(model, X, y):
-        predictions = model.predict(X)
+        # Una sola pasada por el modelo: la predicción es la clase con mayor probabilidad
+        if hasattr(model, "predict_proba"):
+            probabilities = model.predict_proba(X)
+            classes = np.asarray(model.classes)
+            return ModelEvaluator.from_predictions(y, classes[probabilities.argmax(axis=1)], probabilities, classes)
+        return ModelEvaluator.from_predictions(y, model.predict(X))
+
+    @staticmethod
+    def from_predictions(y, predictions, probabilities=None, classes=None):
+        y, predictions = np.asarray(y).ravel(), np.asarray(predictions).ravel()
+        labels, encoded = np.unique(np.concatenate([y, predictions]), return_inverse=True)
+        n_labels, n_rows = len(labels), len(y)
+
+        confusion = np.bincount(encoded[:n_rows] * n_labels + encoded[n_rows:],
+                                minlength=n_labels * n_labels).reshape(n_labels, n_labels)
+        true_positives = np.diag(confusion).astype(float)
+        support = confusion.sum(axis=1)
+        predicted = confusion.sum(axis=0)
+
+        precision = _divide(true_positives, predicted)
+        recall = _divide(true_positives, support)
+        f1 = _divide(2 * true_positives, support + predicted)
+        weights = support / support.sum()
+
         metrics = {
-            "accuracy": accuracy_score(y, predictions),
-            "f1_score": f1_score(y, predictions, average="weighted"),
-            "f1_score_macro": f1_score(y, predictions, average="macro"),
-            "precision": precision_score(y, predictions, average="weighted"),
-            "recall": recall_score(y, predictions, average="weighted"),
+            "accuracy": float(true_positives.sum() / n_rows),
+            "f1_score": float(f1 @ weights),
+            "f1_score_macro": float(f1.mean()),
+            "precision": float(precision @ weights),
+            "recall": float(recall @ weights),
         }
 
+        if probabilities is not None:
+            metrics.update(ModelEvaluator.probability_metrics(y, probabilities, classes))
+
         # Manejar la matriz de confusión y el reporte como artefactos
-        metrics["confusion_matrix"] = confusion_matrix(y, predictions).tolist()
-        metrics["classification_report"] = classification_report(y, predictions, output_dict=True)
+        metrics["confusion_matrix"] = confusion.tolist()
+        report = {
+            str(label): {"precision": float(p), "recall": float(r), "f1-score": float(f), "support": int(s)}
+            for label, p, r, f, s in zip(labels, precision, recall, f1, support)
+        }
+        report["accuracy"] = metrics["accuracy"]
+        report["macro avg"] = {"precision": float(precision.mean()), "recall": float(recall.mean()),
+                               "f1-score": metrics["f1_score_macro"], "support": int(n_rows)}
+        report["weighted avg"] = {"precision": metrics["precision"], "recall": metrics["recall"],
+                                  "f1-score": metrics["f1_score"], "support": int(n_rows)}
+        metrics["classification_report"] = report
 
         return metrics
+
+    @staticmethod
+    def probability_metrics(y, probabilities, classes):
+        """
+        Log-loss y AUC uno contra el resto (promedio macro sobre las clases presentes en `y`),
+        a partir de las probabilidades por clase (columnas en el orden de `classes`).
+        Si `y` tiene etiquetas que no están en `classes` no hay probabilidad para ellas y se
+        omiten ambas métricas, igual que cuando no hay probabilidades.
+        """
+        y = np.asarray(y).ravel()
+        classes = np.asarray(classes)
+        unseen = ~np.isin(y, classes)
+        if unseen.any():
+            logger.warning(f"⚠️ Se omiten log-loss y AUC: etiquetas sin probabilidad {np.unique(y[unseen]).tolist()}")
+            return {}
+
+        probabilities = np.asarray(probabilities, dtype=float)
+        if probabilities.ndim == 1:
+            probabilities = np.column_stack([1 - probabilities, probabilities])
+
+        # Filas normalizadas y recortadas como en sklearn.metrics.log_loss
+        eps = np.finfo(probabilities.dtype).eps
+        normalized = probabilities / probabilities.sum(axis=1, keepdims=True)
+        positions = np.searchsorted(classes, y) if np.all(classes[:-1] <= classes[1:]) else \
+            np.array([np.flatnonzero(classes == label)[0] for label in y])
+        true_probability = np.clip(normalized[np.arange(len(y)), positions], eps, 1 - eps)
+        log_loss = float(-np.log(true_probability).mean())
+
+        # AUC por clase (Mann-Whitney): todas las clases en una sola ordenación
+        is_positive = np.arange(len(classes))[:, None] == positions
+        n_positive = is_positive.sum(axis=1)
+        n_negative = len(y) - n_positive
+        scored = (n_positive > 0) & (n_negative > 0)
+        rank_sums = _positive_rank_sums(np.ascontiguousarray(probabilities.T), is_positive)
+        auc = (rank_sums - n_positive * (n_positive + 1) / 2)[scored] / (n_positive * n_negative)[scored]
+
+        return {"log_loss": log_loss, "roc_auc": float(auc.mean()) if auc.size else float("nan")}
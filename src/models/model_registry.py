@@ -1,29 +1,34 @@
 import mlflow
 import warnings
-import json
 
 warnings.filterwarnings("ignore", category=UserWarning, module="mlflow")
 
 
 class ModelRegistry:
     @staticmethod
-    def log_model(model, model_name, params, metrics):
-        mlflow.log_params(params)
+    def log_run(run, params, metrics):
+        """
+        Encola en `run` (TrackedRun) los parámetros y métricas de un entrenamiento.
+        Las métricas numéricas van en un solo lote; las complejas (listas o diccionarios)
+        se suben como artefactos JSON desde memoria, sin pasar por el directorio de trabajo.
+        """
+        run.log_params(params)
 
         # Registrar solo métricas que sean flotantes
-        float_metrics = {k: v for k, v in metrics.items() if isinstance(v, (int, float))}
-        mlflow.log_metrics(float_metrics)
+        run.log_metrics({k: v for k, v in metrics.items() if isinstance(v, (int, float))})
 
-        # Guardar artefactos para métricas complejas (listas o diccionarios)
         for key, value in metrics.items():
             if not isinstance(value, (int, float)):
-                with open(f"{key}.json", "w") as f:
-                    json.dump(value, f)
-                mlflow.log_artifact(f"{key}.json")
+                run.log_dict(value, f"{key}.json")
 
-        # Guardar el modelo
-        mlflow.sklearn.log_model(model, model_name)
+    @staticmethod
+    def log_model(run, model, model_name):
+        """
+        Serializa el modelo completo en `run`. Solo para finalistas: las búsquedas lo
+        llaman con el mejor modelo, no en cada combinación.
+        """
+        run.log_model(model, model_name)
 
     @staticmethod
     def load_model(model_uri):
-        return mlflow.sklearn.load_model(model_uri)
\ No newline at end of file
+        return mlflow.sklearn.load_model(model_uri)
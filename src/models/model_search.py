@@ -1,51 +1,447 @@
 import mlflow
 from .pipeline import ModelPipeline
-from .model_config import get_param_combinations
+from .model_config import ROUND_PARAMS, get_param_combinations
+from .dataset_cache import CACHED_FAMILIES, DatasetCache
+from .model_registry import ModelRegistry
+from .tracking import get_tracker
+from .trial_ledger import TrialLedger, data_fingerprint, search_scope, trial_key
+from .inference_profile import COST_METRICS, pareto_front, profile_inference, within_budget
+import json
 import logging
+import multiprocessing
+import os
+import time
 import warnings
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.util import Finalize
 import pandas as pd
 import numpy as np
+from threadpoolctl import threadpool_limits
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+try:
+    from ..data_preprocessing.sparse_storage import load_sparse_mmap
+except ImportError:
+    from data_preprocessing.sparse_storage import load_sparse_mmap
+
+logger = logging.getLogger(__name__)
 
 # Ocultar advertencias de MLflow
 warnings.filterwarnings("ignore", category=UserWarning, module="mlflow")
 
+# Estado de cada proceso del pool (se inicializa una vez por proceso en _init_worker)
+_WORKER = {}
+
+
+def _init_worker(model_name, data, tags, n_threads, tracking_uri, experiment_id, use_dataset_cache, profile,
+                 constraints):
+    """
+    Prepara un proceso del pool: abre los datos (memoria mapeada si se pasan directorios,
+    de modo que todos los procesos comparten las mismas páginas), limita los hilos de
+    BLAS/OpenMP y apunta MLflow al mismo servidor que el proceso principal.
+    """
+    warnings.filterwarnings("ignore", category=UserWarning, module="mlflow")
+    threadpool_limits(limits=n_threads)
+
+    mlflow.set_tracking_uri(tracking_uri)
+    # Los procesos del pool no ejecutan atexit: vaciar la cola de MLflow al terminar el proceso
+    tracker = get_tracker()
+    Finalize(tracker, tracker.close, exitpriority=10)
+
+    _WORKER.update(
+        model_name=model_name,
+        dataset_cache=DatasetCache() if use_dataset_cache else None,
+        tags=tags,
+        n_threads=n_threads,
+        experiment_id=experiment_id,
+        profile=profile,
+        constraints=constraints,
+        best_score=-float("inf"),
+        **{name: _load_mmap(*value) if isinstance(value, tuple) else value for name, value in data.items()},
+    )
+
+
+def _load_mmap(directory, dtype):
+    # Mismo tipo que la matriz del proceso principal; si el archivo ya lo tiene, sigue mapeada sin copia
+    return load_sparse_mmap(directory).astype(dtype, copy=False)
+
+
+def _run_group(group):
+    """
+    Entrena y evalúa un grupo de combinaciones [(índice, params), ...] dentro del proceso.
+    Cada combinación abre su propia corrida de MLflow con el experimento explícito, por lo
+    que las corridas no se mezclan. El modelo completo solo se registra cuando mejora el
+    mejor puntaje del proceso dentro de las restricciones de servicio.
+
+    Devuelve (resultados, error): si una combinación falla, los resultados de las que ya
+    terminaron se devuelven igual, junto con el mensaje del error.
+    """
+    start = time.perf_counter()
+    runs = [get_tracker().start_run(_WORKER["experiment_id"], tags={
+        "model_name": _WORKER["model_name"], **_WORKER["tags"], "grid_index": index,
+    }) for index, _ in group]
+
+    results, error = [], None
+    try:
+        trained = _train_group(_WORKER["model_name"], group, _WORKER["X_train"], _WORKER["y_train"], _WORKER["X_val"],
+                               _WORKER["y_val"], runs, _WORKER["dataset_cache"], _WORKER["n_threads"],
+                               _WORKER["profile"])
+        for (index, _), run, (model, metrics) in zip(group, runs, trained):
+            run.log_metrics({"val_f1": metrics["f1_score"]})
+            model_logged = (metrics["f1_score"] > _WORKER["best_score"]
+                            and within_budget(metrics, _WORKER["constraints"]))
+            if model_logged:
+                _WORKER["best_score"] = metrics["f1_score"]
+                ModelRegistry.log_model(run, model, f"best_{_WORKER['model_name']}")
+            run.end()
+
+            results.append({"index": index, "run_id": run.run_id, "f1_score": metrics["f1_score"],
+                            "metrics": _numeric(metrics), "model_logged": model_logged,
+                            "seconds": time.perf_counter() - start})
+            start = time.perf_counter()
+    except Exception as e:
+        _fail_runs(runs[len(results):])
+        error = str(e)
+
+    # Solo cuenta como registrado el modelo que se guardó; si no, `finalize` lo vuelve a entrenar
+    if any(result["model_logged"] for result in results):
+        get_tracker().flush()
+        for result, run in zip(results, runs):
+            result["model_logged"] = result["model_logged"] and run.model_error is None
+
+    return results, error
+
+
+def _numeric(metrics):
+    return {name: value for name, value in metrics.items() if isinstance(value, (int, float))}
+
+
+def _fail_runs(runs):
+    for run in runs:
+        run.end(status="FAILED")
+
+
+def _train_group(model_name, group, X_train, y_train, X_val, y_val, runs, dataset_cache=None, n_threads=None,
+                 profile=False):
+    """
+    Entrena un grupo de combinaciones y genera (modelo, métricas) para cada una, registradas
+    en su corrida de `runs`. Las combinaciones de un grupo solo difieren en el parámetro de
+    rondas/árboles/épocas y se entrenan haciendo crecer un solo modelo. Con `profile`, las
+    métricas incluyen la latencia de inferencia y el tamaño del modelo.
+    """
+    pipeline = ModelPipeline(model_name, group[0][1], dataset_cache=dataset_cache)
+    with _dataset_timing(dataset_cache, runs[0]):
+        if len(group) == 1:
+            trained = [pipeline.run(X_train, y_train, X_val, y_val, n_threads=n_threads, run=runs[0])]
+        else:
+            values = [params[ROUND_PARAMS[model_name]] for _, params in group]
+            trained = pipeline.run_warm_start(X_train, y_train, X_val, y_val, values, runs, n_threads=n_threads)
+
+        for run, (model, metrics) in zip(runs, trained):
+            if profile:
+                serving = profile_inference(model, X_val)
+                run.log_metrics(serving)
+                metrics.update(serving)
+            yield model, metrics
+
+
+def warm_start_groups(model_name, combinations):
+    """
+    Agrupa las combinaciones [(índice, params), ...] que solo difieren en el parámetro de
+    rondas/árboles/épocas (ROUND_PARAMS), ordenadas de menor a mayor valor. Un barrido de
+    n_estimators cuesta así lo mismo que su mayor punto.
+    """
+    param = ROUND_PARAMS.get(model_name)
+    groups = {}
+    for index, params in combinations:
+        if param not in params:
+            groups[("index", index)] = [(index, params)]
+            continue
+        key = tuple(sorted((name, repr(value)) for name, value in params.items() if name != param))
+        groups.setdefault(key, []).append((index, params))
+
+    result = []
+    for group in groups.values():
+        group.sort(key=lambda item: item[1].get(param, 0))
+        # Un valor repetido no puede crecer desde el anterior: va en su propio grupo
+        values = [params.get(param) for _, params in group]
+        unique = [item for i, item in enumerate(group) if i == 0 or values[i] != values[i - 1]]
+        result.append(unique)
+        result.extend([item] for i, item in enumerate(group) if i > 0 and values[i] == values[i - 1])
+    return result
+
+
+@contextmanager
+def _dataset_timing(dataset_cache, run):
+    """
+    Registra en `run` cuánto tiempo se gastó construyendo estructuras nativas de datos
+    y cuánto se ahorró reutilizándolas desde la caché.
+    """
+    if dataset_cache is None:
+        yield
+        return
+
+    built, saved = dataset_cache.build_seconds, dataset_cache.saved_seconds
+    yield
+    run.log_metrics({
+        "dataset_build_seconds": dataset_cache.build_seconds - built,
+        "dataset_saved_seconds": dataset_cache.saved_seconds - saved,
+    })
+
+
+def _log_progress(model_name, done, total, started, score):
+    elapsed = time.perf_counter() - started
+    eta = elapsed / done * (total - done)
+    logger.info(f"\t⏱️ {model_name} [{done}/{total}] f1_score: {score:.4f} | "
+                f"transcurrido {elapsed:.0f}s, restante estimado {eta:.0f}s")
+
+
 class GridSearch:
-    def __init__(self, model_name, X_train, y_train, X_val, y_val):
+    def __init__(self, model_name, X_train, y_train, X_val, y_val, tags=None, mmap_dirs=None, experiment_id=None,
+                 use_dataset_cache=True, warm_start=True, ledger=None, profile_inference=True, constraints=None):
         self.model_name = model_name
+        # Etiquetas adicionales de cada corrida (p. ej. data_namespace para distinguir muestras)
+        self.tags = tags or {}
         self.param_combinations = get_param_combinations(model_name)
         self.X_train, self.y_train = X_train, y_train
         self.X_val, self.y_val = X_val, y_val
+        # Directorios {"X_train": ..., "X_val": ...} en memoria mapeada, para que los procesos los abran sin copiarlos
+        self.mmap_dirs = mmap_dirs or {}
+        self.experiment_id = experiment_id
+        # Las estructuras nativas de XGBoost/LightGBM/CatBoost se construyen una vez y se reutilizan
+        self.use_dataset_cache = use_dataset_cache and model_name in CACHED_FAMILIES
+        self.dataset_cache = DatasetCache() if self.use_dataset_cache else None
+        # Las combinaciones que solo difieren en árboles/rondas/épocas hacen crecer un mismo modelo
+        self.warm_start = warm_start
+        # Estado de cada combinación; con un archivo, una búsqueda interrumpida se retoma donde quedó
+        self.ledger = ledger or TrialLedger()
+        self.scope = search_scope(model_name, self.tags, experiment_id, data_fingerprint(X_train, y_train))
+        # Latencia de inferencia y tamaño de cada modelo; `constraints` son límites superiores de esas
+        # métricas (p. ej. {"latency_p99_ms": 5.0}) que el mejor modelo debe cumplir
+        self.constraints = constraints or {}
+        self.profile_inference = profile_inference or bool(self.constraints)
+        # Mejor modelo entrenado en esta ejecución (clave del ledger, modelo); se serializa al terminar
+        self._best_model = (None, None)
+
+    def trial_key(self, params):
+        return trial_key(self.scope, params)
+
+    def groups(self, combinations=None):
+        """
+        Grupos de combinaciones [(índice, params), ...] que se entrenan juntos (uno por combinación sin warm start).
+        """
+        if combinations is None:
+            combinations = list(enumerate(self.param_combinations))
+        if self.warm_start:
+            return warm_start_groups(self.model_name, combinations)
+        return [[item] for item in combinations]
+
+    def pending(self):
+        """
+        Combinaciones sin completar que aún tienen intentos disponibles.
+        """
+        return [(index, params) for index, params in enumerate(self.param_combinations)
+                if self.ledger.should_run(self.trial_key(params))]
+
+    def run(self, n_workers=1):
+        """
+        Prueba todas las combinaciones que el ledger no tiene completadas. Las que fallan se
+        reintentan hasta agotar los intentos. Con `n_workers > 1` reparte los grupos de warm
+        start en un pool de procesos.
+        """
+        keys = [self.trial_key(params) for params in self.param_combinations]
+        counts = self.ledger.summary(keys)
+        if counts["completed"] or counts["failed"] or counts["running"]:
+            logger.info(f"\t⏭️ {self.model_name}: {counts['completed']} combinaciones ya completadas, "
+                        f"{counts['failed'] + counts['running']} fallidas o interrumpidas, {counts['new']} nuevas")
+
+        pending = self.pending()
+        while pending:
+            if n_workers > 1:
+                self.run_parallel(n_workers, pending)
+            else:
+                self.run_serial(pending)
+            pending = self.pending()
+
+        failed = [params for params in self.param_combinations
+                  if self.ledger.get(self.trial_key(params))["status"] != "completed"]
+        if failed:
+            logger.warning(f"\t⚠️ {self.model_name}: {len(failed)} combinaciones fallaron "
+                           f"{self.ledger.max_attempts} veces y se omiten")
+
+        best_params, best_score = self.finalize()
+
+        if self.dataset_cache is not None:
+            self.dataset_cache.log_report()
+
+        logger.info(f"\t✅ Mejor modelo: {self.model_name} con {best_params}, f1_score: {best_score}")
+        return best_params, best_score
+
+    def run_serial(self, combinations):
+        best_score = self._best_score()
+        started = time.perf_counter()
+        tracker = get_tracker()
+        done = 0
+
+        for group in self.groups(combinations):
+            logger.info(f"\t🔎 Probando {self.model_name} con {group[-1][1]}"
+                        + (f" ({len(group)} puntos con warm start)" if len(group) > 1 else ""))
+
+            keys = [self.trial_key(params) for _, params in group]
+            for key, (_, params) in zip(keys, group):
+                self.ledger.start(key, self.scope, params)
+
+            # Agregar un tag con el nombre del modelo
+            runs = [tracker.start_run(self.experiment_id, tags={"model_name": self.model_name, **self.tags})
+                    for _ in group]
+
+            finished, start = 0, time.perf_counter()
+            try:
+                trained = _train_group(self.model_name, group, self.X_train, self.y_train, self.X_val, self.y_val,
+                                       runs, self.dataset_cache, profile=self.profile_inference)
+                for key, run, (model, metrics) in zip(keys, runs, trained):
+                    run.log_metrics({"val_f1": metrics["f1_score"]})
+                    run.end()
+                    self.ledger.complete(key, metrics, time.perf_counter() - start, run_id=run.run_id)
+                    finished, start = finished + 1, time.perf_counter()
+
+                    if metrics["f1_score"] > best_score and within_budget(metrics, self.constraints):
+                        best_score = metrics["f1_score"]
+                        self._best_model = (key, model)
+
+                    done += 1
+                    _log_progress(self.model_name, done, len(combinations), started, metrics["f1_score"])
+            except Exception as e:
+                logger.error(f"\t❌ {self.model_name} con {group[finished][1]} falló: {e}")
+                _fail_runs(runs[finished:])
+                for key in keys[finished:]:
+                    self.ledger.fail(key, e, time.perf_counter() - start)
+
+    def run_parallel(self, n_workers, combinations=None):
+        """
+        Reparte las combinaciones en `n_workers` procesos. Cada proceso usa
+        cpu_count // n_workers hilos, para que el total no supere los núcleos de la máquina.
+        Cada proceso serializa solo los modelos que mejoran su propio mejor puntaje.
+        """
+        if combinations is None:
+            combinations = self.pending()
+        groups = self.groups(combinations)
+        n_workers = min(n_workers, len(groups))
+        n_threads = max(1, (os.cpu_count() or 1) // n_workers)
+
+        data = {"X_train": self.X_train, "y_train": self.y_train, "X_val": self.X_val, "y_val": self.y_val}
+        # Los procesos abren las matrices mapeadas con el mismo tipo que ya tienen en este proceso
+        data.update({name: (str(path), data[name].dtype) for name, path in self.mmap_dirs.items()})
+
+        logger.info(f"\t🚀 {self.model_name}: {len(combinations)} combinaciones en "
+                    f"{n_workers} procesos x {n_threads} hilos")
+
+        done = 0
+        started = time.perf_counter()
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_name, data, self.tags, n_threads, mlflow.get_tracking_uri(), self.experiment_id,
+                      self.use_dataset_cache, self.profile_inference, self.constraints),
+        ) as executor:
+            futures = {}
+            for group in groups:
+                for _, params in group:
+                    self.ledger.start(self.trial_key(params), self.scope, params)
+                futures[executor.submit(_run_group, group)] = group
+
+            for future in as_completed(futures):
+                group = futures[future]
+                try:
+                    group_results, error = future.result()
+                except Exception as e:
+                    # El proceso no llegó a devolver resultados (p. ej. terminó abruptamente)
+                    group_results, error = [], e
+
+                for result in group_results:
+                    self.ledger.complete(self.trial_key(self.param_combinations[result["index"]]), result["metrics"],
+                                         result["seconds"], run_id=result["run_id"],
+                                         model_logged=result["model_logged"])
+                    done += 1
+                    _log_progress(self.model_name, done, len(combinations), started, result["f1_score"])
+
+                if error is not None:
+                    # Solo fallan las combinaciones que no terminaron; las completadas no se repiten al reanudar
+                    finished = {result["index"] for result in group_results}
+                    failed = [params for index, params in group if index not in finished]
+                    logger.error(f"\t❌ {self.model_name} con {failed} falló: {error}")
+                    for params in failed:
+                        self.ledger.fail(self.trial_key(params), error)
 
-    def run(self):
-        best_score = -float("inf")
-        best_params = None
+    def finalize(self):
+        """
+        Mantiene consistente el puntero al mejor modelo entre ejecuciones: la mejor
+        combinación completada (de esta ejecución o de una anterior) tiene su modelo
+        serializado y es la única corrida con la etiqueta `best_model`.
+        """
+        keys = {self.trial_key(params): params for params in self.param_combinations}
+        best = self.ledger.best(keys, self.constraints)
+        if best is None and self.ledger.completed(keys):
+            raise RuntimeError(f"❌ Ninguna combinación de {self.model_name} cumple las restricciones {self.constraints}.")
+        if best is None:
+            raise RuntimeError(f"❌ Ninguna combinación de {self.model_name} terminó correctamente.")
 
-        for params in self.param_combinations:
-            logging.info(f"\t🔎 Probando {self.model_name} con {params}")
+        params = keys[best["key"]]
+        tracker = get_tracker()
+        run = tracker.attach(best["run_id"])
 
-            with mlflow.start_run():
-                # Agregar un tag con el nombre del modelo
-                mlflow.set_tag("model_name", self.model_name)
+        if not best["model_logged"]:
+            best_key, model = self._best_model
+            if best_key != best["key"]:
+                # La mejor combinación es de una ejecución anterior que no llegó a serializar su modelo
+                logger.info(f"\t🔁 Reentrenando el mejor modelo de una ejecución anterior: {params}")
+                model = ModelPipeline(self.model_name, params, dataset_cache=self.dataset_cache).get_model()
+                model.train(self.X_train, self.y_train, self.X_val, self.y_val)
+            ModelRegistry.log_model(run, model, f"best_{self.model_name}")
+            tracker.raise_for_model_error(run)
+            self.ledger.mark_model_logged(best["key"])
 
-                pipeline = ModelPipeline(self.model_name, params)
-                model, metrics = pipeline.run(self.X_train, self.y_train, self.X_val, self.y_val)
+        pointer = self.ledger.best_pointer(self.scope)
+        if pointer is not None and pointer["run_id"] not in (None, best["run_id"]):
+            try:
+                mlflow.MlflowClient().delete_tag(pointer["run_id"], "best_model")
+            except Exception as e:
+                logger.warning(f"\t⚠️ No se pudo quitar best_model de la corrida {pointer['run_id']}: {e}")
+        run.set_tags({"best_model": "true"})
+        self.ledger.set_best_pointer(self.scope, best["key"], best["run_id"])
+        if self.profile_inference:
+            self.log_pareto_front(run, keys)
+        tracker.flush()
 
-                mlflow.log_params(params)
-                mlflow.log_metric("val_f1", metrics["f1_score"])
-                
+        self._best_model = (None, None)
+        return params, best["score"]
 
-                if metrics["f1_score"] > best_score:
-                    best_score = metrics["f1_score"]
-                    best_params = params
+    def log_pareto_front(self, run, keys):
+        """
+        Registra en `run` (la mejor corrida) el frente de Pareto de f1_score contra latencia p99
+        de todas las combinaciones completadas: `pareto_front.json` con sus corridas, parámetros,
+        latencias y tamaños, y una métrica con el número de puntos del frente.
+        """
+        trials = [{"run_id": trial["run_id"], "params": keys[trial["key"]], **json.loads(trial["metrics"])}
+                  for trial in self.ledger.completed(keys)]
+        front = pareto_front(trials, objective="f1_score", cost="latency_p99_ms")
+        if not front:
+            return
 
-                    # # Convertir csr_matrix a un formato serializable
-                    # X_sample = self.X_train[:1].toarray() if hasattr(self.X_train, "toarray") else self.X_train[:1]
-                    # input_example = pd.DataFrame(X_sample).to_dict(orient='records')[0]
+        columns = ("run_id", "params", "f1_score", *COST_METRICS)
+        run.log_dict({
+            "objective": "f1_score",
+            "cost": "latency_p99_ms",
+            "constraints": self.constraints,
+            "front": [{column: trial.get(column) for column in columns} for trial in front],
+        }, "pareto_front.json")
+        run.log_metrics({"pareto_front_size": len(front)})
 
-                    mlflow.sklearn.log_model(model, f"best_{self.model_name}"
-                                             #, input_example=input_example
-                                             )
+        logger.info(f"\t📉 Frente de Pareto f1_score / latencia p99 ({len(front)} de {len(trials)}):\n"
+                    + "\n".join(f"\t\t{trial['latency_p99_ms']:.2f} ms -> f1_score {trial['f1_score']:.4f} "
+                                 f"({trial['model_size_bytes'] / 1e6:.1f} MB)" for trial in front))
 
-        logging.info(f"\t✅ Mejor modelo: {self.model_name} con {best_params}, f1_score: {best_score}")
+    def _best_score(self):
+        best = self.ledger.best((self.trial_key(params) for params in self.param_combinations), self.constraints)
+        return best["score"] if best is not None else -float("inf")
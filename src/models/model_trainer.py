@@ -1,5 +1,9 @@
 
+import mlflow
+
 from .model_registry import ModelRegistry
+from .telemetry import ResourceMeter, record_training
+from .tracking import get_tracker
 
 import warnings
 warnings.filterwarnings("ignore")
@@ -8,10 +12,58 @@ class ModelTrainer:
     def __init__(self, model):
         self.model = model
 
-    def train_and_log(self, X_train, y_train, X_val, y_val):
-        self.model.train(X_train, y_train)
-        metrics = self.model.evaluate(X_val, y_val)
+    def train_and_log(self, X_train, y_train, X_val, y_val, run=None, log_model=False):
+        """
+        Entrena, evalúa y encola el registro en `run` (TrackedRun). Sin `run` se usa la
+        corrida activa de MLflow, o una nueva. El registro ocurre en segundo plano; el
+        modelo completo solo se serializa con `log_model=True`. Las métricas incluyen el
+        costo del ajuste y de la predicción (telemetry.py).
+        """
+        # Los modelos de boosting usan X_val/y_val para la parada temprana
+        with ResourceMeter() as fit:
+            self.model.train(X_train, y_train, X_val, y_val)
+        with ResourceMeter() as predict:
+            metrics = self.model.evaluate(X_val, y_val)
+
+        metrics.update(fit.metrics("fit", X_train.shape[0]))
+        metrics.update(predict.metrics("predict", X_val.shape[0]))
+        return self._log(self.model, metrics, run, log_model, X_train, X_val)
+
+    def grow_and_log(self, X_train, y_train, X_val, y_val, param, values, runs):
+        """
+        Hace crecer un solo modelo por los valores (ascendentes) de `param` y evalúa y
+        registra cada punto en su corrida de `runs`. Genera (modelo, métricas) por punto.
+        El costo de ajuste de cada punto es el tiempo hasta obtenerlo; qué cubre (el punto, el
+        incremento desde el anterior o el grupo completo) queda en la etiqueta `fit_cost`.
+        """
+        checkpoints = self.model.grow(X_train, y_train, X_val, y_val, param, values)
+        for run in runs:
+            with ResourceMeter() as fit:
+                checkpoint = next(checkpoints, None)
+            if checkpoint is None:
+                return
+            model = checkpoint[1]
+            with ResourceMeter() as predict:
+                metrics = model.evaluate(X_val, y_val)
+
+            metrics.update(fit.metrics("fit", X_train.shape[0]))
+            metrics.update(predict.metrics("predict", X_val.shape[0]))
+            # grow_by_prefixes define el tipo de costo al entrenar, dentro del primer next()
+            yield model, self._log(model, metrics, run, False, X_train, X_val, fit_cost=self.model.grow_fit_cost)
+
+    @staticmethod
+    def _log(model, metrics, run, log_model, X_train, X_val, fit_cost="point"):
+        if model.best_iteration is not None:
+            metrics["best_iteration"] = model.best_iteration
+
+        if run is None:
+            active = mlflow.active_run()
+            run = get_tracker().attach(active.info.run_id) if active else get_tracker().start_run()
 
-        ModelRegistry.log_model(self.model, self.model.__class__.__name__, self.model.params, metrics)
+        ModelRegistry.log_run(run, model.params, metrics)
+        run.set_tags({"fit_cost": fit_cost})
+        if log_model:
+            ModelRegistry.log_model(run, model, model.__class__.__name__)
+        record_training(model, metrics, run, X_train, X_val, fit_cost=fit_cost)
 
         return metrics
@@ -1,10 +1,12 @@
+import copy
+
 from catboost import CatBoostClassifier
 from ..base_model import BaseModel
 from ..model_evaluator import ModelEvaluator
 
 class CatBoostModel(BaseModel):
-    def __init__(self, params=None):
-        super().__init__(params)
+    def __init__(self, params=None, **kwargs):
+        super().__init__(params, **kwargs)
 
         # Remover cualquier parámetro conflictivo
         for param in ["class_weights", "scale_pos_weight", "auto_class_weights"]:
@@ -16,11 +18,53 @@ class CatBoostModel(BaseModel):
         # Inicializar el modelo
         self.model = CatBoostClassifier(**self.params)
 
-    def train(self, X_train, y_train):
-        self.model.fit(X_train, y_train, verbose=0)
+    def train(self, X_train, y_train, X_val=None, y_val=None):
+        early_stopping = self.uses_early_stopping(X_val, y_val)
+        if self.dataset_cache is not None:
+            # Pool cuantizado una sola vez por búsqueda
+            train_pool, eval_set = self.dataset_cache.catboost(
+                X_train, y_train, *((X_val, y_val) if early_stopping else ()),
+                border_count=self.params.get("border_count", 254),
+            )
+            fit_data = (train_pool,)
+        else:
+            fit_data, eval_set = (X_train, y_train), (X_val, y_val)
+
+        if not early_stopping:
+            self.model.fit(*fit_data, verbose=0)
+            return
+
+        if self.eval_metric is not None:
+            self.model.set_params(eval_metric=self.eval_metric)
+        # use_best_model recorta el modelo a la mejor iteración: la inferencia solo usa esos árboles
+        self.model.fit(*fit_data, eval_set=eval_set, early_stopping_rounds=self.early_stopping_rounds,
+                       use_best_model=True, verbose=0)
+        self.best_iteration = int(self.model.get_best_iteration())
+        self.eval_history_metric = self.model.get_all_params()["eval_metric"]
+        self.eval_history = self.model.get_evals_result()["validation"][self.eval_history_metric]
+
+    def grow(self, X_train, y_train, X_val, y_val, param, values):
+        # Sin learning_rate explícito CatBoost lo elige según las iteraciones: cada punto sería otro modelo
+        if "learning_rate" not in self.params:
+            return super().grow(X_train, y_train, X_val, y_val, param, values)
+        return self.grow_by_prefixes(X_train, y_train, X_val, y_val, param, values)
+
+    def prefix_model(self, n_rounds):
+        checkpoint = copy.copy(self)
+        checkpoint.model = self.model.copy()
+        checkpoint.model.shrink(ntree_end=min(n_rounds, self.model.tree_count_))
+        return checkpoint
 
     def predict(self, X):
+        # use_best_model ya recorta el modelo; ntree_end aplica a los prefijos de grow()
+        if getattr(self, "best_iteration", None) is not None:
+            return self.model.predict(X, ntree_end=self.best_iteration + 1)
         return self.model.predict(X)
 
+    def predict_proba(self, X):
+        if getattr(self, "best_iteration", None) is not None:
+            return self.model.predict_proba(X, ntree_end=self.best_iteration + 1)
+        return self.model.predict_proba(X)
+
     def evaluate(self, X, y):
         return ModelEvaluator.evaluate(self, X, y)
@@ -1,18 +1,110 @@
-from lightgbm import LGBMClassifier
+import copy
+import inspect
+
+import lightgbm as lgb
+import numpy as np
+from lightgbm import LGBMClassifier, early_stopping
 from ..base_model import BaseModel
 from ..model_evaluator import ModelEvaluator
 
+# LightGBM >= 4.6 recibe la validación como eval_X/eval_y (eval_set quedó obsoleto)
+_EVAL_XY = "eval_X" in inspect.signature(LGBMClassifier.fit).parameters
+
 class LightGBMModel(BaseModel):
-    def __init__(self, params=None):
-        super().__init__(params)
+    def __init__(self, params=None, **kwargs):
+        super().__init__(params, **kwargs)
         self.model = LGBMClassifier(**self.params)
 
-    def train(self, X_train, y_train):
-        self.model.fit(X_train, y_train)
+    def train(self, X_train, y_train, X_val=None, y_val=None):
+        if self.dataset_cache is not None:
+            return self._train_cached(X_train, y_train, X_val, y_val)
+
+        if not self.uses_early_stopping(X_val, y_val):
+            self.model.fit(X_train, y_train)
+            return
+
+        eval_data = {"eval_X": (X_val,), "eval_y": (y_val,)} if _EVAL_XY else {"eval_set": [(X_val, y_val)]}
+        self.model.fit(
+            X_train, y_train,
+            **eval_data,
+            eval_metric=self.eval_metric,
+            callbacks=[early_stopping(self.early_stopping_rounds, first_metric_only=True, verbose=False)],
+        )
+        # best_iteration_ cuenta desde 1
+        self.best_iteration = int(self.model.best_iteration_) - 1
+        # first_metric_only: la parada temprana usa la primera métrica
+        self.eval_history_metric, self.eval_history = next(iter(self.model.evals_result_["valid_0"].items()))
+
+    def _train_cached(self, X_train, y_train, X_val, y_val):
+        """
+        Entrena con la API nativa sobre los Dataset ya construidos de la caché (la
+        discretización se hace una sola vez por búsqueda). El booster queda en self.booster.
+        """
+        sklearn_only = ("n_estimators", "class_weight", "importance_type")
+        params = {key: value for key, value in self.model.get_params().items()
+                  if key not in sklearn_only and value is not None}
+        early_stopping_enabled = self.uses_early_stopping(X_val, y_val)
+        dtrain, dval, self.classes_ = self.dataset_cache.lightgbm(
+            X_train, y_train, *((X_val, y_val) if early_stopping_enabled else ()),
+            class_weight=self.model.class_weight, max_bin=params.get("max_bin", 255),
+        )
+        if len(self.classes_) > 2:
+            params.update(objective="multiclass", num_class=len(self.classes_))
+        else:
+            params["objective"] = "binary"
+        if self.eval_metric is not None:
+            params["metric"] = self.eval_metric
+
+        evals_result = {}
+        self.booster = lgb.train(
+            params, dtrain,
+            num_boost_round=self.model.n_estimators,
+            valid_sets=[dval] if early_stopping_enabled else None,
+            callbacks=[early_stopping(self.early_stopping_rounds, first_metric_only=True, verbose=False),
+                       lgb.record_evaluation(evals_result)]
+            if early_stopping_enabled else None,
+        )
+        if early_stopping_enabled:
+            self.best_iteration = int(self.booster.best_iteration) - 1
+            self.eval_history_metric, self.eval_history = next(iter(evals_result["valid_0"].items()))
+
+    def grow(self, X_train, y_train, X_val, y_val, param, values):
+        return self.grow_by_prefixes(X_train, y_train, X_val, y_val, param, values)
+
+    def prefix_model(self, n_rounds):
+        # El punto predice con su propio booster recortado; el LGBMClassifier queda sin ajustar
+        booster = getattr(self, "booster", None) or self.model.booster_
+        checkpoint = copy.copy(self)
+        checkpoint.booster = lgb.Booster(model_str=booster.model_to_string(num_iteration=n_rounds))
+        checkpoint.classes_ = self.classes
+        checkpoint.model = LGBMClassifier(**self.model.get_params())
+        return checkpoint
 
     def predict(self, X):
+        if getattr(self, "booster", None) is not None:
+            return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+        # Solo los árboles hasta la mejor iteración (getattr: modelos serializados antes de la parada temprana)
+        if getattr(self, "best_iteration", None) is not None:
+            return self.model.predict(X, num_iteration=self.best_iteration + 1)
         return self.model.predict(X)
 
+    def predict_proba(self, X):
+        booster = getattr(self, "booster", None)
+        if booster is not None:
+            n_iterations = self.best_iteration + 1 if self.best_iteration is not None else None
+            probabilities = booster.predict(X, num_iteration=n_iterations)
+            # Binario: el booster devuelve solo la probabilidad de la clase positiva
+            return probabilities if probabilities.ndim > 1 else np.column_stack([1 - probabilities, probabilities])
+
+        if getattr(self, "best_iteration", None) is not None:
+            return self.model.predict_proba(X, num_iteration=self.best_iteration + 1)
+        return self.model.predict_proba(X)
+
+    @property
+    def classes(self):
+        return self.classes_ if getattr(self, "booster", None) is not None else self.model.classes_
+
     def evaluate(self, X, y):
         return ModelEvaluator.evaluate(self, X, y)
 
@@ -1,17 +1,55 @@
+import copy
+
 from sklearn.neural_network import MLPClassifier
 from ..base_model import BaseModel
 from ..model_evaluator import ModelEvaluator
 
 class MLPModel(BaseModel):
-    def __init__(self, params=None):
-        super().__init__(params)
+    # Cada punto de grow continúa el entrenamiento del anterior
+    grow_fit_cost = "incremental"
+
+    def __init__(self, params=None, **kwargs):
+        super().__init__(params, **kwargs)
         self.model = MLPClassifier(**self.params)
 
-    def train(self, X_train, y_train):
+    def train(self, X_train, y_train, X_val=None, y_val=None):
         self.model.fit(X_train, y_train)
 
+    def grow(self, X_train, y_train, X_val, y_val, param, values):
+        """
+        Continúa el entrenamiento con warm_start: cada punto entrena solo las épocas que le
+        faltan respecto al anterior. Si la red converge antes, los puntos siguientes son el
+        mismo modelo (un entrenamiento desde cero también se habría detenido ahí). El estado
+        del optimizador se reinicia en cada punto, así que la equivalencia es aproximada.
+        """
+        if self.model.solver == "lbfgs":
+            # lbfgs no es estocástico: max_iter no son épocas que se puedan continuar
+            yield from super().grow(X_train, y_train, X_val, y_val, param, values)
+            return
+
+        self.model.set_params(warm_start=True)
+        checkpoint, trained, requested = None, 0, 0
+        for value in values:
+            # max_iter y n_iter_ cuentan las épocas de cada llamada a fit; menos épocas que las pedidas = convergió
+            if checkpoint is None or self.model.n_iter_ == requested:
+                requested = value - trained
+                self.model.set_params(**{param: requested})
+                self.model.fit(X_train, y_train)
+                trained = value
+
+                checkpoint = copy.copy(self)
+                checkpoint.model = copy.deepcopy(self.model)
+                checkpoint.model.set_params(warm_start=False, **{param: value})
+            else:
+                checkpoint = copy.copy(checkpoint)
+            checkpoint.params = {**self.params, param: value}
+            yield value, checkpoint
+
     def predict(self, X):
         return self.model.predict(X)
 
+    def predict_proba(self, X):
+        return self.model.predict_proba(X)
+
     def evaluate(self, X, y):
         return ModelEvaluator.evaluate(self, X, y)
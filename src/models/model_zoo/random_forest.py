@@ -1,18 +1,47 @@
+import copy
+import warnings
 
 from sklearn.ensemble import RandomForestClassifier
 from ..base_model import BaseModel
 from ..model_evaluator import ModelEvaluator
 
 class RandomForestModel(BaseModel):
-    def __init__(self, params=None):
-        super().__init__(params)
+    # Cada punto de grow continúa el entrenamiento del anterior
+    grow_fit_cost = "incremental"
+
+    def __init__(self, params=None, **kwargs):
+        super().__init__(params, **kwargs)
         self.model = RandomForestClassifier(**self.params)
 
-    def train(self, X_train, y_train):
+    def train(self, X_train, y_train, X_val=None, y_val=None):
         self.model.fit(X_train, y_train)
 
+    def grow(self, X_train, y_train, X_val, y_val, param, values):
+        """
+        Agrega árboles con warm_start: con el mismo random_state, los primeros árboles son
+        los mismos que tendría un bosque entrenado desde cero con menos árboles.
+        """
+        self.model.set_params(warm_start=True)
+        for value in values:
+            self.model.set_params(**{param: value})
+            with warnings.catch_warnings():
+                # Aviso de class_weight="balanced" con warm_start: aquí los datos no cambian entre ajustes
+                warnings.filterwarnings("ignore", message="class_weight presets", category=UserWarning)
+                self.model.fit(X_train, y_train)
+
+            # Copia con su propia lista de árboles: los siguientes ajustes no la modifican
+            checkpoint = copy.copy(self)
+            checkpoint.params = {**self.params, param: value}
+            checkpoint.model = copy.copy(self.model)
+            checkpoint.model.estimators_ = list(self.model.estimators_)
+            checkpoint.model.set_params(warm_start=False)
+            yield value, checkpoint
+
     def predict(self, X):
         return self.model.predict(X)
 
+    def predict_proba(self, X):
+        return self.model.predict_proba(X)
+
     def evaluate(self, X, y):
         return ModelEvaluator.evaluate(self, X, y)
@@ -1,17 +1,82 @@
+import copy
+
+import numpy as np
+import xgboost as xgb
 from xgboost import XGBClassifier
 from ..base_model import BaseModel
 from ..model_evaluator import ModelEvaluator
 
 class XGBoostModel(BaseModel):
-    def __init__(self, params=None):
-        super().__init__(params)
+    def __init__(self, params=None, **kwargs):
+        super().__init__(params, **kwargs)
         self.model = XGBClassifier(**self.params)
 
-    def train(self, X_train, y_train):
-        self.model.fit(X_train, y_train)
+    def train(self, X_train, y_train, X_val=None, y_val=None):
+        if self.dataset_cache is not None:
+            return self._train_cached(X_train, y_train, X_val, y_val)
+
+        if not self.uses_early_stopping(X_val, y_val):
+            self.model.fit(X_train, y_train)
+            return
+
+        self.model.set_params(early_stopping_rounds=self.early_stopping_rounds)
+        if self.eval_metric is not None:
+            self.model.set_params(eval_metric=self.eval_metric)
+        self.model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
+        self.best_iteration = int(self.model.best_iteration)
+        # La parada temprana usa la última métrica de evaluación
+        self.eval_history_metric, self.eval_history = list(self.model.evals_result()["validation_0"].items())[-1]
+
+    def _train_cached(self, X_train, y_train, X_val, y_val):
+        """
+        Entrena con la API nativa sobre las QuantileDMatrix de la caché (la discretización se
+        hace una sola vez por búsqueda) y carga el booster en el XGBClassifier.
+        """
+        params = {key: value for key, value in self.model.get_xgb_params().items() if value is not None}
+        n_classes = len(np.unique(y_train))
+        if n_classes > 2:
+            params.update(objective="multi:softprob", num_class=n_classes)
+        if self.eval_metric is not None:
+            params["eval_metric"] = self.eval_metric
+
+        early_stopping = self.uses_early_stopping(X_val, y_val)
+        dtrain, dval = self.dataset_cache.xgboost(
+            X_train, y_train, *((X_val, y_val) if early_stopping else ()), max_bin=params.get("max_bin", 256)
+        )
+        evals_result = {}
+        booster = xgb.train(
+            params, dtrain,
+            num_boost_round=self.model.n_estimators or 100,
+            evals=[(dval, "validation_0")] if early_stopping else (),
+            early_stopping_rounds=self.early_stopping_rounds if early_stopping else None,
+            evals_result=evals_result,
+            verbose_eval=False,
+        )
+        self.model.load_model(bytearray(booster.save_raw("json")))
+        if early_stopping:
+            self.best_iteration = int(booster.best_iteration)
+            self.eval_history_metric, self.eval_history = list(evals_result["validation_0"].items())[-1]
+
+    def grow(self, X_train, y_train, X_val, y_val, param, values):
+        return self.grow_by_prefixes(X_train, y_train, X_val, y_val, param, values)
+
+    def prefix_model(self, n_rounds):
+        booster = self.model.get_booster()
+        checkpoint = copy.copy(self)
+        checkpoint.model = XGBClassifier(**self.model.get_params())
+        checkpoint.model.load_model(bytearray(booster[:min(n_rounds, booster.num_boosted_rounds())].save_raw("json")))
+        return checkpoint
 
     def predict(self, X):
+        # Solo los árboles hasta la mejor iteración (getattr: modelos serializados antes de la parada temprana)
+        if getattr(self, "best_iteration", None) is not None:
+            return self.model.predict(X, iteration_range=(0, self.best_iteration + 1))
         return self.model.predict(X)
 
+    def predict_proba(self, X):
+        if getattr(self, "best_iteration", None) is not None:
+            return self.model.predict_proba(X, iteration_range=(0, self.best_iteration + 1))
+        return self.model.predict_proba(X)
+
     def evaluate(self, X, y):
         return ModelEvaluator.evaluate(self, X, y)
@@ -1,14 +1,29 @@
 from .model_trainer import ModelTrainer
+from .model_config import EARLY_STOPPING_ROUNDS, ROUND_PARAMS
 from .model_zoo.random_forest import RandomForestModel
 from .model_zoo.xgboost_model import XGBoostModel
 from .model_zoo.lightgbm import LightGBMModel
 from .model_zoo.catboost import CatBoostModel
 from .model_zoo.mlp_model import MLPModel
 
+# Parámetro que controla los hilos de cada familia (MLP usa los hilos de BLAS, limitados con threadpoolctl)
+THREAD_PARAMS = {
+    "RandomForest": "n_jobs",
+    "XGBoost": "n_jobs",
+    "LightGBM": "n_jobs",
+    "CatBoost": "thread_count",
+}
+
 class ModelPipeline:
-    def __init__(self, model_name, params=None):
+    def __init__(self, model_name, params=None, early_stopping_rounds=EARLY_STOPPING_ROUNDS, eval_metric=None,
+                 dataset_cache=None):
         self.model_name = model_name
         self.params = params or {}
+        # Parada temprana con el conjunto de validación (paciencia y métrica)
+        self.early_stopping_rounds = early_stopping_rounds
+        self.eval_metric = eval_metric
+        # Caché de DMatrix/Dataset/Pool compartida entre las combinaciones de una búsqueda
+        self.dataset_cache = dataset_cache
 
     def get_model(self):
         model_registry = {
@@ -22,10 +37,29 @@ class ModelPipeline:
         if self.model_name not in model_registry:
             raise ValueError(f"Modelo {self.model_name} no soportado")
 
-        return model_registry[self.model_name](self.params)
+        return model_registry[self.model_name](
+            self.params, early_stopping_rounds=self.early_stopping_rounds, eval_metric=self.eval_metric,
+            dataset_cache=self.dataset_cache,
+        )
 
-    def run(self, X_train, y_train, X_val, y_val):
-        model = self.get_model()
+    def run(self, X_train, y_train, X_val, y_val, n_threads=None, run=None, log_model=False):
+        model = self.get_threaded_model(n_threads)
         trainer = ModelTrainer(model)
-        metrics = trainer.train_and_log(X_train, y_train, X_val, y_val)
+        metrics = trainer.train_and_log(X_train, y_train, X_val, y_val, run=run, log_model=log_model)
         return model, metrics
+
+    def run_warm_start(self, X_train, y_train, X_val, y_val, values, runs, n_threads=None):
+        """
+        Entrena los puntos de la grilla que solo difieren en el parámetro de rondas/árboles/épocas
+        (`values`, ascendentes) haciendo crecer un solo modelo. Genera (modelo, métricas) por punto,
+        cada uno registrado en su corrida de `runs`.
+        """
+        trainer = ModelTrainer(self.get_threaded_model(n_threads))
+        return trainer.grow_and_log(X_train, y_train, X_val, y_val, ROUND_PARAMS[self.model_name], values, runs)
+
+    def get_threaded_model(self, n_threads=None):
+        model = self.get_model()
+        # Los hilos se fijan en el estimador y no en self.params, para no alterar los parámetros registrados
+        if n_threads is not None and self.model_name in THREAD_PARAMS:
+            model.model.set_params(**{THREAD_PARAMS[self.model_name]: n_threads})
+        return model
@@ -0,0 +1,88 @@
+import logging
+
+import mlflow
+import numpy as np
+import pandas as pd
+from scipy.stats import spearmanr
+
+logger = logging.getLogger(__name__)
+
+FULL_NAMESPACE = "full"
+
+
+def _spearman(x, y):
+    if len(x) < 3 or np.ptp(x) == 0 or np.ptp(y) == 0:
+        return float("nan")
+    return float(spearmanr(x, y).statistic)
+
+
+def compare_sample_metrics(runs: pd.DataFrame, sample_namespace, metric="val_f1", top_k=5):
+    """
+    Compara la métrica de las mismas configuraciones (modelo + hiperparámetros) entrenadas
+    sobre la muestra y sobre los datos completos.
+
+    `runs` tiene el formato de `mlflow.search_runs`; las corridas sin la etiqueta
+    `data_namespace` se consideran corridas completas. Devuelve un resumen con la
+    correlación de Spearman entre ambos rankings (global y por modelo), si coincide la mejor
+    configuración, el solapamiento del top-k y la diferencia absoluta media, y la tabla pareada.
+    """
+    namespace_col = "tags.data_namespace"
+    namespace = runs[namespace_col].fillna(FULL_NAMESPACE) if namespace_col in runs else FULL_NAMESPACE
+
+    param_cols = sorted(col for col in runs.columns if col.startswith("params."))
+    key = runs[["tags.model_name"] + param_cols].fillna("").astype(str).agg("|".join, axis=1)
+
+    frame = pd.DataFrame({
+        "model_name": runs["tags.model_name"],
+        "config": key,
+        "namespace": namespace,
+        "metric": runs[f"metrics.{metric}"],
+    }).dropna(subset=["metric"])
+
+    table = frame.pivot_table(index=["model_name", "config"], columns="namespace", values="metric", aggfunc="mean")
+    if FULL_NAMESPACE not in table or sample_namespace not in table:
+        raise ValueError(f"No hay corridas de '{FULL_NAMESPACE}' y '{sample_namespace}' para comparar.")
+
+    paired = table[[FULL_NAMESPACE, sample_namespace]].dropna().rename(
+        columns={FULL_NAMESPACE: "full", sample_namespace: "sample"}
+    ).reset_index()
+
+    top_full = set(paired.nlargest(top_k, "full")["config"])
+    top_sample = set(paired.nlargest(top_k, "sample")["config"])
+
+    summary = {
+        "sample_namespace": sample_namespace,
+        "metric": metric,
+        "n_paired_configs": len(paired),
+        "spearman": _spearman(paired["sample"], paired["full"]),
+        "best_config_match": bool(len(paired) and paired["sample"].idxmax() == paired["full"].idxmax()),
+        f"top{top_k}_overlap": len(top_full & top_sample) / max(1, min(top_k, len(paired))),
+        "mean_abs_diff": float((paired["sample"] - paired["full"]).abs().mean()),
+        "spearman_by_model": {
+            model: _spearman(group["sample"], group["full"]) for model, group in paired.groupby("model_name")
+        },
+    }
+
+    return summary, paired
+
+
+def sample_fidelity_report(experiment_name, sample_namespace, metric="val_f1", top_k=5, output_file=None):
+    """
+    Busca en MLflow las corridas del experimento y reporta qué tan bien la métrica en la
+    muestra predice la métrica en los datos completos.
+    """
+    runs = mlflow.search_runs(experiment_names=[experiment_name])
+    summary, paired = compare_sample_metrics(runs, sample_namespace, metric=metric, top_k=top_k)
+
+    logger.info(
+        f"\t📐 Fidelidad de {sample_namespace} ({summary['n_paired_configs']} configuraciones pareadas): "
+        f"Spearman {summary['spearman']:.3f}, mejor configuración coincide: {summary['best_config_match']}, "
+        f"top-{top_k} {summary[f'top{top_k}_overlap']:.0%}, diferencia media {summary['mean_abs_diff']:.4f}"
+    )
+    for model, rho in summary["spearman_by_model"].items():
+        logger.info(f"\t\t{model}: Spearman {rho:.3f}")
+
+    if output_file is not None:
+        paired.to_csv(output_file, index=False)
+
+    return summary, paired
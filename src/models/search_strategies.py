@@ -0,0 +1,301 @@
+import logging
+import math
+import time
+import warnings
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from .dataset_cache import CACHED_FAMILIES, DatasetCache
+from .model_config import HYPERPARAM_GRID, ROUND_PARAMS
+from .model_registry import ModelRegistry
+from .pipeline import ModelPipeline
+from .tracking import get_tracker
+
+logger = logging.getLogger(__name__)
+
+# Ocultar advertencias de MLflow
+warnings.filterwarnings("ignore", category=UserWarning, module="mlflow")
+
+
+class SearchStrategy(ABC):
+    """
+    Base de las búsquedas con presupuesto. Comparte la interfaz de GridSearch
+    (constructor y `run()`) y registra cada ajuste en su propia corrida de MLflow; solo el
+    mejor modelo se serializa completo, al terminar.
+
+    El presupuesto se da en ajustes (`max_fits`) y/o en tiempo (`max_seconds`); al
+    agotarse no se lanzan ajustes nuevos. Cada ajuste cuenta como uno, sin importar
+    el tamaño de los datos o el número de rondas con que se entrene.
+    """
+
+    name = "base"
+
+    def __init__(self, model_name, X_train, y_train, X_val, y_val, tags=None, experiment_id=None,
+                 max_fits=None, max_seconds=None, random_state=42):
+        if max_fits is None and max_seconds is None:
+            raise ValueError("❌ Se debe indicar un presupuesto: max_fits y/o max_seconds.")
+
+        self.model_name = model_name
+        self.tags = tags or {}
+        self.grid = HYPERPARAM_GRID[model_name]
+        self.X_train, self.y_train = X_train, y_train
+        self.X_val, self.y_val = X_val, y_val
+        self.experiment_id = experiment_id
+        self.max_fits = max_fits
+        self.max_seconds = max_seconds
+        self.rng = np.random.default_rng(random_state)
+        # Las submuestras de successive halving son datos nuevos; los ajustes con todas las filas reutilizan la caché
+        self.dataset_cache = DatasetCache() if model_name in CACHED_FAMILIES else None
+
+        self.n_fits = 0
+        self.best_score = -float("inf")
+        self.best_params = None
+        self.best_fraction = 0.0
+        self._best = None  # (modelo, corrida) del mejor ajuste; se serializa al terminar la búsqueda
+        self._started = None
+
+    def run(self):
+        self._started = time.perf_counter()
+        self.search()
+        elapsed = time.perf_counter() - self._started
+        tracker = get_tracker()
+        if self._best is not None:
+            model, run = self._best
+            run.set_tags({"best_model": "true"})
+            ModelRegistry.log_model(run, model, f"best_{self.model_name}")
+            self._best = None
+            tracker.raise_for_model_error(run)
+        tracker.flush()
+        if self.dataset_cache is not None:
+            self.dataset_cache.log_report()
+        logger.info(f"\t✅ Mejor modelo ({self.name}, {self.n_fits} ajustes en {elapsed:.0f}s): "
+                    f"{self.model_name} con {self.best_params}, f1_score: {self.best_score}")
+        return self.best_params, self.best_score
+
+    @abstractmethod
+    def search(self):
+        pass
+
+    def exhausted(self):
+        if self.max_fits is not None and self.n_fits >= self.max_fits:
+            return True
+        return self.max_seconds is not None and time.perf_counter() - self._started >= self.max_seconds
+
+    def sample_params(self):
+        return {key: values[self.rng.integers(len(values))] for key, values in self.grid.items()}
+
+    def config_key(self, params):
+        return tuple(sorted((key, repr(value)) for key, value in params.items()))
+
+    def subsample_rows(self, fraction):
+        """
+        Filas de una submuestra estratificada: cada clase conserva `fraction` de sus
+        registros y al menos uno, para que ningún modelo vea menos clases que en validación.
+        """
+        classes, labels = np.unique(self.y_train, return_inverse=True)
+        rows = []
+        for label in range(len(classes)):
+            members = np.flatnonzero(labels == label)
+            n_rows = max(1, int(round(len(members) * fraction)))
+            rows.append(self.rng.choice(members, size=n_rows, replace=False))
+        return np.sort(np.concatenate(rows))
+
+    def evaluate(self, params, fraction=1.0, resource="n_samples", tags=None):
+        """
+        Entrena y evalúa `params` con una fracción del recurso: filas de entrenamiento
+        (`n_samples`) o rondas de boosting/árboles/épocas (`rounds`). Solo los ajustes con
+        el mayor recurso evaluado compiten por el mejor modelo (si el presupuesto se agota
+        antes de llegar al recurso completo, gana la mejor de la ronda más alta).
+        Si el ajuste falla, la corrida queda como FAILED, el ajuste cuenta en el presupuesto y
+        se devuelve -inf para que la búsqueda continúe con las demás configuraciones.
+        """
+        params = dict(params)
+        X_train, y_train = self.X_train, self.y_train
+        if fraction < 1.0 and resource == "rounds":
+            round_param = ROUND_PARAMS[self.model_name]
+            params[round_param] = max(1, int(round(params[round_param] * fraction)))
+        elif fraction < 1.0:
+            rows = self.subsample_rows(fraction)
+            X_train, y_train = X_train[rows], y_train[rows]
+
+        self.n_fits += 1
+        logger.info(f"\t🔎 [{self.name} {self.n_fits}] Probando {self.model_name} con {params} "
+                    f"({resource} {fraction:.0%})")
+
+        run = get_tracker().start_run(self.experiment_id, tags={
+            "model_name": self.model_name, **self.tags, "search_strategy": self.name, "resource": resource,
+            "resource_fraction": fraction, **(tags or {}),
+        })
+
+        try:
+            pipeline = ModelPipeline(self.model_name, params, dataset_cache=self.dataset_cache)
+            model, metrics = pipeline.run(X_train, y_train, self.X_val, self.y_val, run=run)
+        except Exception as e:
+            logger.error(f"\t❌ {self.model_name} con {params} falló: {e}")
+            run.end(status="FAILED")
+            return -float("inf")
+
+        run.log_metrics({"val_f1": metrics["f1_score"]})
+        run.end()
+
+        if fraction > self.best_fraction or (fraction == self.best_fraction and metrics["f1_score"] > self.best_score):
+            self.best_score = metrics["f1_score"]
+            self.best_params = params
+            self.best_fraction = fraction
+            self._best = (model, run)
+
+        return metrics["f1_score"]
+
+
+class RandomSearch(SearchStrategy):
+    """
+    Configuraciones muestreadas al azar de la grilla, sin repetir, hasta agotar el presupuesto.
+    """
+
+    name = "random"
+
+    def search(self):
+        n_combinations = math.prod(len(values) for values in self.grid.values())
+        seen = set()
+        while not self.exhausted() and len(seen) < n_combinations:
+            params = self.sample_params()
+            if self.config_key(params) in seen:
+                continue
+            seen.add(self.config_key(params))
+            self.evaluate(params)
+
+
+class SuccessiveHalving(SearchStrategy):
+    """
+    Successive halving: empieza con `n_configs` configuraciones al azar entrenadas con
+    `min_fraction` del recurso (filas o rondas) y en cada ronda conserva el mejor 1/`eta`
+    multiplicando el recurso por `eta`, hasta llegar al recurso completo.
+    """
+
+    name = "halving"
+
+    def __init__(self, *args, resource="n_samples", eta=3, min_fraction=1 / 27, n_configs=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if resource not in ("n_samples", "rounds"):
+            raise ValueError(f"❌ Recurso no soportado: {resource}")
+        self.resource = resource
+        self.eta = eta
+        self.min_fraction = min_fraction
+        self.n_configs = n_configs
+
+    def n_rungs(self):
+        return int(round(math.log(1 / self.min_fraction, self.eta))) + 1
+
+    def search(self):
+        s = self.n_rungs() - 1
+        self.halving(self.unique_configs(self.n_configs or self.eta ** s), s, bracket=0)
+
+    def unique_configs(self, n_configs):
+        configs = {}
+        for _ in range(n_configs * 10):
+            if len(configs) == n_configs:
+                break
+            params = self.sample_params()
+            configs.setdefault(self.config_key(params), params)
+        return list(configs.values())
+
+    def halving(self, configs, s, bracket):
+        """
+        Ejecuta `s + 1` rondas: la ronda r usa eta^(r - s) del recurso, la última el recurso completo.
+        """
+        for rung in range(s + 1):
+            fraction = float(self.eta ** (rung - s)) if rung < s else 1.0
+            scores = []
+            for params in configs:
+                if self.exhausted():
+                    return
+                scores.append(self.evaluate(params, fraction, self.resource, tags={"bracket": bracket, "rung": rung}))
+
+            keep = max(1, len(configs) // self.eta)
+            configs = [configs[i] for i in np.argsort(scores)[::-1][:keep]]
+
+
+class Hyperband(SuccessiveHalving):
+    """
+    Hyperband: repite successive halving con distintos compromisos entre número de
+    configuraciones y recurso inicial, desde muchas configuraciones con poco recurso
+    hasta pocas configuraciones con el recurso completo.
+    """
+
+    name = "hyperband"
+
+    def search(self):
+        s_max = self.n_rungs() - 1
+        for bracket, s in enumerate(range(s_max, -1, -1)):
+            if self.exhausted():
+                return
+            n_configs = int(math.ceil((s_max + 1) / (s + 1) * self.eta ** s))
+            self.halving(self.unique_configs(n_configs), s, bracket=bracket)
+
+
+class TPESearch(SearchStrategy):
+    """
+    Optimización bayesiana tipo TPE (Tree-structured Parzen Estimator) sobre la grilla
+    discreta. Tras `n_startup` configuraciones al azar, separa las evaluadas en buenas
+    (cuantil `gamma` superior) y malas, estima por parámetro la frecuencia suavizada de
+    cada valor en ambos grupos y elige, entre `n_candidates` muestreadas de las buenas,
+    la que maximiza el cociente l(x) / g(x).
+    """
+
+    name = "tpe"
+
+    def __init__(self, *args, n_startup=10, gamma=0.25, n_candidates=24, prior_weight=1.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.n_startup = n_startup
+        self.gamma = gamma
+        self.n_candidates = n_candidates
+        self.prior_weight = prior_weight
+        self.history = []  # (params, score)
+
+    def value_weights(self, group, key):
+        values = self.grid[key]
+        counts = np.full(len(values), self.prior_weight)
+        for params, _ in group:
+            counts[[repr(value) for value in values].index(repr(params[key]))] += 1
+        return counts / counts.sum()
+
+    def suggest(self):
+        ordered = sorted(self.history, key=lambda item: item[1], reverse=True)
+        n_good = max(1, int(math.ceil(self.gamma * len(ordered))))
+        good, bad = ordered[:n_good], ordered[n_good:]
+
+        good_weights = {key: self.value_weights(good, key) for key in self.grid}
+        bad_weights = {key: self.value_weights(bad, key) for key in self.grid}
+        seen = {self.config_key(params) for params, _ in self.history}
+
+        best, best_ratio = None, -float("inf")
+        for _ in range(self.n_candidates):
+            choice = {key: self.rng.choice(len(values), p=good_weights[key]) for key, values in self.grid.items()}
+            params = {key: self.grid[key][index] for key, index in choice.items()}
+            if self.config_key(params) in seen:
+                continue
+            ratio = sum(np.log(good_weights[key][index]) - np.log(bad_weights[key][index])
+                        for key, index in choice.items())
+            if ratio > best_ratio:
+                best, best_ratio = params, ratio
+
+        return best or self.sample_params()
+
+    def search(self):
+        n_combinations = math.prod(len(values) for values in self.grid.values())
+        seen = set()
+        while not self.exhausted() and len(seen) < n_combinations:
+            params = self.sample_params() if len(self.history) < self.n_startup else self.suggest()
+            if self.config_key(params) in seen:
+                continue
+            seen.add(self.config_key(params))
+            self.history.append((params, self.evaluate(params)))
+
+
+STRATEGIES = {
+    "random": RandomSearch,
+    "halving": SuccessiveHalving,
+    "hyperband": Hyperband,
+    "tpe": TPESearch,
+}
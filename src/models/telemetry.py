@@ -0,0 +1,118 @@
+import csv
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+# Archivo CSV con una fila por entrenamiento; sin la variable solo se registra en MLflow.
+# Se pasa por el entorno para que los procesos del pool de la búsqueda lo hereden.
+TELEMETRY_ENV = "TRAINING_TELEMETRY_FILE"
+
+PHASE_METRICS = ("wall_seconds", "cpu_seconds", "peak_rss_mb", "threads", "rows_per_second")
+TELEMETRY_METRICS = tuple(f"{phase}_{name}" for phase in ("fit", "predict") for name in PHASE_METRICS)
+CSV_COLUMNS = ("timestamp", "model", "run_id", "n_train_rows", "n_val_rows", "n_features", "fit_cost",
+               *TELEMETRY_METRICS, "best_iteration", "f1_score", "params")
+
+
+class ResourceMeter:
+    """
+    Mide el costo del proceso mientras dura el bloque `with`: tiempo de reloj, tiempo de CPU
+    (usuario + sistema, de todos los hilos), pico de memoria residente y máximo de hilos.
+    RSS e hilos se muestrean en un hilo aparte, además de al entrar y al salir.
+    """
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.process = psutil.Process()
+        self._stop = threading.Event()
+
+    def _cpu_seconds(self):
+        times = self.process.cpu_times()
+        return times.user + times.system
+
+    def _update(self):
+        self.peak_rss = max(self.peak_rss, self.process.memory_info().rss)
+        self.threads = max(self.threads, self.process.num_threads())
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self._update()
+
+    def __enter__(self):
+        self.peak_rss, self.threads = 0, 0
+        self._update()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        self._cpu_start = self._cpu_seconds()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall_seconds = time.perf_counter() - self._start
+        self.cpu_seconds = self._cpu_seconds() - self._cpu_start
+        self._stop.set()
+        self._thread.join()
+        self._update()
+
+    def metrics(self, phase, n_rows):
+        return {
+            f"{phase}_wall_seconds": self.wall_seconds,
+            f"{phase}_cpu_seconds": self.cpu_seconds,
+            f"{phase}_peak_rss_mb": self.peak_rss / 2**20,
+            f"{phase}_threads": self.threads,
+            f"{phase}_rows_per_second": n_rows / self.wall_seconds if self.wall_seconds > 0 else float("inf"),
+        }
+
+
+def telemetry_file():
+    path = os.getenv(TELEMETRY_ENV)
+    return Path(path) if path else None
+
+
+def record_training(model, metrics, run, X_train, X_val, fit_cost="point", path=None):
+    """
+    Agrega una fila al CSV de telemetría (`path` o el de TRAINING_TELEMETRY_FILE) con el costo
+    del entrenamiento, el tamaño de los datos y los parámetros. No hace nada sin archivo.
+    `fit_cost` indica qué cubren las métricas de ajuste (ver `BaseModel.grow_fit_cost`).
+    Con `run`, la fila se escribe desde la cola del tracker, cuando ya se conoce su run_id.
+    """
+    path = path or telemetry_file()
+    if path is None:
+        return
+
+    row = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "model": model.__class__.__name__,
+        "run_id": None,
+        "n_train_rows": X_train.shape[0],
+        "n_val_rows": X_val.shape[0],
+        "n_features": X_train.shape[1],
+        "fit_cost": fit_cost,
+        **{name: metrics.get(name) for name in (*TELEMETRY_METRICS, "best_iteration", "f1_score")},
+        "params": json.dumps(model.params, sort_keys=True, default=repr),
+    }
+
+    if run is None:
+        _append_row(path, row)
+    else:
+        run.call(lambda run_id: _append_row(path, {**row, "run_id": run_id}))
+
+
+def _append_row(path, row):
+    try:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Una sola escritura por fila en modo append: los procesos de la búsqueda comparten el archivo
+        with open(path, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+            if f.tell() == 0:
+                writer.writeheader()
+            writer.writerow(row)
+    except OSError as e:
+        logger.warning(f"⚠️ No se pudo escribir la telemetría de entrenamiento en {path}: {e}")
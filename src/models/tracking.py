@@ -0,0 +1,254 @@
+import atexit
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+
+import mlflow
+from mlflow.entities import Metric, Param, RunTag
+from mlflow.tracking import MlflowClient
+
+logger = logging.getLogger(__name__)
+
+# Límites de MLflow por llamada a log_batch
+MAX_PARAMS_PER_BATCH = 100
+MAX_TAGS_PER_BATCH = 100
+MAX_METRICS_PER_BATCH = 1000
+
+_STOP = object()
+
+
+class TrackedRun:
+    """
+    Corrida de MLflow cuyas operaciones se encolan en un AsyncTracker. Todos los métodos
+    regresan de inmediato; solo `run_id` espera a que la corrida exista en el servidor.
+    """
+
+    def __init__(self, tracker, run_id=None):
+        self._tracker = tracker
+        # Servidor vigente al abrir la corrida; el hilo de fondo registra ahí aunque luego cambie
+        self.tracking_uri = mlflow.get_tracking_uri()
+        self._run_id = run_id
+        # Error al serializar el modelo (`log_model`); se consulta después de `flush()`
+        self.model_error = None
+        self._created = threading.Event()
+        if run_id is not None:
+            self._created.set()
+
+    @property
+    def run_id(self):
+        self._created.wait()
+        return self._run_id
+
+    def log_params(self, params):
+        self._tracker.submit(self, "params", {key: str(value) for key, value in params.items()})
+
+    def log_metrics(self, metrics):
+        self._tracker.submit(self, "metrics", {key: float(value) for key, value in metrics.items()})
+
+    def set_tags(self, tags):
+        self._tracker.submit(self, "tags", {key: str(value) for key, value in tags.items()})
+
+    def log_dict(self, dictionary, artifact_file):
+        """
+        Artefacto JSON desde memoria (sin escribir archivos en el directorio de trabajo).
+        """
+        self._tracker.submit(self, "dict", (dictionary, artifact_file))
+
+    def log_model(self, model, artifact_path):
+        """
+        Serializa el modelo completo en el hilo de fondo. Reservado para los finalistas de
+        una búsqueda; el modelo no debe modificarse después de llamar a este método.
+        Tras `flush()`, `model_error` indica si no se pudo guardar.
+        """
+        self._tracker.submit(self, "model", (model, artifact_path))
+
+    def call(self, func):
+        """
+        Ejecuta `func(run_id)` en el hilo de fondo, en orden con el resto de la cola, una vez
+        creada la corrida (sin bloquear al que llama, a diferencia de `run_id`).
+        """
+        self._tracker.submit(self, "call", func)
+
+    def end(self, status="FINISHED"):
+        self._tracker.submit(self, "end", status)
+
+
+class AsyncTracker:
+    """
+    Cola de registro en MLflow atendida por un hilo de fondo, para que el entrenamiento
+    no espere la E/S del servidor de tracking.
+
+    Los parámetros, métricas y etiquetas consecutivos de una misma corrida se agrupan en
+    una sola llamada a `log_batch`; los artefactos se envían desde memoria. Los errores de
+    registro se informan en el log y no interrumpen el entrenamiento; el de un modelo queda
+    además en `model_error` de su corrida (ver `raise_for_model_error`).
+    """
+
+    def __init__(self, client=None):
+        self._client = client
+        self._clients = {}  # tracking URI -> MlflowClient
+        self.errors = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._work, name="mlflow-tracker", daemon=True)
+        self._thread.start()
+
+    def client_for(self, run):
+        if self._client is not None:
+            return self._client
+        if run.tracking_uri not in self._clients:
+            self._clients[run.tracking_uri] = MlflowClient(run.tracking_uri)
+        return self._clients[run.tracking_uri]
+
+    def start_run(self, experiment_id=None, tags=None, run_name=None):
+        run = TrackedRun(self)
+        # El experimento activo se resuelve aquí, en el hilo que abre la corrida
+        run.experiment_id = experiment_id if experiment_id is not None else mlflow.tracking.fluent._get_experiment_id()
+        self.submit(run, "create", (run.experiment_id, tags or {}, run_name))
+        return run
+
+    def attach(self, run_id):
+        """
+        Envuelve una corrida ya existente (p. ej. la activa de `mlflow.start_run`).
+        """
+        return TrackedRun(self, run_id)
+
+    def submit(self, run, kind, payload):
+        self._queue.put((run, kind, payload))
+
+    def flush(self):
+        """
+        Espera a que se procese todo lo encolado hasta ahora.
+        """
+        self._queue.join()
+
+    def raise_for_model_error(self, run):
+        """
+        Vacía la cola y lanza un error si no se pudo guardar el modelo de `run`.
+        """
+        self.flush()
+        if run.model_error is not None:
+            error = run.model_error
+            raise RuntimeError(f"❌ No se pudo guardar el modelo de la corrida {run.run_id}: {error}") from error
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _work(self):
+        pending = None  # (run, {"params": {}, "metrics": {}, "tags": {}}) acumulado para log_batch
+        while True:
+            try:
+                item = self._queue.get(timeout=0.5 if pending else None)
+            except queue.Empty:
+                self._send_batch(pending)
+                pending = None
+                continue
+
+            if item is _STOP:
+                self._send_batch(pending)
+                self._queue.task_done()
+                return
+
+            run, kind, payload = item
+            if kind in ("params", "metrics", "tags"):
+                if pending is not None and pending[0] is not run:
+                    self._send_batch(pending)
+                    pending = None
+                if pending is None:
+                    pending = (run, {"params": {}, "metrics": {}, "tags": {}})
+                pending[1][kind].update(payload)
+            else:
+                self._send_batch(pending)
+                pending = None
+                self._call(self._handle, run, kind, payload)
+
+            # Sin más trabajo en cola: enviar lo acumulado antes de marcar la tarea como hecha
+            if pending is not None and self._queue.qsize() == 0:
+                self._send_batch(pending)
+                pending = None
+            self._queue.task_done()
+
+    def _call(self, func, *args):
+        try:
+            func(*args)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"❌ Error registrando en MLflow: {e}")
+
+    def _handle(self, run, kind, payload):
+        if kind == "create":
+            experiment_id, tags, run_name = payload
+            try:
+                run._run_id = self.client_for(run).create_run(experiment_id, tags=tags, run_name=run_name).info.run_id
+            finally:
+                run._created.set()
+            return
+
+        if run._run_id is None:
+            raise RuntimeError("la corrida no se pudo crear")
+
+        if kind == "dict":
+            dictionary, artifact_file = payload
+            self.client_for(run).log_dict(run._run_id, dictionary, artifact_file)
+        elif kind == "model":
+            model, artifact_path = payload
+            try:
+                with tempfile.TemporaryDirectory() as tmp_dir:
+                    # cloudpickle en todas las versiones: el formato por defecto de MLflow 3 (skops)
+                    # no acepta las clases del repo
+                    mlflow.sklearn.save_model(model, os.path.join(tmp_dir, artifact_path),
+                                              serialization_format="cloudpickle")
+                    self.client_for(run).log_artifacts(run._run_id, os.path.join(tmp_dir, artifact_path), artifact_path)
+            except Exception as e:
+                run.model_error = e
+                raise
+        elif kind == "call":
+            payload(run._run_id)
+        elif kind == "end":
+            self.client_for(run).set_terminated(run._run_id, status=payload)
+
+    def _send_batch(self, pending):
+        if pending is None:
+            return
+        run, batch = pending
+        self._call(self._log_batch, run, batch)
+
+    def _log_batch(self, run, batch):
+        if run._run_id is None:
+            raise RuntimeError("la corrida no se pudo crear")
+
+        timestamp = int(time.time() * 1000)
+        params = [Param(key, value) for key, value in batch["params"].items()]
+        metrics = [Metric(key, value, timestamp, 0) for key, value in batch["metrics"].items()]
+        tags = [RunTag(key, value) for key, value in batch["tags"].items()]
+
+        while params or metrics or tags:
+            self.client_for(run).log_batch(
+                run._run_id,
+                metrics=metrics[:MAX_METRICS_PER_BATCH],
+                params=params[:MAX_PARAMS_PER_BATCH],
+                tags=tags[:MAX_TAGS_PER_BATCH],
+            )
+            params = params[MAX_PARAMS_PER_BATCH:]
+            metrics = metrics[MAX_METRICS_PER_BATCH:]
+            tags = tags[MAX_TAGS_PER_BATCH:]
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_tracker():
+    """
+    AsyncTracker del proceso (se crea al primer uso y se vacía al salir).
+    """
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = AsyncTracker()
+            atexit.register(_tracker.close)
+        return _tracker
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse
+
+from .inference_profile import within_budget
+
+logger = logging.getLogger(__name__)
+
+# Intentos por combinación antes de darla por fallida (incluye los interrumpidos)
+MAX_ATTEMPTS = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trials (
+    key TEXT PRIMARY KEY,
+    scope TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    score REAL,
+    metrics TEXT,
+    seconds REAL,
+    run_id TEXT,
+    model_logged INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS best (
+    scope TEXT PRIMARY KEY,
+    key TEXT NOT NULL,
+    run_id TEXT
+);
+"""
+
+
+def _digest(payload):
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=repr).encode()).hexdigest()
+
+
+def data_fingerprint(X_train, y_train):
+    """
+    Huella barata de los datos de entrenamiento: forma y elementos no nulos de X y hash de y.
+    Cambia si se regeneran las particiones, aunque el data_namespace sea el mismo.
+    """
+    nnz = X_train.nnz if scipy.sparse.issparse(X_train) else int(np.count_nonzero(X_train))
+    labels = np.ascontiguousarray(y_train)
+    return _digest({"shape": list(X_train.shape), "nnz": int(nnz),
+                    "y": hashlib.sha1(labels.tobytes() + str(labels.dtype).encode()).hexdigest()})
+
+
+def search_scope(model_name, tags=None, experiment_id=None, data=None):
+    """
+    Identifica una búsqueda: familia de modelos, etiquetas (p. ej. data_namespace), experimento
+    y huella de los datos (`data_fingerprint`), para no reutilizar resultados de otros datos.
+    """
+    return _digest({"model_name": model_name, "tags": tags or {}, "experiment_id": experiment_id, "data": data})
+
+
+def trial_key(scope, params):
+    return _digest({"scope": scope, "params": params})
+
+
+class TrialLedger:
+    """
+    Registro local en SQLite de cada combinación de una búsqueda: hash de parámetros,
+    estado (running / completed / failed), intentos, métricas, duración y corrida de MLflow.
+
+    Cada cambio se confirma de inmediato, así una búsqueda interrumpida se retoma sin
+    repetir las combinaciones terminadas. Una combinación que quedó en `running` fue
+    interrumpida y cuenta como intento fallido. Con `path=":memory:"` el registro solo
+    dura lo que el proceso.
+    """
+
+    def __init__(self, path=":memory:", max_attempts=MAX_ATTEMPTS):
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_attempts = max_attempts
+        self.connection = sqlite3.connect(str(path), isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(_SCHEMA)
+
+    def get(self, key):
+        return self.connection.execute("SELECT * FROM trials WHERE key = ?", (key,)).fetchone()
+
+    def should_run(self, key):
+        trial = self.get(key)
+        return trial is None or (trial["status"] != "completed" and trial["attempts"] < self.max_attempts)
+
+    def start(self, key, scope, params):
+        self.connection.execute(
+            "INSERT INTO trials (key, scope, params, status, attempts, updated_at) VALUES (?, ?, ?, 'running', 1, ?) "
+            "ON CONFLICT(key) DO UPDATE SET status = 'running', attempts = attempts + 1, error = NULL, "
+            "updated_at = excluded.updated_at",
+            (key, scope, json.dumps(params, sort_keys=True, default=repr), time.time()),
+        )
+
+    def complete(self, key, metrics, seconds, run_id=None, model_logged=False):
+        numeric = {name: value for name, value in metrics.items() if isinstance(value, (int, float))}
+        self.connection.execute(
+            "UPDATE trials SET status = 'completed', score = ?, metrics = ?, seconds = ?, run_id = ?, "
+            "model_logged = ?, updated_at = ? WHERE key = ?",
+            (metrics["f1_score"], json.dumps(numeric), seconds, run_id, int(model_logged), time.time(), key),
+        )
+
+    def fail(self, key, error, seconds=None):
+        self.connection.execute(
+            "UPDATE trials SET status = 'failed', error = ?, seconds = ?, updated_at = ? WHERE key = ?",
+            (str(error), seconds, time.time(), key),
+        )
+
+    def mark_model_logged(self, key):
+        self.connection.execute("UPDATE trials SET model_logged = 1 WHERE key = ?", (key,))
+
+    def completed(self, keys):
+        """
+        Combinaciones completadas entre `keys`, de mayor a menor puntaje.
+        """
+        keys = list(keys)
+        if not keys:
+            return []
+        placeholders = ",".join("?" * len(keys))
+        return self.connection.execute(
+            f"SELECT * FROM trials WHERE status = 'completed' AND key IN ({placeholders}) "
+            f"ORDER BY score DESC, updated_at ASC",
+            keys,
+        ).fetchall()
+
+    def best(self, keys, constraints=None):
+        """
+        Combinación completada con mayor puntaje entre `keys` que cumple `constraints`
+        (límites superiores de métricas, p. ej. {"latency_p99_ms": 5.0}).
+        """
+        for trial in self.completed(keys):
+            if within_budget(json.loads(trial["metrics"]), constraints):
+                return trial
+        return None
+
+    def best_pointer(self, scope):
+        """
+        Corrida marcada como mejor modelo de la búsqueda en la última ejecución.
+        """
+        return self.connection.execute("SELECT * FROM best WHERE scope = ?", (scope,)).fetchone()
+
+    def set_best_pointer(self, scope, key, run_id):
+        self.connection.execute(
+            "INSERT INTO best (scope, key, run_id) VALUES (?, ?, ?) "
+            "ON CONFLICT(scope) DO UPDATE SET key = excluded.key, run_id = excluded.run_id",
+            (scope, key, run_id),
+        )
+
+    def summary(self, keys):
+        keys = list(keys)
+        counts = {"completed": 0, "failed": 0, "running": 0, "new": 0}
+        for key in keys:
+            trial = self.get(key)
+            counts[trial["status"] if trial is not None else "new"] += 1
+        return counts
+
+    def close(self):
+        self.connection.close()
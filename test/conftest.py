@@ -0,0 +1,57 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SRC_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.append(SRC_PATH)
+
+TARGET_COL = 'origen_igdactmlmacalificacionorigen'
+
+PALABRAS = [
+    "trabajador", "cayo", "escalera", "golpe", "mano", "corte", "cuchillo", "caida",
+    "piso", "resbalo", "espalda", "dolor", "carga", "caja", "ojo", "particula",
+    "vehiculo", "moto", "accidente", "transito", "herramienta", "martillo", "dedo", "pie",
+]
+
+
+def make_transformed_data(n_rows=600, seed=0):
+    """
+    Genera un DataFrame sintético con el esquema que produce `transform_data`.
+    """
+    rng = np.random.default_rng(seed)
+    y = rng.choice(['1', '2', '3', '4', '5'], size=n_rows, p=[0.55, 0.2, 0.12, 0.08, 0.05])
+    shift = y.astype(int)
+
+    def codes(values, size=n_rows):
+        return rng.choice(values, size=size).astype(str)
+
+    descripciones = [
+        " ".join(rng.choice(PALABRAS, size=rng.integers(3, 9)).tolist() + [PALABRAS[s * 3]])
+        for s in shift
+    ]
+
+    return pd.DataFrame({
+        'dto_igdacmlmasolicitudes': codes(['s', 'n']),
+        'pcl_igdacmlmasolicitudes': codes(['s', 'n']),
+        'tipo_siniestro_igdacmlmasolicitudes': codes([0, 1, 2]),
+        'ind_tipo_jornada_at_igatepmafurat': codes([0, 1, 2]),
+        'ind_realizando_trabajo_hab_at_igatepmafurat': codes(['SI', 'NO', 'SIN INFORMACION']),
+        'id_tipo_lesion_igatepmafurat': (shift * 10).astype(str),
+        'id_parte_cuerpo_igatepmafurat': codes([0, 1, 2, 3, 446]),
+        'accidente_grave_igatepmafurat': codes(['s', 'n']),
+        'id_municipio_at_igatepmafurat': codes(np.arange(60)),
+        'descripcion_at_igatepmafurat': descripciones,
+        'fecha_siniestro_month_sin': rng.uniform(-1, 1, n_rows),
+        'fecha_siniestro_month_cos': rng.uniform(-1, 1, n_rows),
+        'hora_siniestro_sin': rng.uniform(-1, 1, n_rows) + shift / 10,
+        'hora_siniestro_cos': rng.uniform(-1, 1, n_rows),
+        TARGET_COL: y,
+    })
+
+
+@pytest.fixture
+def transformed_data():
+    return make_transformed_data()
@@ -0,0 +1,24 @@
+import sys
+
+import pandas as pd
+
+import benchmark_text_featurizers
+
+TARGET_COL = 'origen_igdactmlmacalificacionorigen'
+
+
+def test_benchmark_runs_on_raw_column_names(transformed_data, tmp_path, monkeypatch):
+    """
+    El benchmark acepta el CSV crudo, con los nombres de columna en mayúsculas.
+    """
+    raw = transformed_data[['descripcion_at_igatepmafurat', TARGET_COL]].rename(columns=str.upper)
+    output = tmp_path / "benchmark.csv"
+    monkeypatch.setattr(benchmark_text_featurizers, "load_data", lambda filename: raw)
+    monkeypatch.setattr(sys, "argv", ["benchmark_text_featurizers.py", "--hashing-features", "256",
+                                      "--output", str(output)])
+
+    benchmark_text_featurizers.main()
+
+    report = pd.read_csv(output)
+    assert report["featurizer"].tolist() == ["tfidf", "hashing"]
+    assert report["f1_macro"].notna().all()
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+from data_preprocessing.data_cleaning import clean_data
+from data_preprocessing.data_profiling import HyperLogLog, load_profile, profile_data, profile_rows, save_profile
+from data_preprocessing.feature_engineering import detect_column_types, split_indices
+
+TARGET_COL = 'origen_igdactmlmacalificacionorigen'
+
+
+def test_profile_matches_pandas(transformed_data):
+    """
+    En modo exacto el perfil coincide con las estadísticas calculadas por pandas.
+    """
+    df = transformed_data.copy()
+    df.loc[df.index[:30], 'hora_siniestro_sin'] = np.nan
+
+    # Perfilado por bloques, como se haría leyendo el CSV con chunksize
+    chunks = (df.iloc[start:start + 100] for start in range(0, len(df), 100))
+    profile = profile_data(chunks)
+
+    assert profile["n_rows"] == len(df)
+    for col in df.columns:
+        stats = profile["columns"][col]
+        assert stats["null_count"] == df[col].isna().sum()
+        assert stats["n_unique"] == df[col].nunique()
+        assert stats["top_k"][0][1] == df[col].value_counts().iloc[0]
+
+    stats = profile["columns"]['hora_siniestro_sin']
+    assert stats["null_rate"] == df['hora_siniestro_sin'].isna().mean()
+    assert stats["median"] == df['hora_siniestro_sin'].median()
+    assert stats["quantiles"]["0.1"] == df['hora_siniestro_sin'].quantile(0.1)
+    assert stats["quantiles"]["0.9"] == df['hora_siniestro_sin'].quantile(0.9)
+
+
+def test_hyperloglog_estimate():
+    """
+    El estimador aproximado queda cerca de la cardinalidad real.
+    """
+    values = pd.Series(np.arange(50_000).astype(str))
+    hll = HyperLogLog(p=12)
+    hll.update(values)
+    hll.update(values.iloc[:1000])
+
+    assert abs(hll.count() - 50_000) / 50_000 < 0.05
+
+
+def test_profile_json_round_trip_and_column_types(transformed_data, tmp_path):
+    """
+    El perfil se guarda como JSON y detect_column_types obtiene el mismo resultado usándolo.
+    """
+    save_profile(profile_data(transformed_data), tmp_path / "data_profile.json")
+    profile = load_profile(tmp_path / "data_profile.json")
+
+    assert detect_column_types(transformed_data, TARGET_COL, profile=profile) == detect_column_types(transformed_data, TARGET_COL)
+
+
+def test_clean_data_uses_statistics_after_deduplication():
+    """
+    La tasa de nulos y la mediana se calculan tras eliminar duplicados, como antes del perfilado:
+    en los datos crudos la columna tiene 60% de nulos, sin duplicados solo 40% y se conserva.
+    """
+    unique = [(value, f"a{value}") for value in range(1, 7)]
+    repeated = [(6, "a6")] * 2 + [(np.nan, f"b{group}") for group in range(4) for _ in range(3)]
+    rows = unique + repeated
+    raw = pd.DataFrame({
+        "Id": np.arange(len(rows)),
+        "Valor": [value for value, _ in rows],
+        "Descripcion_AT_IGATEPMAFURAT": [text for _, text in rows],
+        TARGET_COL: ["1" if text.startswith("a") else "2" for _, text in rows],
+    })
+    assert raw["Valor"].isna().mean() > 0.5
+
+    cleaned = clean_data(raw)
+
+    assert len(cleaned) == 10
+    assert cleaned["valor"].isna().sum() == 0
+    # Mediana de 1..6 (sin las copias de 6)
+    assert (cleaned.loc[cleaned["descripcion_at_igatepmafurat"].str.startswith("b"), "valor"] == 3.5).all()
+
+
+def test_profile_of_train_rows_keeps_column_types(transformed_data):
+    """
+    El perfil de las filas de entrenamiento da los mismos tipos de columna que recorrer esas
+    filas; categorías que solo aparecen en validación/prueba no cambian la decisión.
+    """
+    df = transformed_data.copy()
+    indices = split_indices(df[TARGET_COL])
+    held_out = np.concatenate([indices["val"], indices["test"]])
+    df.iloc[held_out, df.columns.get_loc('id_parte_cuerpo_igatepmafurat')] = [f"nueva_{i}" for i in range(len(held_out))]
+    X_train = df.iloc[indices["train"]]
+
+    expected = detect_column_types(X_train, TARGET_COL)
+
+    assert 'id_parte_cuerpo_igatepmafurat' in expected[1]
+    assert detect_column_types(X_train, TARGET_COL, profile=profile_rows(df, indices["train"], chunk_size=100)) == expected
+    # Perfilar todas las filas filtraría validación/prueba en la decisión
+    assert detect_column_types(X_train, TARGET_COL, profile=profile_data(df)) != expected
@@ -0,0 +1,106 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+SRC_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.append(SRC_PATH)
+
+from data_preprocessing.data_cleaning import optimize_memory
+from data_preprocessing.data_transformation import transform_data, transform_data_inference
+
+
+@pytest.fixture
+def sample_input():
+    """
+    Registros con el mismo esquema que recibe el modelo en predicción.
+    """
+    return pd.DataFrame({
+        'dto_igdacmlmasolicitudes': ['s', '', 'n', 's'],
+        'pcl_igdacmlmasolicitudes': ['', 's', 'n', 'n'],
+        'tipo_siniestro_igdacmlmasolicitudes': [0, 1, 2, 0],
+        'fecha_siniestro_igdacmlmasolicitudes': [
+            '2009-03-05 00:00:00+00:00',
+            '2012-02-29 00:00:00+00:00',
+            '2015-12-31 00:00:00+00:00',
+            '2020-07-01 00:00:00+00:00',
+        ],
+        'hora_at_igatepmafurat': [13, 0, 23, 7],
+        'horas_previo_at_igatepmafurat': [5, 0, 11, 2],
+        'ind_sitio_ocurrencia_igatepmafurat': [2, 1, 2, 1],
+        'id_tipo_lesion_igatepmafurat': [55, 10, 20, 55],
+        'id_agente_at_igatepmafurat': [5, 1, 2, 5],
+        'id_mecanismo_at_igatepmafurat': [1, 2, 3, 1],
+        'ind_testigo_at_igatepmafurat': [1, 0, 1, 2],
+        'id_medio_recepcion_igatepmafurat': [5, 1, 2, 5],
+        'centro_trabajo_igual_igatepmafurat': [1, 0, 1, 1],
+        'accidente_grave_igatepmafurat': ['n', '0', 's', '0'],
+        'riesgo_biologico_igatepmafurat': ['0', 'n', 's', 'n'],
+        'id_sitio_ocurrencia_igatepmafurat': [1, 2, 3, 4],
+        'id_parte_cuerpo_igatepmafurat': [446, 1, 2, 3],
+        'id_municipio_at_igatepmafurat': [1, 2, 3, 4],
+        'ind_tipo_jornada_at_igatepmafurat': [1, 2, 1, 0],
+        'ind_realizando_trabajo_hab_at_igatepmafurat': ['s', 'no', 'sin informacion', 'x'],
+        'descripcion_at_igatepmafurat': ['cayo de una escalera', 'golpe', 'corte', 'caida'],
+    })
+
+
+def test_transform_data_inference_parity(sample_input):
+    """
+    La variante de inferencia debe producir exactamente la misma salida que transform_data.
+    """
+    expected = transform_data(sample_input.copy())
+    result = transform_data_inference(sample_input)
+
+    pd.testing.assert_frame_equal(result, expected, check_exact=True)
+
+
+def test_transform_data_inference_parity_datetime(sample_input):
+    """
+    En entrenamiento la fecha ya llega como datetime desde la limpieza.
+    """
+    sample_input['fecha_siniestro_igdacmlmasolicitudes'] = pd.to_datetime(
+        sample_input['fecha_siniestro_igdacmlmasolicitudes'], format="%Y-%m-%d %H:%M:%S%z"
+    )
+
+    expected = transform_data(sample_input.copy())
+    result = transform_data_inference(sample_input)
+
+    pd.testing.assert_frame_equal(result, expected, check_exact=True)
+
+
+def test_transform_data_inference_does_not_modify_input(sample_input):
+    """
+    La entrada no se modifica, por lo que no es necesario copiarla antes de transformarla.
+    """
+    original = sample_input.copy()
+    transform_data_inference(sample_input)
+
+    pd.testing.assert_frame_equal(sample_input, original)
+
+
+def _as_object(df):
+    return df.apply(lambda col: col.astype(object) if isinstance(col.dtype, pd.CategoricalDtype) else col)
+
+
+def test_transform_data_category_input(sample_input):
+    """
+    Con la entrada optimizada (category y enteros pequeños) los valores no cambian
+    y las columnas de códigos siguen siendo category.
+    """
+    sample_input = pd.concat([sample_input] * 250, ignore_index=True)
+    sample_input['hora_at_igatepmafurat'] = sample_input['hora_at_igatepmafurat'].astype(float)
+    expected = transform_data(sample_input.copy())
+
+    optimized = optimize_memory(sample_input.copy())
+    assert optimized.memory_usage(deep=True).sum() < sample_input.memory_usage(deep=True).sum() / 2
+    assert optimized['hora_at_igatepmafurat'].dtype == 'int8'
+
+    result = transform_data(optimized.copy())
+    assert isinstance(result['id_parte_cuerpo_igatepmafurat'].dtype, pd.CategoricalDtype)
+    assert isinstance(result['ind_realizando_trabajo_hab_at_igatepmafurat'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(_as_object(result), expected, check_exact=True)
+
+    inference = transform_data_inference(optimized)
+    pd.testing.assert_frame_equal(_as_object(inference), _as_object(result), check_exact=True)
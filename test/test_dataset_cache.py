@@ -0,0 +1,66 @@
+import pickle
+
+import numpy as np
+import pytest
+import scipy.sparse
+
+from models.dataset_cache import DatasetCache
+from models.model_zoo.catboost import CatBoostModel
+from models.model_zoo.lightgbm import LightGBMModel
+from models.model_zoo.xgboost_model import XGBoostModel
+
+
+def _data(n_rows=400, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, 3, n_rows)
+    X = scipy.sparse.random(n_rows, 30, density=0.2, random_state=seed, format="csr", dtype=np.float32)
+    X = scipy.sparse.hstack([X, scipy.sparse.csr_matrix(np.eye(3, dtype=np.float32)[y] * rng.random((n_rows, 1)))],
+                            format="csr")
+    return X, y
+
+
+@pytest.mark.parametrize("model_cls, params", [
+    (XGBoostModel, {"n_estimators": 30, "max_depth": 3, "learning_rate": 0.1}),
+    (LightGBMModel, {"n_estimators": 30, "max_depth": 3, "class_weight": "balanced", "verbose": -1}),
+    (CatBoostModel, {"iterations": 30, "depth": 3, "allow_writing_files": False}),
+])
+def test_cached_training_matches_and_reuses(model_cls, params):
+    """
+    Con la caché, la estructura nativa se construye una vez y se reutiliza en el segundo
+    ajuste; las predicciones son las mismas que sin caché y la caché no se serializa.
+    """
+    X_train, y_train = _data(seed=0)
+    X_val, y_val = _data(seed=1)
+    cache = DatasetCache()
+
+    reference = model_cls(dict(params), early_stopping_rounds=5)
+    reference.train(X_train, y_train, X_val, y_val)
+
+    for _ in range(2):
+        model = model_cls(dict(params), early_stopping_rounds=5, dataset_cache=cache)
+        model.train(X_train, y_train, X_val, y_val)
+
+    report = cache.report()
+    assert (report["hits"] == 1).all()
+    assert cache.saved_seconds > 0
+
+    assert model.best_iteration == reference.best_iteration
+    np.testing.assert_array_equal(np.ravel(model.predict(X_val)), np.ravel(reference.predict(X_val)))
+
+    restored = pickle.loads(pickle.dumps(model))
+    assert restored.dataset_cache is None
+    np.testing.assert_array_equal(np.ravel(restored.predict(X_val)), np.ravel(model.predict(X_val)))
+
+
+def test_cache_key_includes_data_and_binning():
+    X_train, y_train = _data(seed=0)
+    X_other, y_other = _data(seed=2)
+    cache = DatasetCache(max_entries=2)
+
+    first, _ = cache.xgboost(X_train, y_train, max_bin=64)
+    assert cache.xgboost(X_train, y_train, max_bin=64)[0] is first
+    assert cache.xgboost(X_train, y_train, max_bin=128)[0] is not first
+    assert cache.xgboost(X_other, y_other, max_bin=64)[0] is not first
+
+    # Solo se conservan las dos entradas más recientes
+    assert len(cache.report()) == 2
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from models.model_zoo.catboost import CatBoostModel
+from models.model_zoo.lightgbm import LightGBMModel
+from models.model_zoo.random_forest import RandomForestModel
+from models.model_zoo.xgboost_model import XGBoostModel
+
+
+def _data(n_rows=300, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 8)).astype(np.float32)
+    # Señal débil y ruidosa: el modelo se sobreajusta rápido y la validación deja de mejorar
+    y = ((X[:, 0] + rng.normal(scale=2.0, size=n_rows)) > 0).astype(int) + (X[:, 1] > 1).astype(int)
+    return X, y
+
+
+@pytest.mark.parametrize("model_cls, params", [
+    (XGBoostModel, {"n_estimators": 400, "learning_rate": 0.3, "max_depth": 6}),
+    (LightGBMModel, {"n_estimators": 400, "learning_rate": 0.3, "verbose": -1}),
+    (CatBoostModel, {"iterations": 400, "learning_rate": 0.3, "depth": 6, "allow_writing_files": False}),
+])
+def test_early_stopping_uses_best_iteration(model_cls, params):
+    """
+    Con validación, el entrenamiento se detiene antes de todas las rondas, registra la mejor
+    iteración y la predicción usa solo los árboles hasta ella.
+    """
+    X_train, y_train = _data(seed=0)
+    X_val, y_val = _data(seed=1)
+
+    model = model_cls(dict(params), early_stopping_rounds=10)
+    model.train(X_train, y_train, X_val, y_val)
+
+    assert model.best_iteration is not None
+    assert model.best_iteration < 400 - 10
+
+    predictions = model.predict(X_val)
+    if model_cls is XGBoostModel:
+        expected = model.model.predict(X_val, iteration_range=(0, model.best_iteration + 1))
+    elif model_cls is LightGBMModel:
+        expected = model.model.predict(X_val, num_iteration=model.best_iteration + 1)
+    else:
+        assert model.model.tree_count_ == model.best_iteration + 1
+        expected = model.model.predict(X_val)
+    np.testing.assert_array_equal(np.ravel(predictions), np.ravel(expected))
+
+
+def test_without_validation_or_patience_fits_all_rounds():
+    X_train, y_train = _data(seed=0)
+    X_val, y_val = _data(seed=1)
+
+    model = LightGBMModel({"n_estimators": 30, "verbose": -1})
+    model.train(X_train, y_train)
+    assert model.best_iteration is None
+    assert model.model.booster_.current_iteration() == 30
+
+    model = XGBoostModel({"n_estimators": 30}, early_stopping_rounds=None)
+    model.train(X_train, y_train, X_val, y_val)
+    assert model.best_iteration is None
+
+    model = RandomForestModel({"n_estimators": 5})
+    model.train(X_train, y_train, X_val, y_val)
+    assert model.best_iteration is None
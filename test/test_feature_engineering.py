@@ -0,0 +1,252 @@
+import importlib
+import os
+import pickle
+import sys
+
+import numpy as np
+import pandas as pd
+import scipy.sparse
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score
+from sklearn.preprocessing import LabelEncoder
+
+from data_preprocessing.feature_engineering import (
+    HashingTfidfVectorizer,
+    balance_classes,
+    balance_classes_scalable,
+    balance_training_data,
+    branch_timings,
+    create_feature_engineering_pipeline,
+    enable_transform_timings,
+    load_or_split_indices,
+    load_split_indices,
+    parallel_branches,
+    split_indices,
+)
+
+TARGET_COL = 'origen_igdactmlmacalificacionorigen'
+
+
+def _dense(X):
+    return X.toarray() if scipy.sparse.issparse(X) else X
+
+
+def _fit_transform(df, dtype):
+    X, y = df.drop(columns=[TARGET_COL]), df[TARGET_COL]
+    pipeline = create_feature_engineering_pipeline(X, dtype=dtype)
+    return pipeline.fit_transform(X), y
+
+
+def test_float32_pipeline_output(transformed_data):
+    """
+    Con dtype=float32 todas las ramas generan float32 y la matriz coincide con la de float64.
+    """
+    X64, _ = _fit_transform(transformed_data, np.float64)
+    X32, _ = _fit_transform(transformed_data, np.float32)
+
+    assert X64.dtype == np.float64
+    assert X32.dtype == np.float32
+    np.testing.assert_allclose(_dense(X32), _dense(X64), rtol=1e-5, atol=1e-6)
+
+
+def test_float32_accuracy_parity(transformed_data):
+    """
+    Un modelo entrenado sobre float32 obtiene la misma exactitud que sobre float64.
+    """
+    train, test = transformed_data.iloc[:450], transformed_data.iloc[450:]
+    scores = {}
+    for dtype in (np.float64, np.float32):
+        X_train, y_train = train.drop(columns=[TARGET_COL]), train[TARGET_COL]
+        X_test, y_test = test.drop(columns=[TARGET_COL]), test[TARGET_COL]
+
+        pipeline = create_feature_engineering_pipeline(X_train, dtype=dtype)
+        model = LogisticRegression(max_iter=500)
+        model.fit(pipeline.fit_transform(X_train), y_train)
+        scores[dtype] = accuracy_score(y_test, model.predict(pipeline.transform(X_test)))
+
+    assert abs(scores[np.float64] - scores[np.float32]) <= 0.01
+
+
+def test_hashing_tfidf_chunked_fit(transformed_data):
+    """
+    Ajustar por bloques da el mismo resultado que ajustar con todos los textos a la vez.
+    """
+    texts = transformed_data['descripcion_at_igatepmafurat']
+
+    full = HashingTfidfVectorizer(n_features=256).fit(texts)
+    chunked = HashingTfidfVectorizer(n_features=256, chunk_size=50).fit(texts)
+
+    assert chunked.n_documents_ == len(texts)
+    np.testing.assert_allclose(chunked.idf_, full.idf_)
+    np.testing.assert_allclose(_dense(chunked.transform(texts)), _dense(full.transform(texts)))
+
+
+def test_hashing_text_featurizer_pipeline(transformed_data):
+    """
+    La rama de texto con hashing se integra al pipeline y conserva el dtype configurado.
+    """
+    X = transformed_data.drop(columns=[TARGET_COL])
+    pipeline = create_feature_engineering_pipeline(X, dtype=np.float32, text_featurizer="hashing", hashing_n_features=128)
+
+    X_transformed = pipeline.fit_transform(X)
+    single = pipeline.transform(X.iloc[:1])
+
+    assert X_transformed.dtype == np.float32
+    np.testing.assert_allclose(_dense(single), _dense(X_transformed[:1]), rtol=1e-6)
+
+
+def _encoded_features(df):
+    # Dejar una clase con pocos registros para que se aplique el sobremuestreo
+    df = pd.concat([df[df[TARGET_COL] != '5'], df[df[TARGET_COL] == '5'].head(10)])
+    X = df.drop(columns=[TARGET_COL])
+    y = LabelEncoder().fit_transform(df[TARGET_COL])
+    pipeline = create_feature_engineering_pipeline(X)
+    return scipy.sparse.csr_matrix(pipeline.fit_transform(X)), y
+
+
+def test_balance_classes_scalable_counts(transformed_data):
+    """
+    El balanceo escalable deja las mismas cantidades por clase que balance_classes.
+    """
+    X, y = _encoded_features(transformed_data)
+
+    _, y_expected = balance_classes(X, y)
+    X_balanced, y_balanced = balance_classes_scalable(X, y, n_jobs=1)
+
+    assert X_balanced.shape == (len(y_balanced), X.shape[1])
+    assert len(y_balanced) > len(y) - np.bincount(y).max() + np.sort(np.bincount(y))[-2]
+    np.testing.assert_array_equal(np.bincount(y_balanced), np.bincount(y_expected))
+
+
+def test_balance_classes_scalable_cache(transformed_data, tmp_path):
+    """
+    Con caché, la segunda llamada con la misma entrada recupera el resultado guardado.
+    """
+    X, y = _encoded_features(transformed_data)
+
+    X_first, y_first = balance_classes_scalable(X, y, n_jobs=1, approximate=True, n_components=8, cache_dir=tmp_path)
+    X_second, y_second = balance_classes_scalable(X, y, n_jobs=1, approximate=True, n_components=8, cache_dir=tmp_path)
+
+    assert len(list(tmp_path.glob("balanced_*.npz"))) == 1
+    assert (X_first != X_second).nnz == 0
+    np.testing.assert_array_equal(y_first, y_second)
+
+
+def test_balance_training_data_passes_scalable_options(transformed_data, tmp_path):
+    """
+    Los parámetros del balanceo escalable llegan desde balance_training_data, con el tipo configurado.
+    """
+    X, y = _encoded_features(transformed_data)
+    options = {"n_jobs": 1, "approximate": True, "n_components": 8}
+
+    X_expected, _ = balance_classes_scalable(X, y, **options)
+    X_balanced, _ = balance_training_data(X, y, dtype=np.float32, balance_strategy="scalable",
+                                          balance_cache_dir=tmp_path, balance_options=options)
+    X_again, _ = balance_classes_scalable(X, y, cache_dir=tmp_path, **options)
+
+    assert X_balanced.dtype == np.float32
+    assert len(list(tmp_path.glob("balanced_*.npz"))) == 1
+    assert (X_again != X_expected).nnz == 0
+
+def test_split_indices_stratified(transformed_data, tmp_path):
+    """
+    Los índices cubren todas las filas sin solaparse, respetan la estratificación y se pueden guardar.
+    """
+    y = transformed_data[TARGET_COL]
+    indices = split_indices(y, output_path=tmp_path / "split_indices.npz")
+
+    all_indices = np.concatenate([indices["train"], indices["val"], indices["test"]])
+    assert np.array_equal(np.sort(all_indices), np.arange(len(y)))
+    assert len(indices["test"]) == int(np.ceil(0.2 * len(y)))
+
+    proportions = y.value_counts(normalize=True)
+    test_proportions = y.iloc[indices["test"]].value_counts(normalize=True)
+    assert (test_proportions - proportions).abs().max() < 0.02
+
+    saved = load_split_indices(tmp_path / "split_indices.npz")
+    for name in ("train", "val", "test"):
+        np.testing.assert_array_equal(saved[name], indices[name])
+
+
+def test_stale_split_indices_are_recomputed(transformed_data, tmp_path):
+    """
+    Los índices guardados solo se reutilizan para el mismo objetivo: tras volver a limpiar
+    (menos filas u otro orden) se recalculan en lugar de particionar mal o fallar.
+    """
+    path = tmp_path / "split_indices.npz"
+    y = transformed_data[TARGET_COL]
+    indices = split_indices(y, output_path=path)
+
+    reused = load_or_split_indices(y, path)
+    for name in ("train", "val", "test"):
+        np.testing.assert_array_equal(reused[name], indices[name])
+
+    for changed in (y.iloc[:-50], y.sample(frac=1, random_state=0)):
+        assert load_split_indices(path, changed) is None
+        recomputed = load_or_split_indices(changed, path)
+        all_indices = np.concatenate([recomputed["train"], recomputed["val"], recomputed["test"]])
+        assert np.array_equal(np.sort(all_indices), np.arange(len(changed)))
+        # El archivo queda actualizado para los datos nuevos
+        assert load_split_indices(path, changed) is not None
+
+
+def test_pipeline_fitted_with_target_column(transformed_data):
+    """
+    El pipeline ajustado sobre el DataFrame completo ignora la columna objetivo,
+    de modo que en predicción puede transformar registros sin ella.
+    """
+    pipeline = create_feature_engineering_pipeline(transformed_data)
+    X_transformed = pipeline.fit_transform(transformed_data)
+
+    without_target = pipeline.transform(transformed_data.drop(columns=[TARGET_COL]).iloc[:5])
+    np.testing.assert_allclose(_dense(without_target), _dense(X_transformed[:5]))
+
+
+def test_parallel_branches_timings(transformed_data):
+    """
+    Con ramas en paralelo el resultado es el mismo y cada rama registra tiempos y ancho de salida.
+    """
+    X = transformed_data.drop(columns=[TARGET_COL])
+    expected = create_feature_engineering_pipeline(X).fit_transform(X)
+
+    pipeline = create_feature_engineering_pipeline(X, n_jobs=2)
+    with parallel_branches("threading", max_threads_per_branch=1):
+        X_transformed = pipeline.fit_transform(X)
+        # Sin activarlo, transformar no modifica el pipeline (como en la API)
+        pipeline.transform(X.iloc[:1])
+        assert (branch_timings(pipeline)["transform_calls"] == 0).all()
+
+        enable_transform_timings(pipeline)
+        pipeline.transform(X.iloc[:1])
+    np.testing.assert_allclose(_dense(X_transformed), _dense(expected))
+
+    timings = branch_timings(pipeline).set_index("branch")
+
+    assert list(timings.index) == ["num", "cat", "high_card", "text"]
+    assert timings["output_width"].sum() == X_transformed.shape[1]
+    assert (timings["fit_rows"] == len(X)).all()
+    assert (timings["transform_calls"] == 1).all()
+    assert (timings["fit_seconds"] > 0).all()
+
+
+def test_transform_timings_on_pipeline_saved_by_the_script(transformed_data, monkeypatch):
+    """
+    pipeline_data_preprocessing.py guarda el pipeline importando `feature_engineering` y la API
+    lo carga con `data_preprocessing.feature_engineering`: las ramas son de otra clase, pero
+    los tiempos de transformación se pueden activar igual.
+    """
+    monkeypatch.syspath_prepend(os.path.join(os.path.dirname(__file__), "..", "src", "data_preprocessing"))
+    loaded_modules = set(sys.modules)
+    try:
+        script_module = importlib.import_module("feature_engineering")
+        X = transformed_data.drop(columns=[TARGET_COL])
+        saved = pickle.dumps(script_module.create_feature_engineering_pipeline(X).fit(X))
+        pipeline = pickle.loads(saved)
+    finally:
+        for name in set(sys.modules) - loaded_modules:
+            del sys.modules[name]
+
+    enable_transform_timings(pipeline)
+    pipeline.transform(X.iloc[:1])
+
+    assert (branch_timings(pipeline)["transform_calls"] == 1).all()
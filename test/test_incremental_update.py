@@ -0,0 +1,133 @@
+import json
+
+import numpy as np
+import pytest
+import scipy.sparse
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from data_preprocessing.feature_engineering import create_feature_engineering_pipeline
+from data_preprocessing.incremental_update import save_pipeline_version, update_pipeline
+
+TARGET_COL = 'origen_igdactmlmacalificacionorigen'
+
+
+def _dense(X):
+    return X.toarray() if scipy.sparse.issparse(X) else X
+
+
+def _branch(pipeline, name):
+    return pipeline.named_steps['features'].named_transformers_[name]
+
+
+def test_update_matches_full_refit(transformed_data):
+    """
+    Actualizar con los datos nuevos da las mismas estadísticas que reajustar con todo el histórico.
+    """
+    X = transformed_data.drop(columns=[TARGET_COL])
+    old, new = X.iloc[:400], X.iloc[400:]
+
+    updated = create_feature_engineering_pipeline(old)
+    updated.fit(old)
+    update_pipeline(updated, new)
+
+    full = create_feature_engineering_pipeline(X)
+    full.fit(X)
+
+    scaler, full_scaler = _branch(updated, 'num').named_steps['scaler'], _branch(full, 'num').named_steps['scaler']
+    np.testing.assert_allclose(scaler.mean_, full_scaler.mean_)
+    np.testing.assert_allclose(scaler.var_, full_scaler.var_)
+
+    encoder = _branch(updated, 'high_card').named_steps['high_cardinality']
+    full_encoder = _branch(full, 'high_card').named_steps['high_cardinality']
+    for col, mapping in full_encoder.mappings.items():
+        assert encoder.mappings[col] == pytest.approx(mapping)
+
+    # Mismo vocabulario que el ajuste original; el IDF coincide con el del histórico completo
+    tfidf = _branch(updated, 'text').named_steps['tfidf']
+    full_tfidf = _branch(full, 'text').named_steps['tfidf']
+    common = [term for term in tfidf.vocabulary_ if term in full_tfidf.vocabulary_]
+    np.testing.assert_allclose(
+        tfidf.idf_[[tfidf.vocabulary_[t] for t in common]],
+        full_tfidf.idf_[[full_tfidf.vocabulary_[t] for t in common]],
+    )
+
+
+def test_update_appends_new_categories(transformed_data):
+    """
+    Las categorías nuevas amplían la salida sin alterar las columnas one-hot existentes.
+    """
+    X = transformed_data.drop(columns=[TARGET_COL])
+    pipeline = create_feature_engineering_pipeline(X)
+    before = _dense(pipeline.fit_transform(X))
+    cat = pipeline.named_steps['features'].output_indices_['cat']
+
+    new = X.iloc[:20].copy()
+    new['tipo_siniestro_igdacmlmasolicitudes'] = '9'
+    update_pipeline(pipeline, new)
+
+    after = _dense(pipeline.transform(X))
+    new_cat = pipeline.named_steps['features'].output_indices_['cat']
+    assert after.shape[1] == before.shape[1] + 1
+    assert new_cat.stop == cat.stop + 1
+
+    # Las columnas one-hot existentes no cambian y la nueva queda en cero para los datos anteriores
+    branch = _branch(pipeline, 'cat')
+    encoder = branch.named_steps['onehot']
+    feature = list(branch.feature_names_in_).index('tipo_siniestro_igdacmlmasolicitudes')
+    position = sum(len(categories) for categories in encoder.categories_[:feature + 1]) - 1
+
+    one_hot = after[:, new_cat]
+    assert not one_hot[:, position].any()
+    np.testing.assert_array_equal(np.delete(one_hot, position, axis=1), before[:, cat])
+
+    single = _dense(pipeline.transform(new.iloc[:1]))
+    assert single.shape[1] == after.shape[1]
+
+
+def test_new_categories_keep_encoder_options(transformed_data):
+    """
+    El OneHotEncoder actualizado conserva sus opciones (p. ej. `drop`) y se construye con la API
+    pública; uno con categorías poco frecuentes no se puede actualizar solo con los datos nuevos.
+    """
+    X = transformed_data[['hora_siniestro_sin', 'dto_igdacmlmasolicitudes', 'tipo_siniestro_igdacmlmasolicitudes']]
+    cat_cols = ['dto_igdacmlmasolicitudes', 'tipo_siniestro_igdacmlmasolicitudes']
+
+    def build(**options):
+        return Pipeline([('features', ColumnTransformer([
+            ('num', StandardScaler(), ['hora_siniestro_sin']),
+            ('cat', OneHotEncoder(handle_unknown='ignore', **options), cat_cols),
+        ]))]).fit(X)
+
+    pipeline = build(drop='if_binary')
+    new = X.iloc[:10].copy()
+    new['tipo_siniestro_igdacmlmasolicitudes'] = '9'
+    update_pipeline(pipeline, new)
+
+    encoder = _branch(pipeline, 'cat')
+    assert encoder.get_params()['drop'] == 'if_binary'
+    assert list(encoder.categories_[1]) == ['0', '1', '2', '9']
+    # 's'/'n' se reduce a una columna; el tipo de siniestro tiene 4 categorías
+    assert _dense(pipeline.transform(new)).shape[1] == 1 + 1 + 4
+
+    with pytest.raises(ValueError, match="poco frecuentes"):
+        update_pipeline(build(min_frequency=5), new)
+
+
+def test_save_pipeline_version(transformed_data, tmp_path):
+    """
+    Cada versión se guarda en un archivo distinto y queda registrada en el manifiesto.
+    """
+    X = transformed_data.drop(columns=[TARGET_COL])
+    pipeline = create_feature_engineering_pipeline(X)
+    pipeline.fit(X.iloc[:300])
+
+    assert save_pipeline_version(pipeline, 300, directory=tmp_path) == 1
+    update_pipeline(pipeline, X.iloc[300:])
+    assert save_pipeline_version(pipeline, 300, directory=tmp_path, base_version=1, promote=True) == 2
+
+    manifest = json.loads((tmp_path / "pipeline_versions.json").read_text())
+    assert [entry["file"] for entry in manifest] == ["transformation_pipeline_v001.pkl", "transformation_pipeline_v002.pkl"]
+    assert manifest[1]["n_rows_total"] == len(X)
+    assert (tmp_path / "transformation_pipeline.pkl").exists()
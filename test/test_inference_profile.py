@@ -0,0 +1,83 @@
+import mlflow
+import numpy as np
+
+from models.inference_profile import pareto_front, profile_inference, within_budget
+from models.model_search import GridSearch
+from models.model_zoo.random_forest import RandomForestModel
+from models.trial_ledger import TrialLedger
+
+
+def _data(n_rows=300, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 6)).astype(np.float32)
+    y = (X[:, 0] + rng.normal(scale=0.5, size=n_rows) > 0).astype(int)
+    return X, y
+
+
+def test_profile_reports_latency_and_size():
+    X, y = _data()
+    small, large = RandomForestModel({"n_estimators": 2}), RandomForestModel({"n_estimators": 40})
+    small.train(X, y)
+    large.train(X, y)
+
+    profile = profile_inference(small, X, n_single=20, batch_size=100)
+
+    assert set(profile) == {"latency_p50_ms", "latency_p99_ms", "batch_latency_ms", "batch_rows_per_second",
+                            "model_size_bytes"}
+    assert 0 < profile["latency_p50_ms"] <= profile["latency_p99_ms"]
+    assert profile_inference(large, X, n_single=5)["model_size_bytes"] > profile["model_size_bytes"]
+
+
+def test_budget_and_pareto_front():
+    trials = [
+        {"name": "fast", "f1_score": 0.80, "latency_p99_ms": 1.0},
+        {"name": "dominated", "f1_score": 0.79, "latency_p99_ms": 2.0},
+        {"name": "balanced", "f1_score": 0.85, "latency_p99_ms": 3.0},
+        {"name": "slow", "f1_score": 0.90, "latency_p99_ms": 20.0},
+        {"name": "tie", "f1_score": 0.85, "latency_p99_ms": 4.0},
+    ]
+
+    assert [trial["name"] for trial in pareto_front(trials)] == ["fast", "balanced", "slow"]
+    assert within_budget(trials[2], {"latency_p99_ms": 5.0})
+    assert not within_budget(trials[3], {"latency_p99_ms": 5.0})
+    assert not within_budget({"f1_score": 0.9}, {"latency_p99_ms": 5.0})
+    assert within_budget({"f1_score": 0.9})
+
+
+def test_ledger_best_respects_constraints():
+    ledger = TrialLedger()
+    for key, score, latency in (("slow", 0.9, 20.0), ("fast", 0.8, 1.0)):
+        ledger.start(key, "scope", {})
+        ledger.complete(key, {"f1_score": score, "latency_p99_ms": latency}, 1.0)
+
+    assert ledger.best(["slow", "fast"])["key"] == "slow"
+    assert ledger.best(["slow", "fast"], {"latency_p99_ms": 5.0})["key"] == "fast"
+    assert ledger.best(["slow", "fast"], {"latency_p99_ms": 0.5}) is None
+
+
+def test_grid_search_picks_best_model_within_budget(tmp_path, monkeypatch):
+    X_train, y_train = _data(seed=0)
+    X_val, y_val = _data(seed=1)
+
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")
+    mlflow.set_tracking_uri((tmp_path / "mlruns").as_uri())
+    experiment_id = mlflow.create_experiment("grid")
+    try:
+        search = GridSearch("RandomForest", X_train, y_train, X_val, y_val, experiment_id=experiment_id,
+                            warm_start=False)
+        search.param_combinations = [{"n_estimators": n, "max_depth": 6, "random_state": 0} for n in (1, 60)]
+        # Un solo árbol ocupa unos pocos KB; 60 árboles, bastante más
+        search.constraints = {"model_size_bytes": 20_000}
+        best_params, _ = search.run()
+
+        runs = mlflow.search_runs(experiment_ids=[experiment_id])
+        best_run = runs.loc[runs["tags.best_model"] == "true", "run_id"].item()
+        front = mlflow.artifacts.load_dict(f"runs:/{best_run}/pareto_front.json")
+    finally:
+        mlflow.set_tracking_uri(None)
+
+    assert best_params["n_estimators"] == 1
+    assert runs["metrics.latency_p99_ms"].notna().all()
+    assert runs["metrics.model_size_bytes"].notna().all()
+    assert front["constraints"] == {"model_size_bytes": 20_000}
+    assert {trial["params"]["n_estimators"] for trial in front["front"]} <= {1, 60}
@@ -0,0 +1,62 @@
+import io
+import logging
+
+from data_preprocessing.logging_setup import (
+    RateLimitFilter,
+    SamplingFilter,
+    configure_logging,
+    shutdown_logging,
+)
+
+
+def _record(msg, level=logging.INFO, lineno=10):
+    return logging.LogRecord("serving", level, "app.py", lineno, msg, None, None)
+
+
+def test_rate_limit_filter_caps_each_call_site():
+    """
+    Por punto de llamada pasan como máximo `max_records` mensajes por intervalo;
+    las advertencias no se limitan y los suprimidos se informan al abrir la siguiente ventana.
+    """
+    rate_filter = RateLimitFilter(max_records=3, interval=60)
+
+    passed = [rate_filter.filter(_record("petición")) for _ in range(10)]
+    assert sum(passed) == 3
+    assert rate_filter.filter(_record("otra línea", lineno=20))
+    assert rate_filter.filter(_record("advertencia", level=logging.WARNING))
+
+    rate_filter.interval = 0
+    record = _record("petición")
+    assert rate_filter.filter(record)
+    assert "7 mensajes suprimidos" in record.getMessage()
+
+
+def test_sampling_filter_keeps_warnings():
+    sampling = SamplingFilter(rate=0.0)
+
+    assert not sampling.filter(_record("detalle"))
+    assert sampling.filter(_record("error", level=logging.ERROR))
+
+
+def test_configure_logging_queue_and_module_levels():
+    """
+    Los mensajes pasan por la cola y llegan al stream; los niveles por módulo se respetan.
+    """
+    stream = io.StringIO()
+    root = logging.getLogger()
+    previous_level = root.level
+    try:
+        configure_logging(level="INFO", module_levels={"test_ruidoso": "WARNING"}, stream=stream)
+        logging.getLogger("test_ruidoso").info("no debe aparecer")
+        logging.getLogger("test_ruidoso").warning("advertencia visible")
+        logging.getLogger("test_normal").info("mensaje visible")
+        shutdown_logging()  # Vacía la cola
+    finally:
+        shutdown_logging()
+        root.setLevel(previous_level)
+        logging.getLogger("test_ruidoso").setLevel(logging.NOTSET)
+
+    output = stream.getvalue()
+    assert "advertencia visible" in output
+    assert "mensaje visible" in output
+    assert "no debe aparecer" not in output
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+from sklearn.metrics import (accuracy_score, classification_report, confusion_matrix, f1_score, log_loss,
+                             precision_score, recall_score, roc_auc_score)
+
+from models.model_evaluator import ModelEvaluator
+from models.model_zoo.lightgbm import LightGBMModel
+from models.model_zoo.random_forest import RandomForestModel
+
+
+def _sklearn_metrics(y, predictions):
+    # zero_division=0: el mismo valor que el evaluador, sin UndefinedMetricWarning
+    return {
+        "accuracy": accuracy_score(y, predictions),
+        "f1_score": f1_score(y, predictions, average="weighted", zero_division=0),
+        "f1_score_macro": f1_score(y, predictions, average="macro", zero_division=0),
+        "precision": precision_score(y, predictions, average="weighted", zero_division=0),
+        "recall": recall_score(y, predictions, average="weighted", zero_division=0),
+        "confusion_matrix": confusion_matrix(y, predictions).tolist(),
+        "classification_report": classification_report(y, predictions, output_dict=True, zero_division=0),
+    }
+
+
+def _assert_same_report(report, expected):
+    assert report.keys() == expected.keys()
+    for key, values in expected.items():
+        assert report[key] == pytest.approx(values)
+
+
+@pytest.mark.parametrize("n_classes", [2, 4])
+def test_metrics_match_sklearn(n_classes):
+    rng = np.random.default_rng(n_classes)
+    y = rng.integers(0, n_classes, size=500)
+    probabilities = rng.dirichlet(np.ones(n_classes), size=500)
+    # Una clase que el modelo nunca predice: precisión indefinida (0, como zero_division=0)
+    probabilities[:, -1] *= probabilities[:, :-1].max(axis=1)
+    probabilities /= probabilities.sum(axis=1, keepdims=True)
+    predictions = probabilities.argmax(axis=1)
+
+    metrics = ModelEvaluator.from_predictions(y, predictions, probabilities, np.arange(n_classes))
+    expected = _sklearn_metrics(y, predictions)
+
+    for name in ("accuracy", "f1_score", "f1_score_macro", "precision", "recall"):
+        assert metrics[name] == pytest.approx(expected[name])
+    assert metrics["confusion_matrix"] == expected["confusion_matrix"]
+    _assert_same_report(metrics["classification_report"], expected["classification_report"])
+    assert metrics["log_loss"] == pytest.approx(log_loss(y, probabilities))
+    scores = probabilities[:, 1] if n_classes == 2 else probabilities
+    assert metrics["roc_auc"] == pytest.approx(roc_auc_score(y, scores, multi_class="ovr"))
+
+
+def test_string_labels_and_labels_only_in_predictions():
+    y = np.array(["a", "b", "b", "c", "a"])
+    predictions = np.array(["a", "b", "d", "c", "b"])
+
+    metrics = ModelEvaluator.from_predictions(y, predictions)
+    expected = _sklearn_metrics(y, predictions)
+
+    assert metrics["confusion_matrix"] == expected["confusion_matrix"]
+    _assert_same_report(metrics["classification_report"], expected["classification_report"])
+    assert metrics["f1_score_macro"] == pytest.approx(expected["f1_score_macro"])
+    assert "log_loss" not in metrics
+
+
+def test_label_unseen_by_the_model_skips_probability_metrics():
+    """
+    Una etiqueta que el modelo no vio en el entrenamiento no tiene columna de probabilidad:
+    se omiten log-loss y AUC y el resto de métricas se calcula igual.
+    """
+    classes = np.array([0, 1, 2])
+    y = np.array([0, 1, 2, 3, 1])
+    probabilities = np.eye(3)[[0, 1, 2, 2, 1]]
+    predictions = classes[probabilities.argmax(axis=1)]
+
+    metrics = ModelEvaluator.from_predictions(y, predictions, probabilities, classes)
+
+    assert "log_loss" not in metrics and "roc_auc" not in metrics
+    assert metrics["f1_score"] == pytest.approx(_sklearn_metrics(y, predictions)["f1_score"])
+
+@pytest.mark.parametrize("model_class", [RandomForestModel, LightGBMModel])
+def test_evaluate_uses_one_probability_pass(model_class):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 5)).astype(np.float32)
+    y = (X[:, 0] + X[:, 1] > 0).astype(int) + (X[:, 2] > 1)
+    model = model_class({"n_estimators": 10, "random_state": 0, "verbose": -1} if model_class is LightGBMModel
+                        else {"n_estimators": 10, "random_state": 0})
+    model.train(X[:200], y[:200])
+
+    metrics = model.evaluate(X[200:], y[200:])
+
+    # Las predicciones derivadas de las probabilidades coinciden con predict()
+    assert metrics["accuracy"] == pytest.approx(accuracy_score(y[200:], model.predict(X[200:])))
+    assert metrics["log_loss"] == pytest.approx(log_loss(y[200:], model.predict_proba(X[200:]), labels=model.classes))
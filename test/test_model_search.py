@@ -0,0 +1,162 @@
+import mlflow
+import numpy as np
+import pytest
+import scipy.sparse
+
+from data_preprocessing.sparse_storage import save_sparse_mmap
+from models import model_search
+from models.model_search import GridSearch
+from models.tracking import get_tracker
+
+
+def _data(n_rows=200, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, 3, n_rows)
+    X = scipy.sparse.random(n_rows, 20, density=0.3, random_state=seed, format="csr", dtype=np.float32)
+    X = scipy.sparse.hstack([X, scipy.sparse.csr_matrix(np.eye(3, dtype=np.float32)[y])], format="csr")
+    return X, y
+
+
+def test_parallel_grid_search_separate_runs(tmp_path, monkeypatch):
+    """
+    En modo paralelo cada combinación queda en su propia corrida de MLflow, con sus
+    parámetros y métrica, y la mejor se marca con `best_model`. Los datos se abren
+    en memoria mapeada desde cada proceso.
+    """
+    X_train, y_train = _data(seed=0)
+    X_val, y_val = _data(seed=1)
+    save_sparse_mmap(X_train, tmp_path / "X_train")
+
+    # Almacén local de MLflow en archivos; los procesos hijos heredan la variable de entorno
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")
+    mlflow.set_tracking_uri((tmp_path / "mlruns").as_uri())
+    experiment_id = mlflow.create_experiment("grid")
+    try:
+        search = GridSearch("RandomForest", X_train, y_train, X_val, y_val, tags={"data_namespace": "test"},
+                            mmap_dirs={"X_train": tmp_path / "X_train"}, experiment_id=experiment_id)
+        search.param_combinations = [
+            {"n_estimators": n, "max_depth": depth, "random_state": 0} for n in (2, 5) for depth in (2, 6)
+        ]
+
+        best_params, best_score = search.run(n_workers=2)
+
+        runs = mlflow.search_runs(experiment_ids=[experiment_id])
+    finally:
+        mlflow.set_tracking_uri(None)
+
+    assert len(runs) == 4
+    assert sorted(runs["tags.grid_index"].astype(int)) == [0, 1, 2, 3]
+    assert (runs["tags.data_namespace"] == "test").all()
+
+    best = runs[runs["tags.best_model"] == "true"]
+    assert len(best) == 1
+    assert best["metrics.val_f1"].iloc[0] == best_score == runs["metrics.val_f1"].max()
+    assert best["params.max_depth"].iloc[0] == str(best_params["max_depth"])
+
+
+def test_serial_grid_search_logs_only_the_finalist_model(tmp_path, monkeypatch):
+    """
+    Cada combinación registra parámetros, métricas y artefactos una sola vez; el modelo
+    completo solo se serializa para la mejor corrida.
+    """
+    X_train, y_train = _data(seed=0)
+    X_val, y_val = _data(seed=1)
+
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")
+    monkeypatch.chdir(tmp_path)
+    mlflow.set_tracking_uri((tmp_path / "mlruns").as_uri())
+    experiment_id = mlflow.create_experiment("grid")
+    try:
+        search = GridSearch("RandomForest", X_train, y_train, X_val, y_val, experiment_id=experiment_id)
+        search.param_combinations = [{"n_estimators": n, "random_state": 0} for n in (2, 5, 10)]
+        search.run()
+
+        runs = mlflow.search_runs(experiment_ids=[experiment_id])
+        client = mlflow.MlflowClient()
+        artifacts = {run_id: {artifact.path for artifact in client.list_artifacts(run_id)} for run_id in runs["run_id"]}
+    finally:
+        mlflow.set_tracking_uri(None)
+
+    best_run = runs.loc[runs["tags.best_model"] == "true", "run_id"].item()
+    assert (runs["status"] == "FINISHED").all()
+    assert [run_id for run_id, paths in artifacts.items() if "best_RandomForest" in paths] == [best_run]
+    assert all({"confusion_matrix.json", "classification_report.json"} <= paths for paths in artifacts.values())
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["mlruns"]
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_warm_start_logs_every_grid_point(tmp_path, monkeypatch, n_workers):
+    """
+    Con warm start cada punto de la grilla sigue teniendo su propia corrida, con su valor
+    de n_estimators y su métrica.
+    """
+    X_train, y_train = _data(seed=0)
+    X_val, y_val = _data(seed=1)
+
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")
+    mlflow.set_tracking_uri((tmp_path / "mlruns").as_uri())
+    experiment_id = mlflow.create_experiment("grid")
+    try:
+        search = GridSearch("RandomForest", X_train, y_train, X_val, y_val, experiment_id=experiment_id)
+        search.param_combinations = [
+            {"n_estimators": n, "max_depth": depth, "random_state": 0} for depth in (2, 6) for n in (1, 3, 6)
+        ]
+        assert len(search.groups()) == 2
+
+        search.run(n_workers=n_workers)
+        runs = mlflow.search_runs(experiment_ids=[experiment_id])
+    finally:
+        mlflow.set_tracking_uri(None)
+
+    assert len(runs) == 6
+    assert (runs["status"] == "FINISHED").all()
+    assert sorted(zip(runs["params.max_depth"], runs["params.n_estimators"].astype(int))) == [
+        ("2", 1), ("2", 3), ("2", 6), ("6", 1), ("6", 3), ("6", 6)
+    ]
+    assert runs["metrics.val_f1"].notna().all()
+
+
+def test_mmap_matrices_keep_the_parent_dtype(tmp_path):
+    """
+    Los procesos abren la matriz mapeada con el tipo de la del proceso principal, sin
+    copiarla cuando el archivo ya tiene ese tipo.
+    """
+    X, _ = _data()
+    save_sparse_mmap(X.astype(np.float64), tmp_path / "X64")
+    save_sparse_mmap(X, tmp_path / "X32")
+
+    cast = model_search._load_mmap(str(tmp_path / "X64"), np.float32)
+    shared = model_search._load_mmap(str(tmp_path / "X32"), np.float32)
+
+    assert cast.dtype == shared.dtype == np.float32
+    assert not shared.data.flags.owndata
+
+
+def test_failed_group_returns_finished_points(tmp_path, monkeypatch):
+    """
+    Si una combinación de un grupo falla, las que ya terminaron se devuelven con el error
+    y solo las corridas pendientes quedan como fallidas.
+    """
+    def train_then_fail(*args, **kwargs):
+        yield None, {"f1_score": 0.5}
+        raise RuntimeError("sin memoria")
+
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")
+    mlflow.set_tracking_uri((tmp_path / "mlruns").as_uri())
+    experiment_id = mlflow.create_experiment("grid")
+    monkeypatch.setattr(model_search, "_train_group", train_then_fail)
+    monkeypatch.setattr(model_search, "_WORKER", {
+        "model_name": "RandomForest", "tags": {}, "experiment_id": experiment_id, "constraints": {},
+        "best_score": float("inf"), "X_train": None, "y_train": None, "X_val": None, "y_val": None,
+        "dataset_cache": None, "n_threads": 1, "profile": False,
+    })
+    try:
+        results, error = model_search._run_group([(0, {"n_estimators": 2}), (1, {"n_estimators": 5})])
+        get_tracker().flush()
+        runs = mlflow.search_runs(experiment_ids=[experiment_id])
+    finally:
+        mlflow.set_tracking_uri(None)
+
+    assert [result["index"] for result in results] == [0]
+    assert error == "sin memoria"
+    assert sorted(runs["status"]) == ["FAILED", "FINISHED"]
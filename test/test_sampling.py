@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_preprocessing.sampling import sample_namespace, stratified_sample
+from models.sample_fidelity import compare_sample_metrics
+
+TARGET_COL = 'origen_igdactmlmacalificacionorigen'
+
+
+def test_stratified_sample_floor(transformed_data):
+    """
+    Cada clase conserva la fracción pedida, con un mínimo para las clases raras,
+    y la muestra es reproducible.
+    """
+    raw = transformed_data.rename(columns={TARGET_COL: TARGET_COL.upper()})
+    sample = stratified_sample(raw, fraction=0.1, min_per_class=25)
+
+    counts = raw[TARGET_COL.upper()].value_counts()
+    sample_counts = sample[TARGET_COL.upper()].value_counts()
+    for value, count in counts.items():
+        assert sample_counts[value] == min(count, max(int(np.ceil(0.1 * count)), 25))
+
+    pd.testing.assert_frame_equal(sample, stratified_sample(raw, fraction=0.1, min_per_class=25))
+    assert sample_namespace(0.05) == "sample_5pct"
+    assert sample_namespace(None) == "full"
+
+
+def test_compare_sample_metrics():
+    """
+    Las configuraciones se parean por modelo e hiperparámetros entre la muestra y los datos completos.
+    """
+    full = [0.60, 0.70, 0.65, 0.80, 0.75]
+    sample = [0.55, 0.66, 0.60, 0.71, 0.69]
+    runs = pd.DataFrame({
+        "tags.model_name": ["MLP"] * 10 + ["MLP"],
+        "tags.data_namespace": [None] * 5 + ["sample_5pct"] * 5 + ["sample_5pct"],
+        "params.alpha": [str(a) for a in range(5)] * 2 + ["99"],
+        "metrics.val_f1": full + sample + [0.9],
+    })
+
+    summary, paired = compare_sample_metrics(runs, "sample_5pct")
+
+    assert summary["n_paired_configs"] == 5
+    assert summary["spearman"] == pytest.approx(1.0)
+    assert summary["best_config_match"]
+    assert summary["mean_abs_diff"] == pytest.approx(np.mean(np.subtract(full, sample)))
+    assert summary["spearman_by_model"]["MLP"] == pytest.approx(1.0)
+    assert list(paired.columns) == ["model_name", "config", "full", "sample"]
@@ -0,0 +1,137 @@
+import mlflow
+import numpy as np
+import pytest
+
+from models.search_strategies import Hyperband, RandomSearch, SuccessiveHalving, TPESearch
+
+GRID = {
+    "n_estimators": [100, 300, 500],
+    "max_depth": [2, 4, 6, 8, 10, 12],
+    "learning_rate": [0.01, 0.03, 0.05, 0.1, 0.2],
+    "subsample": [0.6, 0.8, 1.0],
+}
+
+
+def _objective(params, fraction):
+    """
+    Puntaje sintético: mejor con max_depth=8 y learning_rate=0.05; con menos recurso
+    el puntaje baja, pero el orden entre configuraciones se mantiene.
+    """
+    score = 1 - abs(params["max_depth"] - 8) / 10 - abs(params["learning_rate"] - 0.05) * 2
+    return score * (0.5 + 0.5 * fraction)
+
+
+def _strategy(cls, **kwargs):
+    y_train = np.repeat([0, 1, 2], [60, 30, 10])
+    search = cls("XGBoost", np.zeros((100, 2)), y_train, None, None, **kwargs)
+    search.grid = GRID
+    search.calls = []
+
+    def evaluate(params, fraction=1.0, resource="n_samples", tags=None):
+        search.n_fits += 1
+        search.calls.append((params, fraction))
+        score = _objective(params, fraction)
+        if fraction == 1.0 and score > search.best_score:
+            search.best_score, search.best_params = score, params
+        return score
+
+    search.evaluate = evaluate
+    return search
+
+
+def test_budget_required():
+    with pytest.raises(ValueError):
+        RandomSearch("XGBoost", None, None, None, None)
+
+
+def test_random_search_respects_fit_budget():
+    search = _strategy(RandomSearch, max_fits=15)
+    search.run()
+
+    assert search.n_fits == 15
+    assert len({search.config_key(params) for params, _ in search.calls}) == 15
+
+
+def test_successive_halving_rungs():
+    """
+    Con eta=3 y 1/9 del recurso: 9 configuraciones, luego 3 y luego 1 con el recurso completo.
+    """
+    search = _strategy(SuccessiveHalving, max_fits=100, eta=3, min_fraction=1 / 9)
+    search.run()
+
+    fractions = [fraction for _, fraction in search.calls]
+    assert fractions == [1 / 9] * 9 + [1 / 3] * 3 + [1.0]
+    best_low = max(search.calls[:9], key=lambda call: _objective(call[0], 1.0))[0]
+    assert search.best_params == best_low
+
+
+def test_hyperband_brackets_and_time_budget():
+    search = _strategy(Hyperband, max_fits=1000, eta=3, min_fraction=1 / 9)
+    search.run()
+
+    # Brackets: (9 -> 3 -> 1), (5 -> 1), (3)
+    assert search.n_fits == 13 + 6 + 3
+    assert search.best_params is not None
+
+    search = _strategy(Hyperband, max_seconds=0, eta=3, min_fraction=1 / 9)
+    search.run()
+    assert search.n_fits == 0
+
+
+def test_subsample_rows_keeps_every_class():
+    search = _strategy(SuccessiveHalving, max_fits=1)
+
+    rows = search.subsample_rows(1 / 27)
+
+    assert set(search.y_train[rows]) == {0, 1, 2}
+    assert np.all(np.diff(rows) > 0)
+
+
+def test_tpe_beats_random_with_same_budget():
+    """
+    Con el mismo presupuesto, TPE se concentra en la zona buena y encuentra mejores
+    configuraciones que la búsqueda aleatoria (promedio sobre varias semillas).
+    """
+    tpe_scores, random_scores = [], []
+    for seed in range(5):
+        tpe = _strategy(TPESearch, max_fits=30, n_startup=8, random_state=seed)
+        tpe.run()
+        tpe_scores.append(tpe.best_score)
+
+        rand = _strategy(RandomSearch, max_fits=30, random_state=seed)
+        rand.run()
+        random_scores.append(rand.best_score)
+
+        assert len({tpe.config_key(params) for params, _ in tpe.history}) == 30
+
+    assert np.mean(tpe_scores) >= np.mean(random_scores)
+
+
+def test_failed_fit_is_recorded_and_search_continues(tmp_path, monkeypatch):
+    """
+    Con modelos reales: un ajuste que falla deja su corrida como FAILED y la búsqueda
+    sigue con las demás configuraciones.
+    """
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(150, 4)).astype(np.float32)
+    y = (X[:, 0] > 0).astype(int)
+
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")
+    monkeypatch.chdir(tmp_path)
+    mlflow.set_tracking_uri((tmp_path / "mlruns").as_uri())
+    experiment_id = mlflow.create_experiment("strategies")
+    try:
+        search = RandomSearch("RandomForest", X[:100], y[:100], X[100:], y[100:], experiment_id=experiment_id,
+                              max_fits=4)
+        # max_depth=-1 no es válido para scikit-learn: esos ajustes fallan
+        search.grid = {"n_estimators": [2, 5], "max_depth": [-1, 3], "random_state": [0]}
+        best_params, best_score = search.run()
+
+        runs = mlflow.search_runs(experiment_ids=[experiment_id])
+    finally:
+        mlflow.set_tracking_uri(None)
+
+    assert search.n_fits == 4
+    assert sorted(runs["status"]) == ["FAILED", "FAILED", "FINISHED", "FINISHED"]
+    assert best_params["max_depth"] == 3
+    assert best_score == runs["metrics.val_f1"].max()
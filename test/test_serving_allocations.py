@@ -0,0 +1,53 @@
+import os
+import sys
+
+import pandas as pd
+import scipy.sparse
+
+API_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "api"))
+sys.path.append(API_PATH)
+
+from adapter import create_model_input
+from modelo_triage.utils.transform_input import audit_allocations, load_pipeline, prepare_input_data
+
+# Presupuesto de memoria por petición (pico medido con tracemalloc, en bytes).
+# Cargar el pipeline en cada petición o copiar el DataFrame lo supera.
+PEAK_BUDGET_BYTES = 200 * 1024
+
+REQUEST = {
+    "parte_cuerpo": "446",
+    "municipio": "5001",
+    "jornada_trabajo": "1",
+    "realizando_trabajo": "s",
+    "descripcion": "Cayó de la escalera, golpe en la mano",
+}
+
+
+def _serve(request):
+    return prepare_input_data(create_model_input(request))
+
+
+def test_pipeline_loaded_once():
+    assert load_pipeline() is load_pipeline()
+
+
+def test_prepare_input_does_not_modify_input():
+    input_df = create_model_input(REQUEST)
+    original = input_df.copy()
+
+    X = prepare_input_data(input_df)
+
+    pd.testing.assert_frame_equal(input_df, original)
+    assert scipy.sparse.issparse(X)
+    assert X.shape[0] == 1
+
+
+def test_request_allocation_budget():
+    """
+    Del request a la matriz de características no se supera el presupuesto de memoria.
+    """
+    _serve(REQUEST)  # Calentamiento: carga del pipeline y cachés de pandas/sklearn
+
+    peaks = [audit_allocations(_serve, REQUEST)[1]["peak_bytes"] for _ in range(3)]
+
+    assert max(peaks) < PEAK_BUDGET_BYTES, f"Pico por petición: {[p // 1024 for p in peaks]} KB"
@@ -0,0 +1,23 @@
+import numpy as np
+import scipy.sparse
+
+from data_preprocessing.sparse_storage import load_sparse_mmap, save_sparse_mmap
+
+
+def test_mmap_round_trip(tmp_path):
+    """
+    La matriz guardada en formato mmap se recupera igual y sin copiarla a memoria.
+    """
+    X = scipy.sparse.random(500, 40, density=0.1, format='csr', dtype=np.float32, random_state=0)
+
+    save_sparse_mmap(X, tmp_path / "X_train")
+    loaded = load_sparse_mmap(tmp_path / "X_train")
+
+    assert loaded.shape == X.shape
+    assert loaded.dtype == np.float32
+    assert (loaded != X).nnz == 0
+    # Los arreglos siguen respaldados por el archivo mapeado
+    for name in ("data", "indices", "indptr"):
+        array = getattr(loaded, name)
+        assert not array.flags.owndata
+        assert not array.flags.writeable
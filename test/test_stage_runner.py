@@ -0,0 +1,129 @@
+import json
+import time
+
+import numpy as np
+import pytest
+
+from data_preprocessing.stage_runner import Stage, StageRunner, file_signature
+
+
+def _stages(calls, fail=False):
+    def record(name, func):
+        def wrapper(*args):
+            calls.append(name)
+            return func(*args)
+        return wrapper
+
+    def fail_or_sum(a, b):
+        if fail:
+            raise RuntimeError("falla simulada")
+        return a + b
+
+    return [
+        Stage("load", record("load", lambda: np.arange(12).reshape(4, 3))),
+        Stage("left", record("left", lambda x: x * 2), inputs=["load"]),
+        Stage("right", record("right", lambda x: x + 1), inputs=["load"]),
+        Stage("join", record("join", fail_or_sum), inputs=["left", "right"]),
+    ]
+
+
+def test_levels_and_metrics(tmp_path):
+    """
+    Las etapas independientes comparten nivel y cada etapa registra tiempo, memoria y forma.
+    """
+    runner = StageRunner(_stages([]), tmp_path)
+    assert runner.levels == [["load"], ["left", "right"], ["join"]]
+
+    report = runner.run()
+    assert list(report["stage"]) == ["load", "left", "right", "join"]
+    assert (report["status"] == "run").all()
+    assert report.loc[report["stage"] == "join", ["rows", "cols"]].values.tolist() == [[4, 3]]
+    assert (report["process_peak_rss_mb"] > 0).all()
+    assert (tmp_path / "stage_metrics.csv").exists()
+
+
+def test_resume_after_failure(tmp_path):
+    """
+    Tras una falla, --resume omite las etapas completadas y ejecuta solo las pendientes.
+    """
+    with pytest.raises(RuntimeError):
+        StageRunner(_stages([], fail=True), tmp_path).run()
+
+    state = json.loads((tmp_path / "run_state.json").read_text())
+    assert state["join"]["status"] == "failed"
+    assert state["left"]["status"] == "done"
+
+    calls = []
+    report = StageRunner(_stages(calls), tmp_path).run(resume=True)
+
+    assert calls == ["join"]
+    assert list(report["status"]) == ["skipped", "skipped", "skipped", "run"]
+
+
+def test_failed_sibling_keeps_completed_stages(tmp_path):
+    """
+    Si falla una etapa de un nivel paralelo, las demás del mismo nivel quedan completadas
+    y no se repiten al reanudar.
+    """
+    def slow_left(x):
+        time.sleep(0.2)
+        return x * 2
+
+    def failing_right(x):
+        raise RuntimeError("falla simulada")
+
+    stages = [
+        Stage("load", lambda: np.arange(12).reshape(4, 3)),
+        Stage("left", slow_left, inputs=["load"]),
+        Stage("right", failing_right, inputs=["load"]),
+    ]
+    with pytest.raises(RuntimeError):
+        StageRunner(stages, tmp_path).run()
+
+    state = json.loads((tmp_path / "run_state.json").read_text())
+    assert state["left"]["status"] == "done"
+    assert state["right"]["status"] == "failed"
+
+    calls = []
+    stages[2] = Stage("right", lambda x: calls.append("right") or x + 1, inputs=["load"])
+    report = StageRunner(stages, tmp_path).run(resume=True)
+
+    assert calls == ["right"]
+    assert list(report["status"]) == ["skipped", "skipped", "run"]
+
+
+def test_invalid_graph(tmp_path):
+    with pytest.raises(ValueError):
+        StageRunner([Stage("a", lambda x: x, inputs=["b"])], tmp_path)
+    with pytest.raises(ValueError):
+        StageRunner([Stage("a", lambda x: x, inputs=["b"]), Stage("b", lambda x: x, inputs=["a"])], tmp_path)
+
+
+def test_resume_reruns_stages_whose_params_changed(tmp_path):
+    """
+    Si cambian los parámetros de una etapa (p. ej. el archivo de entrada), --resume la
+    repite junto con las etapas que dependen de ella.
+    """
+    source = tmp_path / "input.csv"
+    source.write_text("1,2,3\n")
+
+    def stages(calls, params):
+        return [
+            Stage("load", lambda: calls.append("load") or np.ones((2, 2)), params=params),
+            Stage("other", lambda: calls.append("other") or np.zeros(2)),
+            Stage("join", lambda x, y: calls.append("join") or x + y, inputs=["load", "other"]),
+        ]
+
+    StageRunner(stages([], {"input": file_signature(source), "sample_fraction": 0.1}), tmp_path / "ckpt").run()
+
+    calls = []
+    StageRunner(stages(calls, {"input": file_signature(source), "sample_fraction": 0.1}), tmp_path / "ckpt").run(resume=True)
+    assert calls == []
+
+    StageRunner(stages(calls, {"input": file_signature(source), "sample_fraction": 0.2}), tmp_path / "ckpt").run(resume=True)
+    assert calls == ["load", "join"]
+
+    calls.clear()
+    source.write_text("1,2,3\n4,5,6\n")
+    StageRunner(stages(calls, {"input": file_signature(source), "sample_fraction": 0.2}), tmp_path / "ckpt").run(resume=True)
+    assert calls == ["load", "join"]
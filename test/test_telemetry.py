@@ -0,0 +1,100 @@
+import time
+from types import SimpleNamespace
+
+import mlflow
+import numpy as np
+import pandas as pd
+import psutil
+
+from models.model_trainer import ModelTrainer
+from models.model_zoo.random_forest import RandomForestModel
+from models.pipeline import ModelPipeline
+from models.telemetry import TELEMETRY_ENV, TELEMETRY_METRICS, ResourceMeter, record_training
+from models.tracking import AsyncTracker
+
+
+def _data(n_rows=200, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 6)).astype(np.float32)
+    y = (X[:, 0] + rng.normal(scale=0.5, size=n_rows) > 0).astype(int)
+    return X, y
+
+
+def test_meter_reports_time_memory_and_threads():
+    baseline_mb = psutil.Process().memory_info().rss / 2**20
+    with ResourceMeter(interval=0.01) as meter:
+        # 32 MB escritos: cuentan en el pico de memoria residente del bloque
+        block = np.ones(4_000_000)
+        block.sum()
+
+    metrics = meter.metrics("fit", n_rows=1000)
+
+    assert set(metrics) == {name for name in TELEMETRY_METRICS if name.startswith("fit_")}
+    assert metrics["fit_wall_seconds"] > 0 and metrics["fit_cpu_seconds"] >= 0
+    assert metrics["fit_peak_rss_mb"] >= baseline_mb + 30
+    assert metrics["fit_threads"] >= 1
+    assert metrics["fit_rows_per_second"] == 1000 / metrics["fit_wall_seconds"]
+
+
+def test_training_telemetry_goes_to_mlflow_and_csv(tmp_path, monkeypatch):
+    X_train, y_train = _data(seed=0)
+    X_val, y_val = _data(n_rows=100, seed=1)
+    csv_path = tmp_path / "telemetry" / "training.csv"
+
+    monkeypatch.setenv(TELEMETRY_ENV, str(csv_path))
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")
+    mlflow.set_tracking_uri((tmp_path / "mlruns").as_uri())
+    try:
+        experiment_id = mlflow.create_experiment("telemetry")
+        tracker = AsyncTracker()
+        single = tracker.start_run(experiment_id)
+        grown = [tracker.start_run(experiment_id) for _ in range(2)]
+
+        ModelTrainer(RandomForestModel({"n_estimators": 5, "random_state": 0})).train_and_log(
+            X_train, y_train, X_val, y_val, run=single)
+        pipeline = ModelPipeline("RandomForest", {"n_estimators": 2, "random_state": 0})
+        list(pipeline.run_warm_start(X_train, y_train, X_val, y_val, [2, 6], grown))
+        tracker.close()
+
+        logged = mlflow.get_run(single.run_id).data.metrics
+    finally:
+        mlflow.set_tracking_uri(None)
+
+    report = pd.read_csv(csv_path)
+
+    assert set(TELEMETRY_METRICS) <= set(logged)
+    assert logged["fit_rows_per_second"] > 0
+    assert report["run_id"].tolist() == [single.run_id, *(run.run_id for run in grown)]
+    assert (report["n_train_rows"] == 200).all() and (report["n_val_rows"] == 100).all()
+    assert report[list(TELEMETRY_METRICS)].notna().all().all()
+    assert report["params"].str.contains('"n_estimators": 6').iloc[-1]
+    assert report["fit_cost"].tolist() == ["point", "incremental", "incremental"]
+
+
+def test_telemetry_row_does_not_wait_for_the_run(tmp_path):
+    """
+    La fila del CSV se escribe desde la cola del tracker: registrar no espera a que se cree la corrida.
+    """
+    class SlowClient:
+        def create_run(self, experiment_id, tags=None, run_name=None):
+            time.sleep(0.3)
+            return SimpleNamespace(info=SimpleNamespace(run_id="run-1"))
+
+        def log_batch(self, run_id, metrics=(), params=(), tags=()):
+            pass
+
+    X_train, y_train = _data(seed=0)
+    X_val, y_val = _data(n_rows=100, seed=1)
+    csv_path = tmp_path / "training.csv"
+    model = RandomForestModel({"n_estimators": 2, "random_state": 0})
+    model.train(X_train, y_train)
+
+    tracker = AsyncTracker(client=SlowClient())
+    run = tracker.start_run("0")
+    start = time.perf_counter()
+    record_training(model, {"f1_score": 0.5}, run, X_train, X_val, fit_cost="group", path=csv_path)
+    assert time.perf_counter() - start < 0.3
+    tracker.close()
+
+    report = pd.read_csv(csv_path)
+    assert report[["run_id", "fit_cost"]].values.tolist() == [["run-1", "group"]]
@@ -0,0 +1,51 @@
+import re
+
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer
+
+from data_preprocessing import text_normalization
+from data_preprocessing.text_normalization import normalize_series, normalize_text, tokenize
+
+TEXTOS = pd.Series([
+    "  El trabajador cayó de la escalera,  golpeándose la MANO!! ",
+    "corte con cuchillo -- dedo índice (mano der.)",
+    "resbaló en el piso...\tdolor de espalda",
+    None,
+])
+
+
+def test_normalize_series_matches_previous_cleaning():
+    """
+    La pasada única equivale a la limpieza anterior de clean_data (\\W -> ' ' y luego \\s+ -> ' ').
+    """
+    texts = TEXTOS.str.strip().str.lower()
+    expected = texts.str.replace(r'\W', ' ', regex=True).str.replace(r'\s+', ' ', regex=True)
+
+    pd.testing.assert_series_equal(normalize_series(texts), expected)
+    assert normalize_series(TEXTOS).iloc[0] == normalize_text(TEXTOS.iloc[0])
+
+
+def test_remove_accents_and_tokenize():
+    """
+    Sin tildes y con los mismos tokens que el token_pattern por defecto de scikit-learn.
+    """
+    text = normalize_text(TEXTOS.iloc[2], remove_accents=True)
+    assert text == "resbalo en el piso dolor de espalda"
+
+    token_pattern = re.compile(CountVectorizer().token_pattern)
+    for value in TEXTOS.dropna():
+        normalized = normalize_text(value)
+        assert tokenize(normalized) == token_pattern.findall(normalized)
+
+
+def test_normalize_series_multiprocessing(monkeypatch):
+    """
+    El backend con varios procesos devuelve el mismo resultado que la versión en un proceso.
+    """
+    monkeypatch.setattr(text_normalization, "MIN_ROWS_PER_JOB", 10)
+    texts = pd.concat([TEXTOS] * 20, ignore_index=True)
+
+    pd.testing.assert_series_equal(
+        normalize_series(texts, remove_accents=True, n_jobs=2),
+        normalize_series(texts, remove_accents=True),
+    )
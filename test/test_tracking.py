@@ -0,0 +1,108 @@
+import time
+from types import SimpleNamespace
+
+import mlflow
+import pytest
+from sklearn.dummy import DummyClassifier
+
+from models.model_registry import ModelRegistry
+from models.tracking import AsyncTracker
+
+
+class SlowClient:
+    """
+    Cliente con la latencia de un servidor remoto; guarda las llamadas recibidas.
+    """
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+        self.calls = []
+
+    def _call(self, name, *args, **kwargs):
+        time.sleep(self.latency)
+        self.calls.append((name, args, kwargs))
+
+    def create_run(self, experiment_id, tags=None, run_name=None):
+        self._call("create_run", experiment_id)
+        return SimpleNamespace(info=SimpleNamespace(run_id=f"run-{len(self.calls)}"))
+
+    def log_batch(self, run_id, metrics=(), params=(), tags=()):
+        self._call("log_batch", run_id, metrics=metrics, params=params, tags=tags)
+
+    def log_dict(self, run_id, dictionary, artifact_file):
+        self._call("log_dict", run_id, artifact_file)
+
+    def set_terminated(self, run_id, status=None):
+        self._call("set_terminated", run_id, status)
+
+
+def test_logging_does_not_block_and_is_batched():
+    client = SlowClient()
+    tracker = AsyncTracker(client=client)
+
+    start = time.perf_counter()
+    run = tracker.start_run("0", tags={"model_name": "XGBoost"})
+    ModelRegistry.log_run(run, {"max_depth": 4, "learning_rate": 0.1},
+                          {"f1_score": 0.8, "accuracy": 0.9, "confusion_matrix": [[1, 0], [0, 1]]})
+    run.log_metrics({"val_f1": 0.8})
+    run.end()
+    queued = time.perf_counter() - start
+    tracker.flush()
+    tracker.close()
+
+    # Encolar no espera al servidor (cada llamada real tarda 50 ms)
+    assert queued < client.latency
+    assert [name for name, _, _ in client.calls] == ["create_run", "log_batch", "log_dict", "log_batch",
+                                                    "set_terminated"]
+
+    _, _, batch = client.calls[1]
+    assert {param.key: param.value for param in batch["params"]} == {"max_depth": "4", "learning_rate": "0.1"}
+    assert {metric.key for metric in batch["metrics"]} == {"f1_score", "accuracy"}
+    assert client.calls[2][1] == ("run-1", "confusion_matrix.json")
+    assert tracker.errors == 0
+
+
+def test_logs_to_file_store_from_memory(tmp_path, monkeypatch):
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")
+    monkeypatch.chdir(tmp_path)
+    mlflow.set_tracking_uri((tmp_path / "mlruns").as_uri())
+    try:
+        experiment_id = mlflow.create_experiment("tracking")
+        tracker = AsyncTracker()
+        run = tracker.start_run(experiment_id, tags={"model_name": "RandomForest"})
+        ModelRegistry.log_run(run, {"n_estimators": 10}, {"f1_score": 0.5, "classification_report": {"a": 1}})
+        run.end()
+        tracker.close()
+
+        logged = mlflow.get_run(run.run_id)
+        artifacts = [artifact.path for artifact in mlflow.MlflowClient().list_artifacts(run.run_id)]
+    finally:
+        mlflow.set_tracking_uri(None)
+
+    assert logged.data.params == {"n_estimators": "10"}
+    assert logged.data.metrics == {"f1_score": 0.5}
+    assert logged.data.tags["model_name"] == "RandomForest"
+    assert logged.info.status == "FINISHED"
+    assert artifacts == ["classification_report.json"]
+    # Nada se escribe en el directorio de trabajo
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["mlruns"]
+
+
+def test_failed_model_save_is_reported():
+    """
+    Un modelo que no se pudo guardar queda en `model_error` de su corrida y se informa al vaciar la cola.
+    """
+    class FailingClient(SlowClient):
+        def log_artifacts(self, run_id, local_dir, artifact_path=None):
+            raise OSError("sin espacio en el servidor de artefactos")
+
+    tracker = AsyncTracker(client=FailingClient(latency=0))
+    saved, failed = tracker.start_run("0"), tracker.start_run("0")
+    failed.log_model(DummyClassifier().fit([[0], [1]], [0, 1]), "best_DummyClassifier")
+
+    tracker.raise_for_model_error(saved)
+    with pytest.raises(RuntimeError, match="sin espacio"):
+        tracker.raise_for_model_error(failed)
+    tracker.close()
+
+    assert tracker.errors == 1
@@ -0,0 +1,111 @@
+import mlflow
+import numpy as np
+import scipy.sparse
+
+import models.model_search as model_search
+from models.model_search import GridSearch
+from models.trial_ledger import TrialLedger, data_fingerprint, search_scope, trial_key
+
+
+def test_keys_depend_on_params_and_scope():
+    scope = search_scope("RandomForest", {"data_namespace": "full"}, "1")
+
+    assert trial_key(scope, {"a": 1, "b": 2}) == trial_key(scope, {"b": 2, "a": 1})
+    assert trial_key(scope, {"a": 1}) != trial_key(scope, {"a": 2})
+    assert trial_key(scope, {"a": 1}) != trial_key(search_scope("RandomForest", {"data_namespace": "sample_10"}, "1"),
+                                                    {"a": 1})
+
+
+def test_scope_depends_on_training_data():
+    """
+    Regenerar las particiones con el mismo data_namespace cambia el alcance de la búsqueda.
+    """
+    X, y = _data(seed=0)
+    fingerprint = data_fingerprint(X, y)
+    scope = search_scope("RandomForest", {"data_namespace": "full"}, "1", fingerprint)
+
+    assert data_fingerprint(X.copy(), y.copy()) == fingerprint
+    assert data_fingerprint(X[:-1], y[:-1]) != fingerprint
+    assert data_fingerprint(X, 1 - y) != fingerprint
+    assert data_fingerprint(scipy.sparse.csr_matrix(X), y) == fingerprint
+    assert search_scope("RandomForest", {"data_namespace": "full"}, "1", data_fingerprint(X, 1 - y)) != scope
+
+
+def test_ledger_survives_restart_and_limits_attempts(tmp_path):
+    path = tmp_path / "ledger.sqlite"
+    ledger = TrialLedger(path, max_attempts=2)
+    ledger.start("done", "scope", {"n_estimators": 1})
+    ledger.complete("done", {"f1_score": 0.7, "confusion_matrix": [[1]]}, 1.5, run_id="run-1")
+    ledger.start("failed", "scope", {"n_estimators": 2})
+    ledger.fail("failed", ValueError("sin memoria"))
+    ledger.start("interrupted", "scope", {"n_estimators": 3})
+    ledger.close()
+
+    ledger = TrialLedger(path, max_attempts=2)
+
+    assert not ledger.should_run("done")
+    assert ledger.get("done")["run_id"] == "run-1"
+    assert ledger.get("done")["seconds"] == 1.5
+    # Fallidas e interrumpidas se reintentan hasta agotar los intentos
+    assert ledger.should_run("failed") and ledger.should_run("interrupted") and ledger.should_run("new")
+    ledger.start("failed", "scope", {"n_estimators": 2})
+    ledger.fail("failed", ValueError("sin memoria"))
+    assert ledger.get("failed")["attempts"] == 2
+    assert not ledger.should_run("failed")
+    assert ledger.best(["done", "failed", "interrupted"])["key"] == "done"
+
+
+def _data(n_rows=200, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 6)).astype(np.float32)
+    y = (X[:, 0] + rng.normal(scale=0.5, size=n_rows) > 0).astype(int)
+    return X, y
+
+
+def test_grid_search_resumes_and_retries(tmp_path, monkeypatch):
+    """
+    Una búsqueda relanzada con el mismo ledger solo entrena las combinaciones que faltan;
+    una combinación que falla se reintenta y al final solo la mejor corrida queda marcada.
+    """
+    X_train, y_train = _data(seed=0)
+    X_val, y_val = _data(seed=1)
+    grid = [{"n_estimators": n, "max_depth": depth, "random_state": 0} for depth in (1, 4) for n in (1, 5)]
+
+    failures = []
+    train_group = model_search._train_group
+
+    def flaky_train_group(model_name, group, *args, **kwargs):
+        if group[0][1]["max_depth"] == 4 and not failures:
+            failures.append(group)
+            raise MemoryError("sin memoria")
+        return train_group(model_name, group, *args, **kwargs)
+
+    monkeypatch.setattr(model_search, "_train_group", flaky_train_group)
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")
+    mlflow.set_tracking_uri((tmp_path / "mlruns").as_uri())
+    experiment_id = mlflow.create_experiment("grid")
+    try:
+        # Primera ejecución: se interrumpe tras las combinaciones de max_depth=1
+        search = GridSearch("RandomForest", X_train, y_train, X_val, y_val, experiment_id=experiment_id,
+                            ledger=TrialLedger(tmp_path / "ledger.sqlite"))
+        search.param_combinations = grid[:2]
+        search.run()
+
+        search = GridSearch("RandomForest", X_train, y_train, X_val, y_val, experiment_id=experiment_id,
+                            ledger=TrialLedger(tmp_path / "ledger.sqlite"))
+        search.param_combinations = grid
+        best_params, best_score = search.run()
+
+        runs = mlflow.search_runs(experiment_ids=[experiment_id])
+    finally:
+        mlflow.set_tracking_uri(None)
+
+    finished = runs[runs["status"] == "FINISHED"]
+    assert len(failures) == 1
+    # 2 de la primera ejecución + 2 de la segunda; el intento fallido quedó como FAILED
+    assert len(finished) == 4
+    assert (runs["status"] == "FAILED").sum() == 2
+    assert (runs["tags.best_model"] == "true").sum() == 1
+    assert runs.loc[runs["tags.best_model"] == "true", "metrics.val_f1"].item() == best_score
+    assert best_score == finished["metrics.val_f1"].max()
+    assert best_params in grid
@@ -0,0 +1,135 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from models.base_model import is_maximized
+from models.dataset_cache import DatasetCache
+from models.model_config import get_param_combinations
+from models.model_search import warm_start_groups
+from models.model_zoo.catboost import CatBoostModel
+from models.model_zoo.lightgbm import LightGBMModel
+from models.model_zoo.random_forest import RandomForestModel
+from models.model_zoo.xgboost_model import XGBoostModel
+
+
+def _data(n_rows=600, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 8)).astype(np.float32)
+    y = (X[:, 0] + X[:, 1] ** 2 + rng.normal(scale=0.5, size=n_rows) > 1).astype(int) + (X[:, 2] > 1)
+    return X, y
+
+
+def test_groups_differ_only_in_round_param():
+    combinations = get_param_combinations("RandomForest")
+
+    groups = warm_start_groups("RandomForest", list(enumerate(combinations)))
+
+    assert sum(len(group) for group in groups) == len(combinations)
+    assert len(groups) == len(combinations) // 6
+    for group in groups:
+        assert [params["n_estimators"] for _, params in group] == [1, 2, 3, 4, 6, 8]
+        others = {tuple((key, value) for key, value in params.items() if key != "n_estimators") for _, params in group}
+        assert len(others) == 1
+
+
+def test_repeated_values_are_not_grown():
+    combinations = [{"n_estimators": 5, "max_depth": 2}, {"n_estimators": 2, "max_depth": 2},
+                    {"n_estimators": 5, "max_depth": 2}]
+
+    groups = warm_start_groups("RandomForest", list(enumerate(combinations)))
+
+    assert [[index for index, _ in group] for group in groups] == [[1, 0], [2]]
+
+
+def test_random_forest_checkpoints_match_fresh_training():
+    X_train, y_train = _data(seed=0)
+    X_val, _ = _data(seed=1)
+    params = {"max_depth": 6, "class_weight": "balanced", "random_state": 0}
+
+    checkpoints = list(RandomForestModel(dict(params)).grow(X_train, y_train, None, None, "n_estimators", [2, 5, 8]))
+
+    for value, checkpoint in checkpoints:
+        fresh = RandomForestModel({**params, "n_estimators": value})
+        fresh.train(X_train, y_train)
+        assert len(checkpoint.model.estimators_) == value
+        assert checkpoint.params["n_estimators"] == value
+        np.testing.assert_array_equal(checkpoint.model.predict_proba(X_val), fresh.model.predict_proba(X_val))
+
+    # Los árboles se entrenan una sola vez y los comparten todos los puntos
+    assert checkpoints[0][1].model.estimators_[0] is checkpoints[-1][1].model.estimators_[0]
+
+
+@pytest.mark.parametrize("dataset_cache", [None, DatasetCache()], ids=["sklearn", "cached"])
+def test_boosting_prefixes_match_fresh_training(dataset_cache):
+    """
+    Con parada temprana, cada punto toma su mejor iteración del historial de validación
+    del modelo más grande y predice igual que un modelo entrenado desde cero.
+    """
+    X_train, y_train = _data(seed=0)
+    X_val, y_val = _data(seed=1)
+    params = {"learning_rate": 0.3, "max_depth": 3}
+    values = [5, 20, 200]
+
+    grown = XGBoostModel(dict(params), early_stopping_rounds=5, dataset_cache=dataset_cache)
+    checkpoints = list(grown.grow(X_train, y_train, X_val, y_val, "n_estimators", values))
+
+    assert len(grown.eval_history) < values[-1]
+    # El primer punto lleva el costo del único ajuste del grupo
+    assert grown.grow_fit_cost == "group"
+    for value, checkpoint in checkpoints:
+        fresh = XGBoostModel({**params, "n_estimators": value}, early_stopping_rounds=5, dataset_cache=dataset_cache)
+        fresh.train(X_train, y_train, X_val, y_val)
+        assert checkpoint.best_iteration == fresh.best_iteration
+        np.testing.assert_array_equal(checkpoint.predict(X_val), fresh.predict(X_val))
+        # Cada punto guarda solo sus árboles, no el booster completo
+        assert checkpoint.model.get_booster().num_boosted_rounds() == min(value, len(grown.eval_history))
+
+
+@pytest.mark.parametrize("model_class", [LightGBMModel, CatBoostModel])
+@pytest.mark.parametrize("dataset_cache", [None, DatasetCache()], ids=["sklearn", "cached"])
+def test_boosting_prefixes_keep_only_their_trees(model_class, dataset_cache):
+    """
+    Cada punto es un modelo recortado a sus primeros árboles: predice como un modelo
+    entrenado desde cero con esas rondas y se serializa con su tamaño, no con el del completo.
+    """
+    X_train, y_train = _data(seed=0)
+    X_val, _ = _data(seed=1)
+    if model_class is CatBoostModel:
+        param, params = "iterations", {"learning_rate": 0.3, "max_depth": 3, "allow_writing_files": False}
+    else:
+        param, params = "n_estimators", {"learning_rate": 0.3, "max_depth": 3, "verbose": -1}
+
+    grown = model_class(dict(params), early_stopping_rounds=None, dataset_cache=dataset_cache)
+    (_, small), (_, large) = grown.grow(X_train, y_train, None, None, param, [5, 40])
+
+    fresh = model_class({**params, param: 5}, early_stopping_rounds=None, dataset_cache=dataset_cache)
+    fresh.train(X_train, y_train)
+
+    np.testing.assert_allclose(small.predict_proba(X_val), fresh.predict_proba(X_val), rtol=1e-6)
+    # Tamaño cercano al de un modelo entrenado con 5 rondas (quedan algunos metadatos del completo)
+    assert len(pickle.dumps(small)) < 1.2 * len(pickle.dumps(fresh)) < len(pickle.dumps(large))
+
+
+@pytest.mark.parametrize("eval_metric, maximize", [("auc", True), ("mlogloss", False)])
+def test_prefix_best_iteration_follows_metric_direction(eval_metric, maximize):
+    """
+    La mejor iteración de cada prefijo se busca en la dirección de la métrica configurada.
+    """
+    X_train, y_train = _data(seed=0)
+    X_val, y_val = _data(seed=1)
+
+    model = XGBoostModel({"learning_rate": 0.3, "max_depth": 3, "n_estimators": 60}, early_stopping_rounds=60,
+                         eval_metric=eval_metric)
+    model.train(X_train, y_train, X_val, y_val)
+    history = np.asarray(model.eval_history)
+
+    assert model.eval_history_metric == eval_metric
+    for n_rounds in (5, 20, len(history)):
+        best = history[:n_rounds].argmax() if maximize else history[:n_rounds].argmin()
+        assert model.prefix_best_iteration(n_rounds) == best
+
+
+def test_metric_direction_ignores_metric_parameters():
+    assert is_maximized("ndcg@5") and is_maximized("AUC:type=Mu") and is_maximized("Accuracy")
+    assert not is_maximized("MultiClass") and not is_maximized("mlogloss") and not is_maximized("merror")